@@ -0,0 +1,185 @@
+"""
+Applies wing's changes to the Python interfaces which moonworm generates for our smart contracts.
+
+regen.bash runs this on every interface right after generating it, so that regenerating the
+interfaces never drops these changes. They are:
+1. Build artifacts, the brownie project and ContractContainers are loaded through wing.abi and
+   wing.registry, which cache them, instead of on every call.
+2. Transacting commands accept --signer-agent, to load the sender's account through the wing signer
+   agent (see wing.signer_agent).
+3. Command handlers get their contract wrappers from wing.registry, which shares them between the
+   commands that a wing server or batch runs.
+4. Array arguments of type bool[] are parsed with boolean_argument_type. moonworm passes them on as
+   strings, which brownie cannot convert to booleans. CharactersFacet is the only interface with
+   such an argument (see CONTRACT_REPLACEMENTS).
+
+Additions which only apply to one contract (e.g. the bulk reads and the extra commands of the
+characters group) do not belong here. They live in their own modules - see wing.characters.
+
+Each change must apply to the generated code exactly as expected. If moonworm changes the code it
+generates, this script fails instead of silently skipping a change.
+"""
+
+import argparse
+import os
+import sys
+from typing import Dict, List, Tuple
+
+GENERATED_IMPORTS = """from eth_typing.evm import ChecksumAddress
+
+
+PROJECT_DIRECTORY"""
+PATCHED_IMPORTS = """from eth_typing.evm import ChecksumAddress
+
+from . import abi, registry
+
+PROJECT_DIRECTORY"""
+
+GENERATED_GET_ABI_JSON = """def get_abi_json(abi_name: str) -> List[Dict[str, Any]]:
+    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
+    if not os.path.isfile(abi_full_path):
+        raise IOError(
+            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
+        )
+
+    with open(abi_full_path, "r") as ifp:
+        build = json.load(ifp)
+
+    abi_json = build.get("abi")
+    if abi_json is None:
+        raise ValueError(f"Could not find ABI definition in: {abi_full_path}")
+
+    return abi_json
+"""
+PATCHED_GET_ABI_JSON = """def get_abi_json(abi_name: str) -> List[Dict[str, Any]]:
+    return abi.get_abi_json(abi_name, BUILD_DIRECTORY)
+"""
+
+GENERATED_CONTRACT_FROM_BUILD = """def contract_from_build(abi_name: str) -> ContractContainer:
+    # This is workaround because brownie currently doesn't support loading the same project multiple
+    # times. This causes problems when using multiple contracts from the same project in the same
+    # python project.
+    PROJECT = project.main.Project("moonworm", Path(PROJECT_DIRECTORY))
+
+    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
+    if not os.path.isfile(abi_full_path):
+        raise IOError(
+            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
+        )
+
+    with open(abi_full_path, "r") as ifp:
+        build = json.load(ifp)
+
+    return ContractContainer(PROJECT, build)
+"""
+PATCHED_CONTRACT_FROM_BUILD = """def contract_from_build(abi_name: str) -> ContractContainer:
+    # The brownie project is loaded once per process and shared between all the contracts in it -
+    # see wing.registry.
+    return registry.contract_container(abi_name, BUILD_DIRECTORY)
+"""
+
+GENERATED_SIGNER = """    signer = network.accounts.load(args.sender, args.password)
+"""
+PATCHED_SIGNER = """    if args.signer_agent:
+        # Imported here, as it is also the module of the signer-agent command group (see wing.cli).
+        from . import signer_agent
+
+        signer = signer_agent.load_account(args.sender, args.password)
+    else:
+        signer = network.accounts.load(args.sender, args.password)
+"""
+
+GENERATED_PASSWORD_ARGUMENT = """        help="Password to keystore file (if you do not provide it, you will be prompted for it)",
+    )
+"""
+PATCHED_PASSWORD_ARGUMENT = """        help="Password to keystore file (if you do not provide it, you will be prompted for it)",
+    )
+    parser.add_argument(
+        "--signer-agent",
+        action="store_true",
+        help="Load the sender's account through the wing signer agent, which keeps decrypted keystores in memory across invocations (starts the agent if it is not running)",
+    )
+"""
+
+GENERATED_VALID_BATCH_ARGUMENT = """    set_metadata_validity_batch_parser.add_argument(
+        "--valid", required=True, help="Type: bool[]", nargs="+"
+    )
+"""
+PATCHED_VALID_BATCH_ARGUMENT = """    set_metadata_validity_batch_parser.add_argument(
+        "--valid",
+        required=True,
+        help="Type: bool[]",
+        nargs="+",
+        type=boolean_argument_type,
+    )
+"""
+
+# Changes which only apply to the interfaces for some contracts, keyed by contract name. Entries are
+# of the same form as those returned by replacements.
+CONTRACT_REPLACEMENTS: Dict[str, List[Tuple[str, str, bool]]] = {
+    "CharactersFacet": [
+        (GENERATED_VALID_BATCH_ARGUMENT, PATCHED_VALID_BATCH_ARGUMENT, False),
+    ],
+}
+
+
+def replacements(contract_name: str) -> List[Tuple[str, str, bool]]:
+    """
+    Returns the changes to make to the interface for the given contract, as tuples of the form
+    (generated code, patched code, whether the generated code appears more than once).
+    """
+    return [
+        (GENERATED_IMPORTS, PATCHED_IMPORTS, False),
+        (GENERATED_GET_ABI_JSON, PATCHED_GET_ABI_JSON, False),
+        (GENERATED_CONTRACT_FROM_BUILD, PATCHED_CONTRACT_FROM_BUILD, False),
+        (GENERATED_SIGNER, PATCHED_SIGNER, False),
+        (GENERATED_PASSWORD_ARGUMENT, PATCHED_PASSWORD_ARGUMENT, False),
+        (
+            f"    contract = {contract_name}(args.address)\n",
+            f"    contract = registry.contract_wrapper({contract_name}, args.address)\n",
+            True,
+        ),
+    ] + CONTRACT_REPLACEMENTS.get(contract_name, [])
+
+
+def patch(source: str, contract_name: str) -> str:
+    """
+    Applies wing's changes to the given moonworm-generated interface for the given contract. Raises
+    a ValueError if the generated code is not as expected.
+    """
+    for generated, patched, repeated in replacements(contract_name):
+        count = source.count(generated)
+        if count == 0 or (count > 1 and not repeated):
+            raise ValueError(
+                f"Expected to find {'at least' if repeated else 'exactly'} one occurrence of the following code in the interface for {contract_name}, found {count}:\n{generated}"
+            )
+        source = source.replace(generated, patched)
+    return source
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Apply wing's changes to moonworm-generated contract interfaces (in place)"
+    )
+    parser.add_argument(
+        "interfaces",
+        nargs="+",
+        help="Generated interface files, named after their contracts (e.g. wing/CharactersFacet.py)",
+    )
+    args = parser.parse_args()
+
+    for path in args.interfaces:
+        contract_name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, "r") as ifp:
+            source = ifp.read()
+        try:
+            source = patch(source, contract_name)
+        except ValueError as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        with open(path, "w") as ofp:
+            ofp.write(source)
+
+
+if __name__ == "__main__":
+    main()
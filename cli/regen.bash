@@ -11,7 +11,8 @@ SCRIPT_DIR="$(dirname $(realpath $0))"
 usage() {
     echo "Usage: $0"
     echo
-    echo "Regenerates Python interfaces to all important smart contracts"
+    echo "Regenerates Python interfaces to all important smart contracts, and applies wing's changes to"
+    echo "them (see patch_generated.py)"
 }
 
 if [ "$1" = "-h" ] || [ "$1" = "--help" ]
@@ -38,4 +39,7 @@ for contract_name in "${IMPORTANT_CONTRACTS[@]}"
 do
     echo "Regenerating Python interface for: $contract_name"
     moonworm generate-brownie -p .. -o wing/ -n "$contract_name"
+    python patch_generated.py "wing/$contract_name.py"
 done
+
+black wing/
@@ -11,6 +11,7 @@ from brownie import Contract, network, project
 from brownie.network.contract import ContractContainer
 from eth_typing.evm import ChecksumAddress
 
+from . import abi, registry
 
 PROJECT_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 BUILD_DIRECTORY = os.path.join(PROJECT_DIRECTORY, "build", "contracts")
@@ -35,38 +36,13 @@ def bytes_argument_type(raw_value: str) -> str:
 
 
 def get_abi_json(abi_name: str) -> List[Dict[str, Any]]:
-    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
-    if not os.path.isfile(abi_full_path):
-        raise IOError(
-            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
-        )
-
-    with open(abi_full_path, "r") as ifp:
-        build = json.load(ifp)
-
-    abi_json = build.get("abi")
-    if abi_json is None:
-        raise ValueError(f"Could not find ABI definition in: {abi_full_path}")
-
-    return abi_json
+    return abi.get_abi_json(abi_name, BUILD_DIRECTORY)
 
 
 def contract_from_build(abi_name: str) -> ContractContainer:
-    # This is workaround because brownie currently doesn't support loading the same project multiple
-    # times. This causes problems when using multiple contracts from the same project in the same
-    # python project.
-    PROJECT = project.main.Project("moonworm", Path(PROJECT_DIRECTORY))
-
-    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
-    if not os.path.isfile(abi_full_path):
-        raise IOError(
-            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
-        )
-
-    with open(abi_full_path, "r") as ifp:
-        build = json.load(ifp)
-
-    return ContractContainer(PROJECT, build)
+    # The brownie project is loaded once per process and shared between all the contracts in it -
+    # see wing.registry.
+    return registry.contract_container(abi_name, BUILD_DIRECTORY)
 
 
 class CharactersFacet:
@@ -118,6 +94,10 @@ class CharactersFacet:
         self.assert_contract_is_instantiated()
         return self.contract.createCharacter(player, transaction_config)
 
+    def create_characters(self, players: List, transaction_config) -> Any:
+        self.assert_contract_is_instantiated()
+        return self.contract.createCharacters(players, transaction_config)
+
     def get_approved(
         self, token_id: int, block_number: Optional[Union[str, int]] = "latest"
     ) -> Any:
@@ -231,6 +211,14 @@ class CharactersFacet:
         self.assert_contract_is_instantiated()
         return self.contract.setMetadataValidity(token_id, valid, transaction_config)
 
+    def set_metadata_validity_batch(
+        self, token_ids: List, valid: List, transaction_config
+    ) -> Any:
+        self.assert_contract_is_instantiated()
+        return self.contract.setMetadataValidityBatch(
+            token_ids, valid, transaction_config
+        )
+
     def set_token_uri(
         self,
         token_id: int,
@@ -294,7 +282,13 @@ class CharactersFacet:
 
 
 def get_transaction_config(args: argparse.Namespace) -> Dict[str, Any]:
-    signer = network.accounts.load(args.sender, args.password)
+    if args.signer_agent:
+        # Imported here, as it is also the module of the signer-agent command group (see wing.cli).
+        from . import signer_agent
+
+        signer = signer_agent.load_account(args.sender, args.password)
+    else:
+        signer = network.accounts.load(args.sender, args.password)
     transaction_config: Dict[str, Any] = {"from": signer}
     if args.gas_price is not None:
         transaction_config["gas_price"] = args.gas_price
@@ -332,6 +326,11 @@ def add_default_arguments(parser: argparse.ArgumentParser, transact: bool) -> No
         required=False,
         help="Password to keystore file (if you do not provide it, you will be prompted for it)",
     )
+    parser.add_argument(
+        "--signer-agent",
+        action="store_true",
+        help="Load the sender's account through the wing signer agent, which keeps decrypted keystores in memory across invocations (starts the agent if it is not running)",
+    )
     parser.add_argument(
         "--gas-price", default=None, help="Gas price at which to submit transaction"
     )
@@ -372,14 +371,14 @@ def handle_deploy(args: argparse.Namespace) -> None:
 
 def handle_verify_contract(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.verify_contract()
     print(result)
 
 
 def handle_approve(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.approve(
         operator=args.operator,
@@ -393,21 +392,21 @@ def handle_approve(args: argparse.Namespace) -> None:
 
 def handle_balance_of(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.balance_of(account=args.account, block_number=args.block_number)
     print(result)
 
 
 def handle_contract_uri(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.contract_uri(block_number=args.block_number)
     print(result)
 
 
 def handle_create_character(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.create_character(
         player=args.player, transaction_config=transaction_config
@@ -417,9 +416,21 @@ def handle_create_character(args: argparse.Namespace) -> None:
         print(result.info())
 
 
+def handle_create_characters(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
+    transaction_config = get_transaction_config(args)
+    result = contract.create_characters(
+        players=args.players, transaction_config=transaction_config
+    )
+    print(result)
+    if args.verbose:
+        print(result.info())
+
+
 def handle_get_approved(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.get_approved(
         token_id=args.token_id, block_number=args.block_number
     )
@@ -428,7 +439,7 @@ def handle_get_approved(args: argparse.Namespace) -> None:
 
 def handle_init(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.init(
         admin_terminus_address=args.admin_terminus_address,
@@ -446,14 +457,14 @@ def handle_init(args: argparse.Namespace) -> None:
 
 def handle_inventory(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.inventory(block_number=args.block_number)
     print(result)
 
 
 def handle_is_approved_for_all(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.is_approved_for_all(
         account=args.account, operator=args.operator, block_number=args.block_number
     )
@@ -462,7 +473,7 @@ def handle_is_approved_for_all(args: argparse.Namespace) -> None:
 
 def handle_is_metadata_valid(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.is_metadata_valid(
         token_id=args.token_id, block_number=args.block_number
     )
@@ -471,21 +482,21 @@ def handle_is_metadata_valid(args: argparse.Namespace) -> None:
 
 def handle_name(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.name(block_number=args.block_number)
     print(result)
 
 
 def handle_owner_of(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.owner_of(token_id=args.token_id, block_number=args.block_number)
     print(result)
 
 
 def handle_safe_transfer_from_0x42842e0e(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.safe_transfer_from_0x42842e0e(
         from_=args.from_arg,
@@ -500,7 +511,7 @@ def handle_safe_transfer_from_0x42842e0e(args: argparse.Namespace) -> None:
 
 def handle_safe_transfer_from_0xb88d4fde(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.safe_transfer_from_0xb88d4fde(
         from_=args.from_arg,
@@ -516,7 +527,7 @@ def handle_safe_transfer_from_0xb88d4fde(args: argparse.Namespace) -> None:
 
 def handle_set_approval_for_all(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_approval_for_all(
         operator=args.operator,
@@ -530,7 +541,7 @@ def handle_set_approval_for_all(args: argparse.Namespace) -> None:
 
 def handle_set_contract_information(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_contract_information(
         contract_name=args.contract_name,
@@ -545,7 +556,7 @@ def handle_set_contract_information(args: argparse.Namespace) -> None:
 
 def handle_set_inventory(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_inventory(
         inventory_address=args.inventory_address, transaction_config=transaction_config
@@ -557,7 +568,7 @@ def handle_set_inventory(args: argparse.Namespace) -> None:
 
 def handle_set_metadata_validity(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_metadata_validity(
         token_id=args.token_id, valid=args.valid, transaction_config=transaction_config
@@ -567,9 +578,23 @@ def handle_set_metadata_validity(args: argparse.Namespace) -> None:
         print(result.info())
 
 
+def handle_set_metadata_validity_batch(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
+    transaction_config = get_transaction_config(args)
+    result = contract.set_metadata_validity_batch(
+        token_ids=args.token_ids,
+        valid=args.valid,
+        transaction_config=transaction_config,
+    )
+    print(result)
+    if args.verbose:
+        print(result.info())
+
+
 def handle_set_token_uri(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_token_uri(
         token_id=args.token_id,
@@ -584,7 +609,7 @@ def handle_set_token_uri(args: argparse.Namespace) -> None:
 
 def handle_supports_interface(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.supports_interface(
         interface_id=args.interface_id, transaction_config=transaction_config
@@ -596,21 +621,21 @@ def handle_supports_interface(args: argparse.Namespace) -> None:
 
 def handle_symbol(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.symbol(block_number=args.block_number)
     print(result)
 
 
 def handle_token_by_index(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.token_by_index(index=args.index, block_number=args.block_number)
     print(result)
 
 
 def handle_token_of_owner_by_index(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.token_of_owner_by_index(
         owner=args.owner, index=args.index, block_number=args.block_number
     )
@@ -619,21 +644,21 @@ def handle_token_of_owner_by_index(args: argparse.Namespace) -> None:
 
 def handle_token_uri(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.token_uri(token_id=args.token_id, block_number=args.block_number)
     print(result)
 
 
 def handle_total_supply(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     result = contract.total_supply(block_number=args.block_number)
     print(result)
 
 
 def handle_transfer_from(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = CharactersFacet(args.address)
+    contract = registry.contract_wrapper(CharactersFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.transfer_from(
         from_=args.from_arg,
@@ -683,6 +708,13 @@ def generate_cli() -> argparse.ArgumentParser:
     )
     create_character_parser.set_defaults(func=handle_create_character)
 
+    create_characters_parser = subcommands.add_parser("create-characters")
+    add_default_arguments(create_characters_parser, True)
+    create_characters_parser.add_argument(
+        "--players", required=True, help="Type: address[]", nargs="+"
+    )
+    create_characters_parser.set_defaults(func=handle_create_characters)
+
     get_approved_parser = subcommands.add_parser("get-approved")
     add_default_arguments(get_approved_parser, False)
     get_approved_parser.add_argument(
@@ -824,6 +856,24 @@ def generate_cli() -> argparse.ArgumentParser:
     )
     set_metadata_validity_parser.set_defaults(func=handle_set_metadata_validity)
 
+    set_metadata_validity_batch_parser = subcommands.add_parser(
+        "set-metadata-validity-batch"
+    )
+    add_default_arguments(set_metadata_validity_batch_parser, True)
+    set_metadata_validity_batch_parser.add_argument(
+        "--token-ids", required=True, help="Type: uint256[]", nargs="+"
+    )
+    set_metadata_validity_batch_parser.add_argument(
+        "--valid",
+        required=True,
+        help="Type: bool[]",
+        nargs="+",
+        type=boolean_argument_type,
+    )
+    set_metadata_validity_batch_parser.set_defaults(
+        func=handle_set_metadata_validity_batch
+    )
+
     set_token_uri_parser = subcommands.add_parser("set-token-uri")
     add_default_arguments(set_token_uri_parser, True)
     set_token_uri_parser.add_argument(
@@ -11,6 +11,7 @@ from brownie import Contract, network, project
 from brownie.network.contract import ContractContainer
 from eth_typing.evm import ChecksumAddress
 
+from . import abi, registry
 
 PROJECT_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 BUILD_DIRECTORY = os.path.join(PROJECT_DIRECTORY, "build", "contracts")
@@ -35,38 +36,13 @@ def bytes_argument_type(raw_value: str) -> str:
 
 
 def get_abi_json(abi_name: str) -> List[Dict[str, Any]]:
-    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
-    if not os.path.isfile(abi_full_path):
-        raise IOError(
-            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
-        )
-
-    with open(abi_full_path, "r") as ifp:
-        build = json.load(ifp)
-
-    abi_json = build.get("abi")
-    if abi_json is None:
-        raise ValueError(f"Could not find ABI definition in: {abi_full_path}")
-
-    return abi_json
+    return abi.get_abi_json(abi_name, BUILD_DIRECTORY)
 
 
 def contract_from_build(abi_name: str) -> ContractContainer:
-    # This is workaround because brownie currently doesn't support loading the same project multiple
-    # times. This causes problems when using multiple contracts from the same project in the same
-    # python project.
-    PROJECT = project.main.Project("moonworm", Path(PROJECT_DIRECTORY))
-
-    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
-    if not os.path.isfile(abi_full_path):
-        raise IOError(
-            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
-        )
-
-    with open(abi_full_path, "r") as ifp:
-        build = json.load(ifp)
-
-    return ContractContainer(PROJECT, build)
+    # The brownie project is loaded once per process and shared between all the contracts in it -
+    # see wing.registry.
+    return registry.contract_container(abi_name, BUILD_DIRECTORY)
 
 
 class DiamondCutFacet:
@@ -110,7 +86,13 @@ class DiamondCutFacet:
 
 
 def get_transaction_config(args: argparse.Namespace) -> Dict[str, Any]:
-    signer = network.accounts.load(args.sender, args.password)
+    if args.signer_agent:
+        # Imported here, as it is also the module of the signer-agent command group (see wing.cli).
+        from . import signer_agent
+
+        signer = signer_agent.load_account(args.sender, args.password)
+    else:
+        signer = network.accounts.load(args.sender, args.password)
     transaction_config: Dict[str, Any] = {"from": signer}
     if args.gas_price is not None:
         transaction_config["gas_price"] = args.gas_price
@@ -148,6 +130,11 @@ def add_default_arguments(parser: argparse.ArgumentParser, transact: bool) -> No
         required=False,
         help="Password to keystore file (if you do not provide it, you will be prompted for it)",
     )
+    parser.add_argument(
+        "--signer-agent",
+        action="store_true",
+        help="Load the sender's account through the wing signer agent, which keeps decrypted keystores in memory across invocations (starts the agent if it is not running)",
+    )
     parser.add_argument(
         "--gas-price", default=None, help="Gas price at which to submit transaction"
     )
@@ -188,14 +175,14 @@ def handle_deploy(args: argparse.Namespace) -> None:
 
 def handle_verify_contract(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = DiamondCutFacet(args.address)
+    contract = registry.contract_wrapper(DiamondCutFacet, args.address)
     result = contract.verify_contract()
     print(result)
 
 
 def handle_diamond_cut(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = DiamondCutFacet(args.address)
+    contract = registry.contract_wrapper(DiamondCutFacet, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.diamond_cut(
         _diamond_cut=args.diamond_cut_arg,
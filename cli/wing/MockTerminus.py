@@ -11,6 +11,7 @@ from brownie import Contract, network, project
 from brownie.network.contract import ContractContainer
 from eth_typing.evm import ChecksumAddress
 
+from . import abi, registry
 
 PROJECT_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 BUILD_DIRECTORY = os.path.join(PROJECT_DIRECTORY, "build", "contracts")
@@ -35,38 +36,13 @@ def bytes_argument_type(raw_value: str) -> str:
 
 
 def get_abi_json(abi_name: str) -> List[Dict[str, Any]]:
-    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
-    if not os.path.isfile(abi_full_path):
-        raise IOError(
-            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
-        )
-
-    with open(abi_full_path, "r") as ifp:
-        build = json.load(ifp)
-
-    abi_json = build.get("abi")
-    if abi_json is None:
-        raise ValueError(f"Could not find ABI definition in: {abi_full_path}")
-
-    return abi_json
+    return abi.get_abi_json(abi_name, BUILD_DIRECTORY)
 
 
 def contract_from_build(abi_name: str) -> ContractContainer:
-    # This is workaround because brownie currently doesn't support loading the same project multiple
-    # times. This causes problems when using multiple contracts from the same project in the same
-    # python project.
-    PROJECT = project.main.Project("moonworm", Path(PROJECT_DIRECTORY))
-
-    abi_full_path = os.path.join(BUILD_DIRECTORY, f"{abi_name}.json")
-    if not os.path.isfile(abi_full_path):
-        raise IOError(
-            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
-        )
-
-    with open(abi_full_path, "r") as ifp:
-        build = json.load(ifp)
-
-    return ContractContainer(PROJECT, build)
+    # The brownie project is loaded once per process and shared between all the contracts in it -
+    # see wing.registry.
+    return registry.contract_container(abi_name, BUILD_DIRECTORY)
 
 
 class MockTerminus:
@@ -356,7 +332,13 @@ class MockTerminus:
 
 
 def get_transaction_config(args: argparse.Namespace) -> Dict[str, Any]:
-    signer = network.accounts.load(args.sender, args.password)
+    if args.signer_agent:
+        # Imported here, as it is also the module of the signer-agent command group (see wing.cli).
+        from . import signer_agent
+
+        signer = signer_agent.load_account(args.sender, args.password)
+    else:
+        signer = network.accounts.load(args.sender, args.password)
     transaction_config: Dict[str, Any] = {"from": signer}
     if args.gas_price is not None:
         transaction_config["gas_price"] = args.gas_price
@@ -394,6 +376,11 @@ def add_default_arguments(parser: argparse.ArgumentParser, transact: bool) -> No
         required=False,
         help="Password to keystore file (if you do not provide it, you will be prompted for it)",
     )
+    parser.add_argument(
+        "--signer-agent",
+        action="store_true",
+        help="Load the sender's account through the wing signer agent, which keeps decrypted keystores in memory across invocations (starts the agent if it is not running)",
+    )
     parser.add_argument(
         "--gas-price", default=None, help="Gas price at which to submit transaction"
     )
@@ -434,14 +421,14 @@ def handle_deploy(args: argparse.Namespace) -> None:
 
 def handle_verify_contract(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.verify_contract()
     print(result)
 
 
 def handle_approve_for_pool(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.approve_for_pool(
         pool_id=args.pool_id,
@@ -455,7 +442,7 @@ def handle_approve_for_pool(args: argparse.Namespace) -> None:
 
 def handle_balance_of(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.balance_of(
         account=args.account, id=args.id, block_number=args.block_number
     )
@@ -464,7 +451,7 @@ def handle_balance_of(args: argparse.Namespace) -> None:
 
 def handle_balance_of_batch(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.balance_of_batch(
         accounts=args.accounts, ids=args.ids, block_number=args.block_number
     )
@@ -473,7 +460,7 @@ def handle_balance_of_batch(args: argparse.Namespace) -> None:
 
 def handle_burn(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.burn(
         from_=args.from_arg,
@@ -488,14 +475,14 @@ def handle_burn(args: argparse.Namespace) -> None:
 
 def handle_contract_uri(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.contract_uri(block_number=args.block_number)
     print(result)
 
 
 def handle_create_pool_v1(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.create_pool_v1(
         _capacity=args.capacity_arg,
@@ -510,7 +497,7 @@ def handle_create_pool_v1(args: argparse.Namespace) -> None:
 
 def handle_create_simple_pool(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.create_simple_pool(
         _capacity=args.capacity_arg, transaction_config=transaction_config
@@ -522,7 +509,7 @@ def handle_create_simple_pool(args: argparse.Namespace) -> None:
 
 def handle_is_approved_for_all(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.is_approved_for_all(
         account=args.account, operator=args.operator, block_number=args.block_number
     )
@@ -531,7 +518,7 @@ def handle_is_approved_for_all(args: argparse.Namespace) -> None:
 
 def handle_is_approved_for_pool(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.is_approved_for_pool(
         pool_id=args.pool_id, operator=args.operator, block_number=args.block_number
     )
@@ -540,7 +527,7 @@ def handle_is_approved_for_pool(args: argparse.Namespace) -> None:
 
 def handle_mint(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.mint(
         to=args.to,
@@ -556,7 +543,7 @@ def handle_mint(args: argparse.Namespace) -> None:
 
 def handle_mint_batch(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.mint_batch(
         to=args.to,
@@ -572,21 +559,21 @@ def handle_mint_batch(args: argparse.Namespace) -> None:
 
 def handle_payment_token(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.payment_token(block_number=args.block_number)
     print(result)
 
 
 def handle_pool_base_price(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.pool_base_price(block_number=args.block_number)
     print(result)
 
 
 def handle_pool_is_burnable(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.pool_is_burnable(
         pool_id=args.pool_id, block_number=args.block_number
     )
@@ -595,7 +582,7 @@ def handle_pool_is_burnable(args: argparse.Namespace) -> None:
 
 def handle_pool_is_transferable(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.pool_is_transferable(
         pool_id=args.pool_id, block_number=args.block_number
     )
@@ -604,7 +591,7 @@ def handle_pool_is_transferable(args: argparse.Namespace) -> None:
 
 def handle_pool_mint_batch(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.pool_mint_batch(
         id=args.id,
@@ -619,7 +606,7 @@ def handle_pool_mint_batch(args: argparse.Namespace) -> None:
 
 def handle_safe_batch_transfer_from(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.safe_batch_transfer_from(
         from_=args.from_arg,
@@ -636,7 +623,7 @@ def handle_safe_batch_transfer_from(args: argparse.Namespace) -> None:
 
 def handle_safe_transfer_from(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.safe_transfer_from(
         from_=args.from_arg,
@@ -653,7 +640,7 @@ def handle_safe_transfer_from(args: argparse.Namespace) -> None:
 
 def handle_set_approval_for_all(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_approval_for_all(
         operator=args.operator,
@@ -667,7 +654,7 @@ def handle_set_approval_for_all(args: argparse.Namespace) -> None:
 
 def handle_set_contract_uri(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_contract_uri(
         _contract_uri=args.contract_uri_arg, transaction_config=transaction_config
@@ -679,7 +666,7 @@ def handle_set_contract_uri(args: argparse.Namespace) -> None:
 
 def handle_set_controller(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_controller(
         new_controller=args.new_controller, transaction_config=transaction_config
@@ -691,7 +678,7 @@ def handle_set_controller(args: argparse.Namespace) -> None:
 
 def handle_set_payment_token(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_payment_token(
         new_payment_token=args.new_payment_token, transaction_config=transaction_config
@@ -703,7 +690,7 @@ def handle_set_payment_token(args: argparse.Namespace) -> None:
 
 def handle_set_pool_base_price(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_pool_base_price(
         new_base_price=args.new_base_price, transaction_config=transaction_config
@@ -715,7 +702,7 @@ def handle_set_pool_base_price(args: argparse.Namespace) -> None:
 
 def handle_set_pool_burnable(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_pool_burnable(
         pool_id=args.pool_id,
@@ -729,7 +716,7 @@ def handle_set_pool_burnable(args: argparse.Namespace) -> None:
 
 def handle_set_pool_controller(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_pool_controller(
         pool_id=args.pool_id,
@@ -743,7 +730,7 @@ def handle_set_pool_controller(args: argparse.Namespace) -> None:
 
 def handle_set_pool_transferable(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_pool_transferable(
         pool_id=args.pool_id,
@@ -757,7 +744,7 @@ def handle_set_pool_transferable(args: argparse.Namespace) -> None:
 
 def handle_set_uri(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.set_uri(
         pool_id=args.pool_id,
@@ -771,7 +758,7 @@ def handle_set_uri(args: argparse.Namespace) -> None:
 
 def handle_supports_interface(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.supports_interface(
         interface_id=args.interface_id, block_number=args.block_number
     )
@@ -780,14 +767,14 @@ def handle_supports_interface(args: argparse.Namespace) -> None:
 
 def handle_terminus_controller(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.terminus_controller(block_number=args.block_number)
     print(result)
 
 
 def handle_terminus_pool_capacity(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.terminus_pool_capacity(
         pool_id=args.pool_id, block_number=args.block_number
     )
@@ -796,7 +783,7 @@ def handle_terminus_pool_capacity(args: argparse.Namespace) -> None:
 
 def handle_terminus_pool_controller(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.terminus_pool_controller(
         pool_id=args.pool_id, block_number=args.block_number
     )
@@ -805,7 +792,7 @@ def handle_terminus_pool_controller(args: argparse.Namespace) -> None:
 
 def handle_terminus_pool_supply(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.terminus_pool_supply(
         pool_id=args.pool_id, block_number=args.block_number
     )
@@ -814,21 +801,21 @@ def handle_terminus_pool_supply(args: argparse.Namespace) -> None:
 
 def handle_total_pools(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.total_pools(block_number=args.block_number)
     print(result)
 
 
 def handle_uri(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     result = contract.uri(pool_id=args.pool_id, block_number=args.block_number)
     print(result)
 
 
 def handle_withdraw_payments(args: argparse.Namespace) -> None:
     network.connect(args.network)
-    contract = MockTerminus(args.address)
+    contract = registry.contract_wrapper(MockTerminus, args.address)
     transaction_config = get_transaction_config(args)
     result = contract.withdraw_payments(
         to_address=args.to_address,
@@ -3,12 +3,27 @@ ABI utilities, because web3 doesn't do selectors well.
 """
 
 import glob
+import hashlib
 import json
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
 
 from web3 import Web3
 
+PROJECT_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BUILD_DIRECTORY = os.path.join(PROJECT_DIRECTORY, "build", "contracts")
+
+ARTIFACT_READ_CHUNK_SIZE = 1 << 16
+
+
+def to_hex(data: Any) -> str:
+    """
+    Returns the given bytes or hex string as a 0x-prefixed hex string.
+    """
+    if isinstance(data, (bytes, bytearray)):
+        return "0x" + bytes(data).hex()
+    return data if data.startswith("0x") else f"0x{data}"
+
 
 def abi_input_signature(input_abi: Dict[str, Any]) -> str:
     """
@@ -53,6 +68,209 @@ def encode_function_signature(function_abi: Dict[str, Any]) -> Optional[str]:
     return encoded_signature.hex()
 
 
+def encode_event_topic(event_abi: Dict[str, Any]) -> Optional[str]:
+    """
+    Encodes the given event (from ABI) into its topic0 by calculating:
+    keccak256("<event_name>(<arg_1_type>,...,<arg_n_type>")
+
+    If event_abi is not actually an event ABI (detected by checking if event_abi["type"] == "event"),
+    returns None.
+    """
+    if event_abi["type"] != "event":
+        return None
+    event_signature = abi_function_signature(event_abi)
+    encoded_topic = Web3.keccak(text=event_signature)
+    return encoded_topic.hex()
+
+
+def signature_name(signature: str) -> str:
+    """
+    Returns the function or event name from a signature of the form "<name>(<arg_1_type>,...)".
+    """
+    return signature.split("(", 1)[0]
+
+
+def contract_selectors(contract_abi: List[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """
+    Computes the 4 byte selector of every function and the topic0 of every event in the given
+    contract ABI.
+
+    Returns a dictionary of the form:
+    {
+        "functions": {"<function signature>": "<selector>", ...},
+        "events": {"<event signature>": "<topic0>", ...},
+    }
+
+    Functions and events appear in the same order as they do in the ABI.
+    """
+    functions: Dict[str, str] = {}
+    events: Dict[str, str] = {}
+    for item in contract_abi:
+        if item["type"] == "function":
+            functions[abi_function_signature(item)] = encode_function_signature(item)
+        elif item["type"] == "event":
+            events[abi_function_signature(item)] = encode_event_topic(item)
+    return {"functions": functions, "events": events}
+
+
+# Artifact fields which have already been loaded in this process, keyed by artifact path. Values are
+# of the form (mtime_ns, size, values, scanned_fields). scanned_fields is the set of fields which
+# were searched for in the artifact, or None if values holds the entire artifact.
+_artifact_cache: Dict[
+    str, Tuple[int, int, Dict[str, Any], Optional[FrozenSet[str]]]
+] = {}
+
+
+def _scan_artifact(filepath: str, fields: Iterable[str]) -> Dict[str, Any]:
+    """
+    Extracts the given top-level fields from a JSON build artifact without parsing the whole
+    artifact. The file is read incrementally and scanning stops as soon as all requested fields
+    have been found. Brownie writes artifacts with sorted keys, so "abi" is usually found in the
+    first chunk of the file.
+    """
+    decoder = json.JSONDecoder()
+    remaining = set(fields)
+    result: Dict[str, Any] = {}
+
+    with open(filepath, "r") as ifp:
+        buffer = ifp.read(ARTIFACT_READ_CHUNK_SIZE)
+        position = 0
+        exhausted = len(buffer) < ARTIFACT_READ_CHUNK_SIZE
+        chunk_size = ARTIFACT_READ_CHUNK_SIZE
+
+        def skip_whitespace() -> str:
+            nonlocal buffer, position, exhausted
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\n\r":
+                    position += 1
+                if position < len(buffer) or exhausted:
+                    break
+                buffer = ifp.read(ARTIFACT_READ_CHUNK_SIZE)
+                position = 0
+                exhausted = len(buffer) < ARTIFACT_READ_CHUNK_SIZE
+            if position >= len(buffer):
+                raise ValueError(f"Unexpected end of build artifact: {filepath}")
+            return buffer[position]
+
+        def decode_value() -> Any:
+            nonlocal buffer, position, exhausted, chunk_size
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A number at the end of the buffer may have been truncated.
+                    if end < len(buffer) or exhausted:
+                        break
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise ValueError(f"Invalid build artifact: {filepath}")
+                # Discard what has already been consumed and read more of the file.
+                chunk_size *= 2
+                more = ifp.read(chunk_size)
+                exhausted = len(more) < chunk_size
+                buffer = buffer[position:] + more
+                position = 0
+            position = end
+            return value
+
+        if skip_whitespace() != "{":
+            raise ValueError(f"Build artifact is not a JSON object: {filepath}")
+        position += 1
+
+        while remaining:
+            token = skip_whitespace()
+            if token == "}":
+                break
+            if token == ",":
+                position += 1
+                skip_whitespace()
+            key = decode_value()
+            if skip_whitespace() != ":":
+                raise ValueError(f"Invalid build artifact: {filepath}")
+            position += 1
+            skip_whitespace()
+            value = decode_value()
+            if key in remaining:
+                result[key] = value
+                remaining.discard(key)
+
+    return result
+
+
+def load_artifact(
+    filepath: str, fields: Optional[Sequence[str]] = ("abi",)
+) -> Dict[str, Any]:
+    """
+    Loads the given top-level fields of a JSON build artifact. If fields is None, loads the entire
+    artifact. Fields which are not present in the artifact are not present in the result.
+
+    Results are cached in-process by path, modification time and size, so an artifact which has not
+    changed since it was last loaded is never parsed again.
+
+    Inputs:
+    - filepath
+      Path to build artifact
+    - fields
+      Names of the top-level fields to extract (default: only "abi")
+    """
+    stat = os.stat(filepath)
+    cached = _artifact_cache.get(filepath)
+    if (
+        cached is not None
+        and cached[0] == stat.st_mtime_ns
+        and cached[1] == stat.st_size
+    ):
+        _, _, values, scanned_fields = cached
+        if scanned_fields is None:
+            if fields is None:
+                return values
+            return {field: values[field] for field in fields if field in values}
+        if fields is not None and scanned_fields.issuperset(fields):
+            return {field: values[field] for field in fields if field in values}
+    else:
+        scanned_fields = frozenset()
+
+    if fields is None:
+        with open(filepath, "r") as ifp:
+            values = json.load(ifp)
+        _artifact_cache[filepath] = (stat.st_mtime_ns, stat.st_size, values, None)
+        return values
+
+    scanned_fields = scanned_fields.union(fields)
+    values = _scan_artifact(filepath, scanned_fields)
+    _artifact_cache[filepath] = (
+        stat.st_mtime_ns,
+        stat.st_size,
+        values,
+        scanned_fields,
+    )
+    return {field: values[field] for field in fields if field in values}
+
+
+def get_abi_json(
+    abi_name: str, build_directory: str = BUILD_DIRECTORY
+) -> List[Dict[str, Any]]:
+    """
+    Loads the ABI of the given contract from its build artifact.
+
+    Inputs:
+    - abi_name
+      Name of contract
+    - build_directory
+      Directory containing the build artifacts (default: build/contracts in the wing project)
+    """
+    abi_full_path = os.path.join(build_directory, f"{abi_name}.json")
+    if not os.path.isfile(abi_full_path):
+        raise IOError(
+            f"File does not exist: {abi_full_path}. Maybe you have to compile the smart contracts?"
+        )
+
+    abi_json = load_artifact(abi_full_path).get("abi")
+    if abi_json is None:
+        raise ValueError(f"Could not find ABI definition in: {abi_full_path}")
+
+    return abi_json
+
+
 def project_abis(project_dir: str) -> Dict[str, List[Dict[str, Any]]]:
     """
     Load all ABIs for project contracts and return then in a dictionary keyed by contract name.
@@ -68,11 +286,89 @@ def project_abis(project_dir: str) -> Dict[str, List[Dict[str, Any]]]:
 
     for filepath in build_files:
         contract_name, _ = os.path.splitext(os.path.basename(filepath))
-        with open(filepath, "r") as ifp:
-            contract_artifact = json.load(ifp)
-
-        contract_abi = contract_artifact.get("abi", [])
-
+        contract_abi = load_artifact(filepath).get("abi", [])
         abis[contract_name] = contract_abi
 
     return abis
+
+
+SELECTOR_INDEX_FILE = "wing_selectors.json"
+
+# Selector indices which have already been built in this process, keyed by project directory.
+_selector_indices: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+
+def selector_index(project_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the selector index for all project contracts, keyed by contract name. Each value is of
+    the form returned by contract_selectors, with an additional "hash" key holding the SHA256 hash
+    of the build artifact the selectors were computed from (and "mtime" and "size" keys describing
+    the artifact file when it was last hashed).
+
+    The index is built once per process. It is also stored next to the build artifacts (in
+    build/wing_selectors.json) so that subsequent processes only need to recompute selectors for
+    artifacts whose hashes have changed since the index was last written. Artifacts whose
+    modification time and size have not changed are not even read.
+
+    Inputs:
+    - project_dir
+      Path to brownie project
+    """
+    index = _selector_indices.get(project_dir)
+    if index is not None:
+        return index
+
+    build_dir = os.path.join(project_dir, "build", "contracts")
+    index_path = os.path.join(project_dir, "build", SELECTOR_INDEX_FILE)
+
+    stored_index: Dict[str, Dict[str, Any]] = {}
+    if os.path.isfile(index_path):
+        try:
+            with open(index_path, "r") as ifp:
+                stored_index = json.load(ifp)
+        except (OSError, ValueError):
+            stored_index = {}
+
+    index = {}
+    modified = False
+    for filepath in sorted(glob.glob(os.path.join(build_dir, "*.json"))):
+        contract_name, _ = os.path.splitext(os.path.basename(filepath))
+        stat = os.stat(filepath)
+
+        entry = stored_index.get(contract_name)
+        if (
+            entry is None
+            or entry.get("mtime") != stat.st_mtime_ns
+            or entry.get("size") != stat.st_size
+        ):
+            with open(filepath, "rb") as ifp:
+                artifact_hash = hashlib.sha256(ifp.read()).hexdigest()
+            if entry is None or entry.get("hash") != artifact_hash:
+                contract_abi = load_artifact(filepath).get("abi", [])
+                entry = {"hash": artifact_hash, **contract_selectors(contract_abi)}
+            entry = {**entry, "mtime": stat.st_mtime_ns, "size": stat.st_size}
+            modified = True
+
+        index[contract_name] = entry
+
+    if modified or set(index) != set(stored_index):
+        try:
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as ofp:
+                json.dump(index, ofp)
+            os.replace(temp_path, index_path)
+        except OSError:
+            # The index is only a cache - an unwritable build directory should not prevent anything
+            # from working.
+            pass
+
+    _selector_indices[project_dir] = index
+    return index
+
+
+def clear_selector_index_cache() -> None:
+    """
+    Forgets all selector indices built in this process. Call this if the project is recompiled
+    while the process is running.
+    """
+    _selector_indices.clear()
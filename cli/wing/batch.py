@@ -0,0 +1,260 @@
+"""
+Batch execution of wing commands in a single process.
+
+A batch file lists wing commands, one per line, either as command lines:
+
+    characters owner-of --network mainnet --address 0x... --token-id 1
+    wing terminus balance-of --network mainnet --address 0x... --account 0x... --id 1
+
+(with or without the leading "wing", quoted as in a shell; blank lines and lines starting with # are
+skipped), or as JSON objects of the form {"argv": [<wing arguments>], "stdin": <input, optional>}.
+
+`wing batch` runs every command in the same process, on the same network connection (see
+wing.server.NetworkGate), and writes one line of JSON per command to its output as soon as the
+command (and every command before it) has finished:
+
+    {"line": <line number>, "argv": [...], "exit_code": <exit code>, "stdout": ..., "stderr": ...}
+
+Commands run in the order they are listed, except that consecutive read commands (calls to view
+methods of Great Wyrm contracts, which never change state) run concurrently with each other: each
+read starts as soon as it is read from the batch file. Any other command waits for every command
+before it to finish, and the commands after it wait for it.
+"""
+
+import argparse
+import io
+import json
+import queue
+import shlex
+import sys
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from . import cli, client, server
+
+DEFAULT_CONCURRENCY = 8
+
+# Command groups generated from contract ABIs, whose commands without a --sender are calls to view
+# methods.
+CONTRACT_GROUPS = [
+    "characters",
+    "diamond",
+    "diamond-cut",
+    "diamond-loupe",
+    "ownership",
+    "terminus",
+]
+# Handlers in the contract groups which do not send transactions but are not reads either.
+NON_READ_HANDLERS = ["handle_verify_contract"]
+
+
+class BatchCommand:
+    def __init__(self, line: int, argv: List[str], stdin: str = "") -> None:
+        self.line = line
+        self.argv = argv
+        self.stdin = stdin
+
+
+def parse_batch_line(line_number: int, line: str) -> Optional[BatchCommand]:
+    """
+    Parses a line of a batch file. Returns None for blank lines and comments.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        try:
+            command = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON: {e}")
+        argv = command.get("argv")
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            raise ValueError(
+                f"Line {line_number}: argv must be a list of strings, got: {argv}"
+            )
+        return BatchCommand(line_number, argv, command.get("stdin", ""))
+    try:
+        argv = shlex.split(line)
+    except ValueError as e:
+        raise ValueError(f"Line {line_number}: {e}")
+    if argv and argv[0] == "wing":
+        argv = argv[1:]
+    return BatchCommand(line_number, argv)
+
+
+def read_batch(ifp: IO[str]) -> Iterator[BatchCommand]:
+    for line_number, line in enumerate(ifp, start=1):
+        command = parse_batch_line(line_number, line)
+        if command is not None:
+            yield command
+
+
+class BatchRunner:
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY) -> None:
+        self.wing_server = server.WingServer()
+        self.concurrency = concurrency
+
+    def is_read(self, command: BatchCommand) -> bool:
+        if cli.selected_group(command.argv) not in CONTRACT_GROUPS:
+            return False
+        # Parse errors are reported when the command is run.
+        with self.wing_server.stderr.redirect(io.StringIO()):
+            try:
+                args = self.wing_server.parser(command.argv).parse_args(command.argv)
+            except SystemExit:
+                return False
+        return (
+            hasattr(args, "block_number")
+            and not hasattr(args, "sender")
+            and getattr(args.func, "__name__", None) not in NON_READ_HANDLERS
+        )
+
+    def run_command(self, command: BatchCommand) -> Dict[str, Any]:
+        group = cli.selected_group(command.argv)
+        if group is None or group in client.LOCAL_GROUPS:
+            result = {
+                "exit_code": 2,
+                "stdout": "",
+                "stderr": f"Cannot run in a batch: wing {' '.join(command.argv)}\n",
+            }
+        else:
+            result = self.wing_server.execute(
+                command.argv, interactive=True, stdin=command.stdin
+            )
+        return {"line": command.line, "argv": command.argv, **result}
+
+    def run(self, commands: Iterable[BatchCommand]) -> Iterator[Dict[str, Any]]:
+        """
+        Runs the given commands, yielding their results in order as soon as they are available.
+
+        Commands are read on a separate thread, and read commands are started as soon as they are
+        read, so that results are yielded while waiting for more commands (e.g. from a process
+        which writes them to stdin over time).
+        """
+        # Events for the main loop: ("command", command) for each command that is read, ("done", None)
+        # whenever a read finishes, and ("end", None) or ("error", exception) once there are no
+        # more commands.
+        events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+
+        def read_commands() -> None:
+            try:
+                for command in commands:
+                    events.put(("command", command))
+            except Exception as e:
+                events.put(("error", e))
+            else:
+                events.put(("end", None))
+
+        self.wing_server.install()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                # Reads which have been started, in the order of their commands.
+                reads: Deque[Future] = deque()
+                # The reader is a daemon thread, as it may block on input after the batch has been
+                # stopped (e.g. by --stop-on-error).
+                threading.Thread(target=read_commands, daemon=True).start()
+                while True:
+                    kind, value = events.get()
+                    while reads and reads[0].done():
+                        yield reads.popleft().result()
+                    if kind == "done":
+                        continue
+                    if kind == "command" and self.is_read(value):
+                        read = executor.submit(self.run_command, value)
+                        read.add_done_callback(lambda _: events.put(("done", None)))
+                        reads.append(read)
+                        continue
+                    # Anything other than a read waits for every command before it.
+                    while reads:
+                        yield reads.popleft().result()
+                    if kind == "command":
+                        yield self.run_command(value)
+                    elif kind == "error":
+                        raise value
+                    else:
+                        break
+        finally:
+            self.wing_server.uninstall()
+
+
+def run_batch(
+    commands: Iterable[BatchCommand],
+    ofp: IO[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    stop_on_error: bool = False,
+) -> Tuple[int, int]:
+    """
+    Runs the given commands and writes their results to the given output as NDJSON. Returns the
+    number of commands that were run and the number of them that failed.
+
+    Inputs:
+    - commands
+      Commands to run (e.g. from read_batch)
+    - ofp
+      Output to write the results to
+    - concurrency
+      Maximum number of read commands to run at the same time
+    - stop_on_error
+      If True, does not start any more commands once a command fails
+    """
+    num_commands = 0
+    num_failed = 0
+    results = BatchRunner(concurrency).run(commands)
+    try:
+        for result in results:
+            num_commands += 1
+            print(json.dumps(result), file=ofp, flush=True)
+            if result["exit_code"] != 0:
+                num_failed += 1
+                if stop_on_error:
+                    break
+    finally:
+        results.close()
+    return num_commands, num_failed
+
+
+def handle_run(args: argparse.Namespace) -> None:
+    if args.infile == "-":
+        commands = read_batch(sys.stdin)
+        _, num_failed = run_batch(
+            commands, args.outfile, args.concurrency, args.stop_on_error
+        )
+    else:
+        with open(args.infile, "r") as ifp:
+            _, num_failed = run_batch(
+                read_batch(ifp), args.outfile, args.concurrency, args.stop_on_error
+            )
+    if num_failed > 0:
+        sys.exit(1)
+
+
+def generate_cli() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run many wing commands in a single process, streaming their results as NDJSON"
+    )
+    parser.add_argument(
+        "infile",
+        help="Batch file with one wing command per line, as a command line or a JSON object with an argv key (use - for stdin)",
+    )
+    parser.add_argument(
+        "-o",
+        "--outfile",
+        type=argparse.FileType("w"),
+        default=sys.stdout,
+        help="File to write results to (default: stdout)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum number of read commands to run at the same time (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--stop-on-error",
+        action="store_true",
+        help="Do not run any more commands once a command fails",
+    )
+    parser.set_defaults(func=handle_run)
+    return parser
@@ -0,0 +1,271 @@
+"""
+Commands for Great Wyrm Characters contracts which are not generated from the CharactersFacet ABI.
+
+wing.CharactersFacet is generated by moonworm (see regen.bash), so anything added to it by hand
+would be lost the next time it is regenerated. The characters command group is built by this module
+instead: it consists of the generated commands and the following commands, which make many reads or
+transactions at once:
+- bulk-read
+- snapshot (see wing.snapshot)
+- create-many (see wing.onboarding)
+- moderate (see wing.moderation)
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+from brownie import network
+
+from . import (
+    CharactersFacet,
+    characters_reads,
+    moderation,
+    multicall,
+    onboarding,
+    registry,
+    snapshot,
+    transport,
+)
+
+# Bulk reads available through the bulk-read command, keyed by the names of the corresponding single
+# read commands. Values are of the form (bulk read function, input type).
+BULK_READ_METHODS: Dict[
+    str, Tuple[Callable[..., List[multicall.CallResult]], Callable[[str], Any]]
+] = {
+    "balance-of": (characters_reads.balance_of_many, str),
+    "get-approved": (characters_reads.get_approved_many, int),
+    "is-metadata-valid": (characters_reads.is_metadata_valid_many, int),
+    "owner-of": (characters_reads.owner_of_many, int),
+    "token-by-index": (characters_reads.token_by_index_many, int),
+    "token-uri": (characters_reads.token_uri_many, int),
+}
+
+
+def handle_bulk_read(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    transport.install_from_args(args)
+    contract = registry.contract_wrapper(CharactersFacet.CharactersFacet, args.address)
+    bulk_read, input_type = BULK_READ_METHODS[args.method]
+    inputs = [input_type(raw_input) for raw_input in args.inputs]
+    multicall_address = None if args.no_multicall else args.multicall_address
+    results = bulk_read(
+        contract,
+        inputs,
+        multicall_address=multicall_address,
+        batch_size=args.batch_size,
+        block_number=args.block_number,
+        concurrency=args.concurrency,
+    )
+    for item, result in zip(inputs, results):
+        print(
+            json.dumps(
+                {
+                    "input": item,
+                    "success": result.success,
+                    "value": result.value,
+                    "error": result.error,
+                },
+                default=str,
+            )
+        )
+
+
+def handle_snapshot(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    transport.install_from_args(args)
+    contract = registry.contract_wrapper(CharactersFacet.CharactersFacet, args.address)
+    multicall_address = None if args.no_multicall else args.multicall_address
+    result = snapshot.export_snapshot(
+        contract,
+        args.outfile,
+        block_number=args.block_number,
+        chunk_size=args.chunk_size,
+        concurrency=args.concurrency,
+        multicall_address=multicall_address,
+    )
+    print(
+        f"Wrote snapshot of {result['total_supply']} characters at block {result['block']} to: {args.outfile}"
+    )
+
+
+def handle_create_many(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    contract = registry.contract_wrapper(CharactersFacet.CharactersFacet, args.address)
+    transaction_config = CharactersFacet.get_transaction_config(args)
+    players = onboarding.read_players(args.infile)
+    journal_file = args.journal
+    if journal_file is None:
+        journal_file = onboarding.journal_path(args.infile)
+    report = onboarding.create_characters(
+        contract,
+        players,
+        transaction_config,
+        journal_file,
+        concurrency=args.concurrency,
+        confirmations=args.confirmations if args.confirmations is not None else 1,
+    )
+    print(json.dumps(report, indent=4))
+
+
+def handle_moderate(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    contract = registry.contract_wrapper(CharactersFacet.CharactersFacet, args.address)
+    transaction_config = CharactersFacet.get_transaction_config(args)
+    if args.infile == "-":
+        decisions = moderation.read_decisions(sys.stdin)
+    else:
+        with open(args.infile, "r") as ifp:
+            decisions = moderation.read_decisions(ifp)
+    summary = moderation.moderate(
+        contract,
+        decisions,
+        transaction_config,
+        multicall_address=None if args.no_multicall else args.multicall_address,
+        max_in_flight=args.max_in_flight,
+        confirmations=args.confirmations if args.confirmations is not None else 1,
+    )
+    print(json.dumps(summary, indent=4))
+
+
+def subcommands_action(parser: argparse.ArgumentParser) -> argparse._SubParsersAction:
+    """
+    Returns the action which holds the subcommands of the given parser.
+    """
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return action
+    raise ValueError("Parser has no subcommands")
+
+
+def generate_cli() -> argparse.ArgumentParser:
+    parser = CharactersFacet.generate_cli()
+    subcommands = subcommands_action(parser)
+
+    bulk_read_parser = subcommands.add_parser(
+        "bulk-read",
+        description="Make the same read for many inputs, through Multicall3 or concurrent (optionally JSON-RPC batched) calls. Prints one JSON object per input.",
+    )
+    CharactersFacet.add_default_arguments(bulk_read_parser, False)
+    bulk_read_parser.add_argument(
+        "--method", required=True, choices=BULK_READ_METHODS, help="Read to make"
+    )
+    bulk_read_parser.add_argument(
+        "--inputs",
+        nargs="+",
+        required=True,
+        help="Inputs to the read (token IDs, indices, or accounts for balance-of)",
+    )
+    bulk_read_parser.add_argument(
+        "--multicall-address",
+        default=multicall.MULTICALL3_ADDRESS,
+        help=f"Address of Multicall3 contract (default: {multicall.MULTICALL3_ADDRESS})",
+    )
+    bulk_read_parser.add_argument(
+        "--no-multicall",
+        action="store_true",
+        help="Make calls concurrently instead of through Multicall3 (use --rpc-batch-size to batch them)",
+    )
+    bulk_read_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=multicall.DEFAULT_BATCH_SIZE,
+        help=f"Number of calls per multicall (default: {multicall.DEFAULT_BATCH_SIZE})",
+    )
+    bulk_read_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=multicall.DEFAULT_CONCURRENCY,
+        help=f"Number of concurrent calls with --no-multicall (default: {multicall.DEFAULT_CONCURRENCY})",
+    )
+    transport.add_batch_arguments(bulk_read_parser)
+    bulk_read_parser.set_defaults(func=handle_bulk_read)
+
+    snapshot_parser = subcommands.add_parser(
+        "snapshot",
+        description="Write the token ID, owner, metadata URI and metadata validity of every character at a single block to a columnar JSON file. Interrupted snapshots are resumed when run again with the same output file.",
+    )
+    CharactersFacet.add_default_arguments(snapshot_parser, False)
+    snapshot_parser.add_argument(
+        "-o", "--outfile", required=True, help="File to write snapshot to"
+    )
+    snapshot_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=snapshot.DEFAULT_CHUNK_SIZE,
+        help=f"Number of characters to read in each chunk (default: {snapshot.DEFAULT_CHUNK_SIZE})",
+    )
+    snapshot_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=snapshot.DEFAULT_CONCURRENCY,
+        help=f"Number of chunks to read at the same time (default: {snapshot.DEFAULT_CONCURRENCY})",
+    )
+    snapshot_parser.add_argument(
+        "--multicall-address",
+        default=multicall.MULTICALL3_ADDRESS,
+        help=f"Address of Multicall3 contract (default: {multicall.MULTICALL3_ADDRESS})",
+    )
+    snapshot_parser.add_argument(
+        "--no-multicall",
+        action="store_true",
+        help="Make calls concurrently instead of through Multicall3 (use --rpc-batch-size to batch them)",
+    )
+    transport.add_batch_arguments(snapshot_parser)
+    snapshot_parser.set_defaults(func=handle_snapshot)
+
+    create_many_parser = subcommands.add_parser(
+        "create-many",
+        description="Create a character for every player in a CSV or NDJSON file, submitting transactions concurrently. Progress is journaled, and interrupted runs are resumed when run again with the same journal.",
+    )
+    CharactersFacet.add_default_arguments(create_many_parser, True)
+    create_many_parser.add_argument(
+        "-i",
+        "--infile",
+        required=True,
+        help="CSV or NDJSON (.ndjson, .jsonl) file of player addresses",
+    )
+    create_many_parser.add_argument(
+        "--journal",
+        default=None,
+        help="Path to journal file (default: <infile>.journal)",
+    )
+    create_many_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=onboarding.DEFAULT_CONCURRENCY,
+        help=f"Maximum number of transactions in flight at the same time (default: {onboarding.DEFAULT_CONCURRENCY})",
+    )
+    create_many_parser.set_defaults(func=handle_create_many)
+
+    moderate_parser = subcommands.add_parser(
+        "moderate",
+        description='Set the metadata validity of many characters. Decisions are read as CSV (token_id,valid) or NDJSON ({"token_id": ..., "valid": ...}) lines, and only tokens whose validity would change are submitted.',
+    )
+    CharactersFacet.add_default_arguments(moderate_parser, True)
+    moderate_parser.add_argument(
+        "-i",
+        "--infile",
+        default="-",
+        help="File to read decisions from (default: stdin)",
+    )
+    moderate_parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=moderation.DEFAULT_MAX_IN_FLIGHT,
+        help=f"Maximum number of unconfirmed transactions at any time (default: {moderation.DEFAULT_MAX_IN_FLIGHT})",
+    )
+    moderate_parser.add_argument(
+        "--multicall-address",
+        default=multicall.MULTICALL3_ADDRESS,
+        help=f"Address of Multicall3 contract (default: {multicall.MULTICALL3_ADDRESS})",
+    )
+    moderate_parser.add_argument(
+        "--no-multicall",
+        action="store_true",
+        help="Read current validities with concurrent calls instead of through Multicall3",
+    )
+    moderate_parser.set_defaults(func=handle_moderate)
+
+    return parser
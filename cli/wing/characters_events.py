@@ -66,3 +66,23 @@ TOKEN_VALIDITY_SET = {
     "name": "TokenValiditySet",
     "type": "event",
 }
+TRANSFER = {
+    "anonymous": False,
+    "inputs": [
+        {
+            "indexed": True,
+            "internalType": "address",
+            "name": "from",
+            "type": "address",
+        },
+        {"indexed": True, "internalType": "address", "name": "to", "type": "address"},
+        {
+            "indexed": True,
+            "internalType": "uint256",
+            "name": "tokenId",
+            "type": "uint256",
+        },
+    ],
+    "name": "Transfer",
+    "type": "event",
+}
@@ -0,0 +1,91 @@
+"""
+Bulk reads of Great Wyrm Characters contracts.
+
+Each function makes the same read of a CharactersFacet contract for many inputs, through Multicall3
+or concurrent calls (see wing.multicall.aggregate), and returns the results in the same order as the
+inputs. Keyword arguments are passed on to read_many.
+"""
+
+from typing import Any, List, Optional
+
+from eth_typing.evm import ChecksumAddress
+
+from . import CharactersFacet, multicall
+
+
+def read_many(
+    contract: CharactersFacet.CharactersFacet,
+    method_name: str,
+    inputs: List[Any],
+    multicall_address: Optional[ChecksumAddress] = multicall.MULTICALL3_ADDRESS,
+    batch_size: int = multicall.DEFAULT_BATCH_SIZE,
+    block_number: Optional[int] = None,
+    concurrency: int = multicall.DEFAULT_CONCURRENCY,
+) -> List[multicall.CallResult]:
+    """
+    Calls the given single-argument view method of the contract once for each of the given inputs.
+
+    Inputs:
+    - contract
+      CharactersFacet object for the contract
+    - method_name
+      Name of the view method in the contract ABI (e.g. ownerOf)
+    - inputs
+      Argument to call the method with for each read
+    - multicall_address
+      Address of Multicall3 contract to make reads through. If None, reads are made as concurrent
+      individual calls.
+    - batch_size
+      Number of calls per multicall
+    - block_number
+      Block at which to make the reads (default: latest block)
+    - concurrency
+      Number of concurrent calls without Multicall3
+    """
+    contract.assert_contract_is_instantiated()
+    method = getattr(contract.contract, method_name)
+    return multicall.aggregate(
+        [(method, (item,)) for item in inputs],
+        multicall_address=multicall_address,
+        batch_size=batch_size,
+        block_number=block_number,
+        concurrency=concurrency,
+    )
+
+
+def balance_of_many(
+    contract: CharactersFacet.CharactersFacet,
+    accounts: List[ChecksumAddress],
+    **kwargs: Any,
+) -> List[multicall.CallResult]:
+    return read_many(contract, "balanceOf", accounts, **kwargs)
+
+
+def get_approved_many(
+    contract: CharactersFacet.CharactersFacet, token_ids: List[int], **kwargs: Any
+) -> List[multicall.CallResult]:
+    return read_many(contract, "getApproved", token_ids, **kwargs)
+
+
+def is_metadata_valid_many(
+    contract: CharactersFacet.CharactersFacet, token_ids: List[int], **kwargs: Any
+) -> List[multicall.CallResult]:
+    return read_many(contract, "isMetadataValid", token_ids, **kwargs)
+
+
+def owner_of_many(
+    contract: CharactersFacet.CharactersFacet, token_ids: List[int], **kwargs: Any
+) -> List[multicall.CallResult]:
+    return read_many(contract, "ownerOf", token_ids, **kwargs)
+
+
+def token_by_index_many(
+    contract: CharactersFacet.CharactersFacet, indices: List[int], **kwargs: Any
+) -> List[multicall.CallResult]:
+    return read_many(contract, "tokenByIndex", indices, **kwargs)
+
+
+def token_uri_many(
+    contract: CharactersFacet.CharactersFacet, token_ids: List[int], **kwargs: Any
+) -> List[multicall.CallResult]:
+    return read_many(contract, "tokenURI", token_ids, **kwargs)
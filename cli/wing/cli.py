@@ -1,16 +1,58 @@
 import argparse
+import importlib
+import sys
+from typing import Dict, List, Optional, Tuple
 
-from .core import generate_cli as core_generate_cli
-from .CharactersFacet import generate_cli as characters_generate_cli
-from .Diamond import generate_cli as diamond_generate_cli
-from .DiamondCutFacet import generate_cli as diamond_cut_generate_cli
-from .DiamondLoupeFacet import generate_cli as diamond_loupe_generate_cli
-from .OwnershipFacet import generate_cli as ownership_generate_cli
-from .MockTerminus import generate_cli as terminus_generate_cli
+from . import client
 from .version import VERSION
 
-
-def generate_cli() -> argparse.ArgumentParser:
+# Top-level command groups, mapping the name of each group to the module which implements it (as
+# a module name relative to this package) and a short description. A group's module is only
+# imported when that group is selected on the command line, so that invocations like
+# `wing --version` or `wing characters owner-of` do not pay for importing (and building argument
+# parsers for) every other group.
+COMMAND_GROUPS: Dict[str, Tuple[str, str]] = {
+    "core": (".core", "Deploy and manage Great Wyrm contracts"),
+    "characters": (".characters", "Interact with Great Wyrm Characters"),
+    "diamond": (".Diamond", "Interact with the Diamond proxy contract"),
+    "diamond-cut": (".DiamondCutFacet", "Interact with DiamondCutFacet"),
+    "diamond-loupe": (".DiamondLoupeFacet", "Interact with DiamondLoupeFacet"),
+    "ownership": (".OwnershipFacet", "Interact with OwnershipFacet"),
+    "terminus": (".MockTerminus", "Interact with Terminus contracts"),
+    "index": (".indexer", "Maintain and query a local index of Characters events"),
+    "routing": (".routing", "Look up facets from cached Diamond routing tables"),
+    "batch": (".batch", "Run many wing commands in a single process"),
+    "serve": (
+        ".server",
+        "Run a long-lived wing server which other wing invocations forward to",
+    ),
+    "signer-agent": (
+        ".signer_agent",
+        "Keep decrypted keystores in memory across wing invocations",
+    ),
+}
+
+
+def selected_group(argv: List[str]) -> Optional[str]:
+    """
+    Returns the name of the command group selected by the given command line arguments, if any.
+
+    None of the top-level options take values, so the group is the first argument which is not an
+    option.
+    """
+    for arg in argv:
+        if not arg.startswith("-"):
+            return arg if arg in COMMAND_GROUPS else None
+    return None
+
+
+def generate_cli(argv: Optional[List[str]] = None) -> argparse.ArgumentParser:
+    """
+    Generates the wing argument parser.
+
+    If argv is provided, only the command group selected by argv is fully built. Otherwise, every
+    command group is built.
+    """
     parser = argparse.ArgumentParser(
         description="Wing: Command line interface to Great Wyrm contracts"
     )
@@ -19,34 +61,28 @@ def generate_cli() -> argparse.ArgumentParser:
 
     subparsers = parser.add_subparsers()
 
-    core_parser = core_generate_cli()
-    subparsers.add_parser("core", parents=[core_parser], add_help=False)
-
-    characters_parser = characters_generate_cli()
-    subparsers.add_parser("characters", parents=[characters_parser], add_help=False)
-
-    diamond_parser = diamond_generate_cli()
-    subparsers.add_parser("diamond", parents=[diamond_parser], add_help=False)
-
-    diamond_cut_parser = diamond_cut_generate_cli()
-    subparsers.add_parser("diamond-cut", parents=[diamond_cut_parser], add_help=False)
-
-    diamond_loupe_parser = diamond_loupe_generate_cli()
-    subparsers.add_parser(
-        "diamond-loupe", parents=[diamond_loupe_parser], add_help=False
-    )
-
-    ownership_parser = ownership_generate_cli()
-    subparsers.add_parser("ownership", parents=[ownership_parser], add_help=False)
-
-    terminus_parser = terminus_generate_cli()
-    subparsers.add_parser("terminus", parents=[terminus_parser], add_help=False)
+    group = selected_group(argv) if argv is not None else None
+    for name, (module_name, description) in COMMAND_GROUPS.items():
+        if argv is None or name == group:
+            module = importlib.import_module(module_name, __package__)
+            group_parser = module.generate_cli()
+            subparsers.add_parser(
+                name, parents=[group_parser], add_help=False, help=description
+            )
+        else:
+            subparsers.add_parser(name, help=description)
 
     return parser
 
 
 def main() -> None:
-    parser = generate_cli()
+    argv = sys.argv[1:]
+    if client.should_forward(selected_group(argv)):
+        exit_code = client.forward(argv)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    parser = generate_cli(argv)
     args = parser.parse_args()
     args.func(args)
 
@@ -0,0 +1,97 @@
+"""
+Thin client for `wing serve`.
+
+When a wing server (see wing.server) is listening on its socket, `wing` forwards its command line to
+the server and prints the output the server sends back, instead of importing brownie, connecting to
+the network and loading contracts itself. If no server is running, or if the server cannot run the
+command as it would run locally (e.g. because it was started in a different working directory),
+`wing` runs the command locally as usual.
+
+This module is imported on every invocation of `wing`, so it must stay light: it must not import
+brownie (or anything else that takes a noticeable time to import).
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+SERVER_SOCKET_ENV_VAR = "WING_SERVER_SOCKET"
+SERVER_SOCKET_NAME = "wing-server.sock"
+# Set this environment variable to any non-empty value to never forward commands to a server.
+NO_SERVER_ENV_VAR = "WING_NO_SERVER"
+
+# Command groups which are never forwarded: the server itself, the signer agent (which must run in
+# its own process), and batches (which read their commands from the client's files).
+LOCAL_GROUPS = ["serve", "signer-agent", "batch"]
+
+
+def runtime_socket_path(socket_name: str) -> str:
+    """
+    Returns the default path for a wing Unix socket with the given name: in XDG_RUNTIME_DIR if it is
+    set, and in a directory private to the current user in the temporary directory otherwise.
+    """
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory:
+        return os.path.join(runtime_directory, socket_name)
+    return os.path.join(tempfile.gettempdir(), f"wing-{os.getuid()}", socket_name)
+
+
+def default_socket_path() -> str:
+    return os.environ.get(SERVER_SOCKET_ENV_VAR) or runtime_socket_path(
+        SERVER_SOCKET_NAME
+    )
+
+
+def connect(socket_path: Optional[str] = None) -> Optional[socket.socket]:
+    """
+    Connects to the wing server. Returns None if no server is listening.
+    """
+    if socket_path is None:
+        socket_path = default_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def command_request(argv: List[str]) -> Dict[str, Any]:
+    return {"argv": argv, "cwd": os.getcwd()}
+
+
+def forward(argv: List[str], socket_path: Optional[str] = None) -> Optional[int]:
+    """
+    Runs the given wing command line on the wing server, and writes its output to this process's
+    stdout and stderr. Returns the exit code of the command, or None if the command was not run by a
+    server (in which case it should be run locally).
+    """
+    sock = connect(socket_path)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps(command_request(argv)) + "\n").encode("utf-8"))
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        return None
+    response = json.loads(line)
+    if response.get("fallback"):
+        return None
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    return response.get("exit_code", 1)
+
+
+def should_forward(group: Optional[str]) -> bool:
+    return (
+        group is not None
+        and group not in LOCAL_GROUPS
+        and not os.environ.get(NO_SERVER_ENV_VAR)
+    )
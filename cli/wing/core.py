@@ -4,7 +4,7 @@ import os
 import sys
 import time
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from brownie import network
 
@@ -15,6 +15,11 @@ from . import (
     DiamondLoupeFacet,
     OwnershipFacet,
     abi,
+    create2,
+    dryrun,
+    nonces,
+    registry,
+    routing,
 )
 
 FACETS: Dict[str, Any] = {
@@ -25,8 +30,8 @@ FACETS: Dict[str, Any] = {
 }
 
 FACET_INIT_CALLDATA: Dict[str, Callable] = {
-    "CharactersFacet": lambda address, *args: CharactersFacet.CharactersFacet(
-        address
+    "CharactersFacet": lambda address, *args: registry.contract_wrapper(
+        CharactersFacet.CharactersFacet, address
     ).contract.init.encode_input(*args)
 }
 
@@ -67,23 +72,30 @@ FACET_ACTIONS: Dict[str, int] = {"add": 0, "replace": 1, "remove": 2}
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
+# Order in which deployment failures are reported. Only the Diamond depends on another contract
+# (DiamondCutFacet) - every other contract is deployed concurrently.
+DEPLOYMENT_ORDER: List[str] = [
+    "DiamondCutFacet",
+    "Diamond",
+    "DiamondLoupeFacet",
+    "OwnershipFacet",
+    "CharactersFacet",
+]
 
-def facet_cut(
-    diamond_address: str,
+
+def plan_facet_cut(
     facet_name: str,
     facet_address: str,
     action: str,
-    transaction_config: Dict[str, Any],
-    initializer_address: str = ZERO_ADDRESS,
     ignore_methods: Optional[List[str]] = None,
     ignore_selectors: Optional[List[str]] = None,
     methods: Optional[List[str]] = None,
     selectors: Optional[List[str]] = None,
     feature: Optional[WingFeatures] = None,
-    initializer_args: Optional[List[Any]] = None,
-) -> Any:
+) -> List[Any]:
     """
-    Cuts the given facet onto the given Diamond contract.
+    Plans the cut of the given facet onto a Diamond contract. Returns the FacetCut, in the form
+    [facet_address, action, selectors] accepted by IDiamondCut.diamondCut.
 
     Resolves selectors in the precedence order defined by FACET_PRECEDENCE (highest precedence first).
     """
@@ -111,33 +123,28 @@ def facet_cut(
     project_dir = os.path.abspath(
         os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
     )
-    abis = abi.project_abis(project_dir)
+    index = abi.selector_index(project_dir)
 
     reserved_selectors: Set[str] = set()
     for facet in facet_precedence:
-        facet_abi = abis.get(facet, [])
+        facet_functions = index.get(facet, {}).get("functions", {})
         if facet == facet_name:
             # Add feature ignores to reserved_selectors then break out of facet iteration
             if feature is not None:
                 feature_ignores = FEATURE_IGNORES[feature]
-                for item in facet_abi:
-                    if (
-                        item["type"] == "function"
-                        and item["name"] in feature_ignores["methods"]
-                    ):
-                        reserved_selectors.add(abi.encode_function_signature(item))
+                for signature, selector in facet_functions.items():
+                    if abi.signature_name(signature) in feature_ignores["methods"]:
+                        reserved_selectors.add(selector)
 
                 for selector in feature_ignores["selectors"]:
                     reserved_selectors.add(selector)
 
             break
 
-        for item in facet_abi:
-            if item["type"] == "function":
-                reserved_selectors.add(abi.encode_function_signature(item))
+        reserved_selectors.update(facet_functions.values())
 
     facet_function_selectors: List[str] = []
-    facet_abi = abis.get(facet_name, [])
+    facet_functions = index.get(facet_name, {}).get("functions", {})
 
     logical_operator = all
     method_predicate = lambda method: method not in ignore_methods
@@ -151,134 +158,459 @@ def facet_cut(
         method_predicate = lambda method: method in methods
         selector_predicate = lambda selector: selector in selectors
 
-    for item in facet_abi:
-        if item["type"] == "function":
-            item_selector = abi.encode_function_signature(item)
-            if logical_operator(
-                [method_predicate(item["name"]), selector_predicate(item_selector)]
-            ):
-                facet_function_selectors.append(item_selector)
+    for signature, item_selector in facet_functions.items():
+        if logical_operator(
+            [
+                method_predicate(abi.signature_name(signature)),
+                selector_predicate(item_selector),
+            ]
+        ):
+            facet_function_selectors.append(item_selector)
 
     target_address = facet_address
     if FACET_ACTIONS[action] == 2:
         target_address = ZERO_ADDRESS
 
-    diamond_cut_action = [
+    return [
         target_address,
         FACET_ACTIONS[action],
         facet_function_selectors,
     ]
 
-    diamond = DiamondCutFacet.DiamondCutFacet(diamond_address)
-    calldata = b""
-    if FACET_INIT_CALLDATA.get(facet_name) is not None:
-        if initializer_args is None:
-            initializer_args = []
-        calldata = FACET_INIT_CALLDATA[facet_name](
-            initializer_address, *initializer_args
+
+def initializer_calldata(
+    facet_name: str,
+    initializer_address: str,
+    initializer_args: Optional[List[Any]] = None,
+) -> bytes:
+    """
+    Returns the calldata for the initializer of the given facet (empty if the facet does not have an
+    initializer).
+    """
+    if FACET_INIT_CALLDATA.get(facet_name) is None:
+        return b""
+    if initializer_args is None:
+        initializer_args = []
+    return FACET_INIT_CALLDATA[facet_name](initializer_address, *initializer_args)
+
+
+def multi_facet_cut(
+    diamond_address: str,
+    cuts: List[List[Any]],
+    transaction_config: Dict[str, Any],
+    initializer_address: str = ZERO_ADDRESS,
+    calldata: bytes = b"",
+) -> Any:
+    """
+    Applies the given FacetCuts (see plan_facet_cut) to the given Diamond contract in a single
+    diamondCut transaction, calling the given initializer (if any) once all the cuts are in place.
+    """
+    diamond = registry.contract_wrapper(
+        DiamondCutFacet.DiamondCutFacet, diamond_address
+    )
+    return diamond.diamond_cut(cuts, initializer_address, calldata, transaction_config)
+
+
+def facet_cut(
+    diamond_address: str,
+    facet_name: str,
+    facet_address: str,
+    action: str,
+    transaction_config: Dict[str, Any],
+    initializer_address: str = ZERO_ADDRESS,
+    ignore_methods: Optional[List[str]] = None,
+    ignore_selectors: Optional[List[str]] = None,
+    methods: Optional[List[str]] = None,
+    selectors: Optional[List[str]] = None,
+    feature: Optional[WingFeatures] = None,
+    initializer_args: Optional[List[Any]] = None,
+) -> Any:
+    """
+    Cuts the given facet onto the given Diamond contract.
+
+    Resolves selectors in the precedence order defined by FACET_PRECEDENCE (highest precedence first).
+    """
+    diamond_cut_action = plan_facet_cut(
+        facet_name,
+        facet_address,
+        action,
+        ignore_methods=ignore_methods,
+        ignore_selectors=ignore_selectors,
+        methods=methods,
+        selectors=selectors,
+        feature=feature,
+    )
+    calldata = initializer_calldata(facet_name, initializer_address, initializer_args)
+    return multi_facet_cut(
+        diamond_address,
+        [diamond_cut_action],
+        transaction_config,
+        initializer_address,
+        calldata,
+    )
+
+
+def diff_routing(
+    routing: Dict[str, str],
+    targets: Dict[str, str],
+    replaced_addresses: Set[str],
+) -> Dict[str, Any]:
+    """
+    Computes the minimal set of FacetCuts which take a Diamond from its current routing to the
+    target routing.
+
+    Inputs:
+    - routing
+      Current routing of the Diamond (selector -> facet address, see routing.diamond_routing)
+    - targets
+      Selectors which should be routed to new facet addresses (selector -> facet address)
+    - replaced_addresses
+      Addresses of the facets being upgraded. Selectors currently routed to these addresses which
+      are not in targets are removed.
+
+    Returns a plan of the form:
+    {
+        "cuts": [[facet_address, action, selectors], ...],
+        "add": <number of selectors added>,
+        "replace": <number of selectors replaced>,
+        "remove": <number of selectors removed>,
+        "unchanged": <number of target selectors which are already routed correctly>,
+    }
+
+    Cuts are grouped by action (adds, then replaces, then the removal) and by facet address.
+    """
+    replaced = {address.lower() for address in replaced_addresses}
+    grouped: Dict[Tuple[int, str], List[str]] = {}
+    counts = {action: 0 for action in FACET_ACTIONS}
+    unchanged = 0
+
+    for selector, facet_address in targets.items():
+        current_address = routing.get(selector)
+        if current_address is None:
+            action = "add"
+        elif current_address.lower() == facet_address.lower():
+            unchanged += 1
+            continue
+        else:
+            action = "replace"
+        grouped.setdefault((FACET_ACTIONS[action], facet_address), []).append(selector)
+        counts[action] += 1
+
+    for selector, facet_address in routing.items():
+        if facet_address.lower() in replaced and selector not in targets:
+            grouped.setdefault((FACET_ACTIONS["remove"], ZERO_ADDRESS), []).append(
+                selector
+            )
+            counts["remove"] += 1
+
+    cuts = [
+        [facet_address, action, selectors]
+        for (action, facet_address), selectors in sorted(
+            grouped.items(), key=lambda item: item[0][0]
+        )
+    ]
+    return {"cuts": cuts, **counts, "unchanged": unchanged}
+
+
+def plan_upgrade(
+    diamond_address: str,
+    facets: Dict[str, str],
+    ignore_methods: Optional[List[str]] = None,
+    ignore_selectors: Optional[List[str]] = None,
+    block_number: Optional[Union[str, int]] = "latest",
+) -> Dict[str, Any]:
+    """
+    Plans the upgrade of the given facets on a deployed Diamond contract. Unlike facet_cut, which
+    decides what to cut from the local ABIs alone, this compares the local ABIs against the routing
+    the Diamond actually has, so that the upgrade only touches the selectors which changed:
+    - selectors which the Diamond does not route yet are added
+    - selectors which the Diamond routes to a different address are replaced
+    - selectors which the Diamond routes to a previous deployment of an upgraded facet, but which
+      the new deployment does not define, are removed
+
+    The returned plan is of the form returned by diff_routing, and its cuts can be applied in a
+    single transaction with multi_facet_cut.
+
+    Inputs:
+    - diamond_address
+      Address of the Diamond contract
+    - facets
+      Dictionary mapping the name of each facet to upgrade to the address of its new deployment
+    - ignore_methods
+      Names of methods to leave alone
+    - ignore_selectors
+      Selectors to leave alone
+    - block_number
+      Block at which to read the Diamond's routing
+    """
+    current_routing = routing.diamond_routing(diamond_address, block_number)
+    if ignore_methods is None:
+        ignore_methods = []
+    ignored = {
+        routing.normalize_selector(selector) for selector in ignore_selectors or []
+    }
+
+    project_dir = os.path.abspath(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    )
+    index = abi.selector_index(project_dir)
+
+    targets: Dict[str, str] = {}
+    replaced_addresses: Set[str] = set()
+    for facet_name, facet_address in facets.items():
+        for signature, selector in (
+            index.get(facet_name, {}).get("functions", {}).items()
+        ):
+            if abi.signature_name(signature) in ignore_methods:
+                ignored.add(routing.normalize_selector(selector))
+
+        _, _, selectors = plan_facet_cut(
+            facet_name,
+            facet_address,
+            "add",
+            feature=feature_from_facet_name(facet_name),
         )
-    transaction = diamond.diamond_cut(
-        [diamond_cut_action], initializer_address, calldata, transaction_config
+        for selector in selectors:
+            selector = routing.normalize_selector(selector)
+            targets[selector] = facet_address
+            # Every address which currently routes one of the facet's selectors is a previous
+            # deployment of the facet. Selectors which the facet shares with facets of higher
+            # precedence (e.g. supportsInterface) are not considered, as plan_facet_cut leaves them
+            # out.
+            if selector in current_routing:
+                replaced_addresses.add(current_routing[selector])
+
+    # Immutable functions are routed to the Diamond itself, and can be neither replaced nor removed.
+    # Ignored selectors are left exactly as they are.
+    ignored.update(
+        selector
+        for selector, current_address in current_routing.items()
+        if current_address.lower() == diamond_address.lower()
     )
-    return transaction
+    targets = {
+        selector: facet_address
+        for selector, facet_address in targets.items()
+        if selector not in ignored
+    }
+    current_routing = {
+        selector: current_address
+        for selector, current_address in current_routing.items()
+        if selector not in ignored
+    }
 
+    return diff_routing(current_routing, targets, replaced_addresses)
 
-def diamond_gogogo(
+
+def deploy_contracts(
     owner_address: str,
     transaction_config: Dict[str, Any],
-    diamond_cut_address: Optional[str] = None,
-    diamond_address: Optional[str] = None,
-    diamond_loupe_address: Optional[str] = None,
-    ownership_address: Optional[str] = None,
+    addresses: Dict[str, Optional[str]],
+    create2_factory: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
-    Deploy diamond along with all its basic facets and attach those facets to the diamond.
-
-    Returns addresses of all the deployed contracts with the contract names as keys.
+    Deploys the contracts in DEPLOYMENT_ORDER whose addresses are missing (None) in the addresses
+    argument. Contracts which are listed with an address are reused.
+
+    Deployments which do not depend on each other are sent back to back, with nonces allocated by
+    the sender's NonceManager, and their receipts are awaited together. The Diamond is sent as soon
+    as the DiamondCutFacet (which its constructor attaches) has been deployed.
+
+    If create2_factory is set, facets (every contract other than the Diamond, which is specific to
+    each deployment) are deployed through that CREATE2 factory instead, at addresses derived from
+    their bytecode (see wing.create2). Facets which are already deployed at those addresses are
+    reused without sending anything.
+
+    Returns a result of the form {"contracts": {<contract name>: <address>}, "attached": []}, with an
+    additional "reused" key listing the reused facets if create2_factory is set.
+
+    If a deployment cannot be sent, no further deployments are sent. Deployments which were already
+    sent are in flight at the same time, so one of them reverting does not stop the others, which
+    may still deploy. In either case, the result has an "error" key which names the first failed
+    deployment (in DEPLOYMENT_ORDER), the contracts which were deployed successfully are still
+    reported, and the reasons for the failures are printed to stderr.
     """
     result: Dict[str, Any] = {"contracts": {}, "attached": []}
-
-    if diamond_cut_address is None:
+    if create2_factory is not None:
+        if not create2.is_deployed(create2_factory):
+            raise ValueError(
+                f"There is no CREATE2 factory at {create2_factory}. Deploy contracts/utils/Create2Factory.sol (wing core create2-factory) or use the deterministic deployment proxy at {create2.DETERMINISTIC_DEPLOYER_ADDRESS}."
+            )
+        result["reused"] = []
+    manager = nonces.get_nonce_manager(str(transaction_config["from"]))
+    # Other transactions may have been sent from the same account since the manager was last used.
+    manager.sync()
+    config = {
+        key: value
+        for key, value in transaction_config.items()
+        if key not in ("nonce", "required_confs")
+    }
+
+    deployed: Dict[str, str] = {
+        name: address for name, address in addresses.items() if address is not None
+    }
+    pending: Dict[str, Any] = {}
+    failures: Dict[str, Exception] = {}
+    # Deterministic addresses of the contracts being deployed through the CREATE2 factory.
+    create2_addresses: Dict[str, str] = {}
+
+    def send(name: str, *args: Any) -> None:
         try:
-            diamond_cut_facet = DiamondCutFacet.DiamondCutFacet(None)
-            diamond_cut_facet.deploy(transaction_config)
+            pending[name] = manager.transact(
+                registry.contract_container(name).deploy,
+                *args,
+                transaction_config=config,
+            )
         except Exception as e:
-            print(e)
-            result["error"] = "Failed to deploy DiamondCutFacet"
-            return result
-        result["contracts"]["DiamondCutFacet"] = diamond_cut_facet.address
-    else:
-        result["contracts"]["DiamondCutFacet"] = diamond_cut_address
-        diamond_cut_facet = DiamondCutFacet.DiamondCutFacet(diamond_cut_address)
+            failures[name] = e
 
-    if diamond_address is None:
+    def send_create2(name: str) -> None:
         try:
-            diamond = Diamond.Diamond(None)
-            diamond.deploy(owner_address, diamond_cut_facet.address, transaction_config)
+            plan = create2.plan_deployment(create2_factory, name)
+            if plan["deployed"]:
+                deployed[name] = plan["address"]
+                result["reused"].append(name)
+                return
+            create2_addresses[name] = plan["address"]
+            pending[name] = manager.transact(
+                create2.send_deployment,
+                create2_factory,
+                plan["code"],
+                transaction_config=config,
+            )
         except Exception as e:
-            print(e)
-            result["error"] = "Failed to deploy Diamond"
-            return result
-        result["contracts"]["Diamond"] = diamond.address
-    else:
-        result["contracts"]["Diamond"] = diamond_address
-        diamond = Diamond.Diamond(diamond_address)
+            failures[name] = e
+
+    def settle(name: str) -> None:
+        transaction = pending.pop(name)
+        nonces.wait_for_receipts([transaction])
+        if name in create2_addresses:
+            if transaction.status == 1 and create2.is_deployed(create2_addresses[name]):
+                deployed[name] = create2_addresses[name]
+            else:
+                failures[name] = Exception(
+                    f"CREATE2 deployment of {name} to {create2_addresses[name]} failed: {transaction.revert_msg}"
+                )
+        elif transaction.status == 1:
+            deployed[name] = transaction.contract_address
+        else:
+            failures[name] = Exception(
+                f"Deployment of {name} reverted: {transaction.revert_msg}"
+            )
+
+    to_deploy = [
+        name
+        for name in DEPLOYMENT_ORDER
+        if name in addresses and addresses[name] is None
+    ]
+    for name in to_deploy:
+        if failures:
+            break
+        if name == "Diamond":
+            continue
+        if create2_factory is not None:
+            send_create2(name)
+        else:
+            send(name)
+
+    if "Diamond" in to_deploy and not failures:
+        if "DiamondCutFacet" in pending:
+            settle("DiamondCutFacet")
+        if "DiamondCutFacet" in deployed:
+            send("Diamond", owner_address, deployed["DiamondCutFacet"])
+        else:
+            failures["Diamond"] = Exception("DiamondCutFacet was not deployed")
+
+    for name in list(pending):
+        settle(name)
+
+    for name in DEPLOYMENT_ORDER:
+        if name in deployed:
+            result["contracts"][name] = deployed[name]
+    for name in to_deploy:
+        if name in failures:
+            print(f"{name}: {failures[name]}", file=sys.stderr)
+            if "error" not in result:
+                result["error"] = f"Failed to deploy {name}"
 
-    if diamond_loupe_address is None:
-        try:
-            diamond_loupe_facet = DiamondLoupeFacet.DiamondLoupeFacet(None)
-            diamond_loupe_facet.deploy(transaction_config)
-        except Exception as e:
-            print(e)
-            result["error"] = "Failed to deploy DiamondLoupeFacet"
-            return result
-        result["contracts"]["DiamondLoupeFacet"] = diamond_loupe_facet.address
-    else:
-        result["contracts"]["DiamondLoupeFacet"] = diamond_loupe_address
-        diamond_loupe_facet = DiamondLoupeFacet.DiamondLoupeFacet(diamond_loupe_address)
+    return result
 
-    if ownership_address is None:
-        try:
-            ownership_facet = OwnershipFacet.OwnershipFacet(None)
-            ownership_facet.deploy(transaction_config)
-        except Exception as e:
-            print(e)
-            result["error"] = "Failed to deploy OwnershipFacet"
-            return result
-        result["contracts"]["OwnershipFacet"] = ownership_facet.address
-    else:
-        result["contracts"]["OwnershipFacet"] = ownership_address
-        ownership_facet = OwnershipFacet.OwnershipFacet(ownership_address)
 
+def attach_facets(
+    result: Dict[str, Any],
+    facets: List[Tuple[str, List[Any]]],
+    transaction_config: Dict[str, Any],
+    initializer_address: str = ZERO_ADDRESS,
+    calldata: bytes = b"",
+) -> Dict[str, Any]:
+    """
+    Attaches the given facets - a list of (facet_name, FacetCut) pairs (see plan_facet_cut) - to the
+    Diamond in the given deployment result, in a single diamondCut transaction. Records the attached
+    facets (or an error) in the result, and returns it.
+    """
     try:
-        facet_cut(
-            diamond.address,
-            "DiamondLoupeFacet",
-            diamond_loupe_facet.address,
-            "add",
+        multi_facet_cut(
+            result["contracts"]["Diamond"],
+            [cut for _, cut in facets],
             transaction_config,
+            initializer_address,
+            calldata,
         )
     except Exception as e:
         print(e)
-        result["error"] = "Failed to attach DiamondLoupeFacet"
+        result["error"] = f"Failed to attach {', '.join(name for name, _ in facets)}"
         return result
-    result["attached"].append("DiamondLoupeFacet")
+    result["attached"].extend(name for name, _ in facets)
+    return result
 
-    try:
-        facet_cut(
-            diamond.address,
-            "OwnershipFacet",
-            ownership_facet.address,
-            "add",
-            transaction_config,
-        )
-    except Exception as e:
-        print(e)
-        result["error"] = "Failed to attach OwnershipFacet"
+
+def diamond_gogogo(
+    owner_address: str,
+    transaction_config: Dict[str, Any],
+    diamond_cut_address: Optional[str] = None,
+    diamond_address: Optional[str] = None,
+    diamond_loupe_address: Optional[str] = None,
+    ownership_address: Optional[str] = None,
+    create2_factory: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Deploy diamond along with all its basic facets and attach those facets to the diamond.
+
+    If create2_factory is set, the facets are deployed through that CREATE2 factory, and facets which
+    have already been deployed through it are reused (see deploy_contracts).
+
+    Returns addresses of all the deployed contracts with the contract names as keys.
+    """
+    result = deploy_contracts(
+        owner_address,
+        transaction_config,
+        {
+            "DiamondCutFacet": diamond_cut_address,
+            "Diamond": diamond_address,
+            "DiamondLoupeFacet": diamond_loupe_address,
+            "OwnershipFacet": ownership_address,
+        },
+        create2_factory=create2_factory,
+    )
+    if "error" in result:
         return result
-    result["attached"].append("OwnershipFacet")
 
-    return result
+    return attach_facets(
+        result, diamond_facet_cuts(result["contracts"]), transaction_config
+    )
+
+
+def diamond_facet_cuts(contracts: Dict[str, str]) -> List[Tuple[str, List[Any]]]:
+    """
+    Plans the cuts of the basic Diamond facets (other than DiamondCutFacet, which the Diamond
+    attaches on construction).
+    """
+    return [
+        (
+            facet_name,
+            plan_facet_cut(facet_name, contracts[facet_name], "add"),
+        )
+        for facet_name in ["DiamondLoupeFacet", "OwnershipFacet"]
+    ]
 
 
 def characters_gogogo(
@@ -294,38 +626,44 @@ def characters_gogogo(
     diamond_loupe_address: Optional[str] = None,
     ownership_address: Optional[str] = None,
     characters_facet_address: Optional[str] = None,
+    create2_factory: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Deploys an EIP2535 Diamond contract and an CharactersFacet and mounts the CharactersFacet onto the Diamond contract.
 
+    Contracts are deployed concurrently (see deploy_contracts), and the CharactersFacet is attached and
+    initialized in the same diamondCut transaction as the basic Diamond facets. If create2_factory is
+    set, the facets are deployed through that CREATE2 factory, and facets which have already been
+    deployed through it (e.g. for another Diamond) are reused.
+
     Returns the addresses and attachments.
     """
-    deployment_info = diamond_gogogo(
-        owner_address=transaction_config["from"].address,
-        transaction_config=transaction_config,
-        diamond_cut_address=diamond_cut_address,
-        diamond_address=diamond_address,
-        diamond_loupe_address=diamond_loupe_address,
-        ownership_address=ownership_address,
-    )
-
-    if characters_facet_address is None:
-        characters_facet = CharactersFacet.CharactersFacet(None)
-        characters_facet.deploy(transaction_config=transaction_config)
-    else:
-        characters_facet = CharactersFacet.CharactersFacet(characters_facet_address)
-
-    deployment_info["contracts"]["CharactersFacet"] = characters_facet.address
+    result = deploy_contracts(
+        transaction_config["from"].address,
+        transaction_config,
+        {
+            "DiamondCutFacet": diamond_cut_address,
+            "Diamond": diamond_address,
+            "DiamondLoupeFacet": diamond_loupe_address,
+            "OwnershipFacet": ownership_address,
+            "CharactersFacet": characters_facet_address,
+        },
+        create2_factory=create2_factory,
+    )
+    if "error" in result:
+        return result
 
-    facet_cut(
-        deployment_info["contracts"]["Diamond"],
+    characters_facet_address = result["contracts"]["CharactersFacet"]
+    characters_cut = plan_facet_cut(
         "CharactersFacet",
-        characters_facet.address,
+        characters_facet_address,
         "add",
-        transaction_config,
-        initializer_address=characters_facet.address,
         feature=WingFeatures.CHARACTERS,
-        initializer_args=[
+    )
+    calldata = initializer_calldata(
+        "CharactersFacet",
+        characters_facet_address,
+        [
             admin_terminus_address,
             admin_terminus_pool_id,
             character_creation_terminus_pool_id,
@@ -334,9 +672,14 @@ def characters_gogogo(
             contract_uri,
         ],
     )
-    deployment_info["attached"].append("CharactersFacet")
 
-    return deployment_info
+    return attach_facets(
+        result,
+        diamond_facet_cuts(result["contracts"]) + [("CharactersFacet", characters_cut)],
+        transaction_config,
+        initializer_address=characters_facet_address,
+        calldata=calldata,
+    )
 
 
 def handle_facet_cut(args: argparse.Namespace) -> None:
@@ -346,37 +689,90 @@ def handle_facet_cut(args: argparse.Namespace) -> None:
     facet_name = args.facet_name
     facet_address = args.facet_address
     transaction_config = Diamond.get_transaction_config(args)
-    facet_cut(
-        diamond_address,
-        facet_name,
-        facet_address,
-        action,
-        transaction_config,
-        initializer_address=args.initializer_address,
+
+    def run(tx_config: Dict[str, Any]) -> Any:
+        return facet_cut(
+            diamond_address,
+            facet_name,
+            facet_address,
+            action,
+            tx_config,
+            initializer_address=args.initializer_address,
+            ignore_methods=args.ignore_methods,
+            ignore_selectors=args.ignore_selectors,
+            methods=args.methods,
+            selectors=args.selectors,
+        )
+
+    if args.dry_run:
+        report = dryrun.dry_run(run, transaction_config, fork_url=args.fork_url)
+        # The result of facet_cut is the transaction itself, which is already in the report.
+        report.pop("result")
+        json.dump(report, sys.stdout, indent=4)
+        return
+    run(transaction_config)
+
+
+def facet_assignment(raw_value: str) -> Tuple[str, str]:
+    """
+    Parses a command line argument of the form <facet name>=<facet address>.
+    """
+    facet_name, separator, facet_address = raw_value.partition("=")
+    if not separator or facet_name not in FACETS:
+        raise argparse.ArgumentTypeError(
+            f"Invalid facet: {raw_value}. Facets must be specified as <facet name>=<facet address>, with facet name one of: {','.join(FACETS)}."
+        )
+    return facet_name, facet_address
+
+
+def handle_plan_upgrade(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    block_number = "latest" if args.block_number is None else args.block_number
+    plan = plan_upgrade(
+        args.address,
+        dict(args.facets),
         ignore_methods=args.ignore_methods,
         ignore_selectors=args.ignore_selectors,
-        methods=args.methods,
-        selectors=args.selectors,
+        block_number=block_number,
     )
+    if args.outfile is not None:
+        with args.outfile:
+            json.dump(plan, args.outfile)
+    json.dump(plan, sys.stdout, indent=4)
+
+
+def handle_create2_factory(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    transaction_config = Diamond.get_transaction_config(args)
+    factory = registry.contract_container("Create2Factory").deploy(transaction_config)
+    print(factory.address)
 
 
 def handle_characters_gogogo(args: argparse.Namespace) -> None:
     network.connect(args.network)
     transaction_config = CharactersFacet.get_transaction_config(args)
-    result = characters_gogogo(
-        admin_terminus_address=args.admin_terminus_address,
-        admin_terminus_pool_id=args.admin_terminus_pool_id,
-        character_creation_terminus_pool_id=args.character_creation_terminus_pool_id,
-        contract_name=args.name,
-        contract_symbol=args.symbol,
-        contract_uri=args.uri,
-        transaction_config=transaction_config,
-        diamond_cut_address=args.diamond_cut_address,
-        diamond_address=args.diamond_address,
-        diamond_loupe_address=args.diamond_loupe_address,
-        ownership_address=args.ownership_address,
-        characters_facet_address=args.characters_facet_address,
-    )
+
+    def run(tx_config: Dict[str, Any]) -> Dict[str, Any]:
+        return characters_gogogo(
+            admin_terminus_address=args.admin_terminus_address,
+            admin_terminus_pool_id=args.admin_terminus_pool_id,
+            character_creation_terminus_pool_id=args.character_creation_terminus_pool_id,
+            contract_name=args.name,
+            contract_symbol=args.symbol,
+            contract_uri=args.uri,
+            transaction_config=tx_config,
+            diamond_cut_address=args.diamond_cut_address,
+            diamond_address=args.diamond_address,
+            diamond_loupe_address=args.diamond_loupe_address,
+            ownership_address=args.ownership_address,
+            characters_facet_address=args.characters_facet_address,
+            create2_factory=args.create2_factory if args.create2 else None,
+        )
+
+    if args.dry_run:
+        result = dryrun.dry_run(run, transaction_config, fork_url=args.fork_url)
+    else:
+        result = run(transaction_config)
     if args.outfile is not None:
         with args.outfile:
             json.dump(result, args.outfile)
@@ -439,8 +835,41 @@ def generate_cli():
         nargs="+",
         help="Selectors to add (if set, --ignore-methods and --ignore-selectors are not used)",
     )
+    dryrun.add_dry_run_arguments(facet_cut_parser)
     facet_cut_parser.set_defaults(func=handle_facet_cut)
 
+    plan_upgrade_parser = subcommands.add_parser(
+        "plan-upgrade",
+        help="Plan the minimal diamond cuts to upgrade facets of a deployed Diamond contract",
+        description="Compare the facets currently attached to a Diamond contract against the local ABIs of their new deployments, and print the minimal set of add, replace, and remove cuts which upgrade them",
+    )
+    Diamond.add_default_arguments(plan_upgrade_parser, transact=False)
+    plan_upgrade_parser.add_argument(
+        "--facets",
+        required=True,
+        nargs="+",
+        type=facet_assignment,
+        help="Facets to upgrade, as <facet name>=<address of new deployment>",
+    )
+    plan_upgrade_parser.add_argument(
+        "--ignore-methods",
+        nargs="+",
+        help="Names of methods to leave as they are on the diamond",
+    )
+    plan_upgrade_parser.add_argument(
+        "--ignore-selectors",
+        nargs="+",
+        help="Method selectors to leave as they are on the diamond",
+    )
+    plan_upgrade_parser.add_argument(
+        "-o",
+        "--outfile",
+        type=argparse.FileType("w"),
+        default=None,
+        help="(Optional) file to write the upgrade plan to",
+    )
+    plan_upgrade_parser.set_defaults(func=handle_plan_upgrade)
+
     characters_gogogo_parser = subcommands.add_parser(
         "characters-gogogo",
         description="Deploy characters diamond contract",
@@ -511,6 +940,17 @@ def generate_cli():
         default=None,
         help="Address to deployed CharactersFacet. If provided, this command skips deployment of a new charactersFacet. It mounts the existing charactersFacet onto the Diamond.",
     )
+    characters_gogogo_parser.add_argument(
+        "--create2",
+        action="store_true",
+        help="Deploy facets through a CREATE2 factory, at addresses derived from their bytecode, and reuse facets which are already deployed there",
+    )
+    characters_gogogo_parser.add_argument(
+        "--create2-factory",
+        default=create2.DETERMINISTIC_DEPLOYER_ADDRESS,
+        help=f"Address of CREATE2 factory to deploy facets through with --create2 (default: {create2.DETERMINISTIC_DEPLOYER_ADDRESS})",
+    )
+    dryrun.add_dry_run_arguments(characters_gogogo_parser)
     characters_gogogo_parser.add_argument(
         "-o",
         "--outfile",
@@ -520,4 +960,11 @@ def generate_cli():
     )
     characters_gogogo_parser.set_defaults(func=handle_characters_gogogo)
 
+    create2_factory_parser = subcommands.add_parser(
+        "create2-factory",
+        description="Deploy a CREATE2 factory (contracts/utils/Create2Factory.sol) for chains which do not have the deterministic deployment proxy",
+    )
+    Diamond.add_default_arguments(create2_factory_parser, transact=True)
+    create2_factory_parser.set_defaults(func=handle_create2_factory)
+
     return parser
@@ -0,0 +1,166 @@
+"""
+Adaptive block-range chunking for log crawls.
+
+Providers limit how many logs a single eth_getLogs request may return, and every request costs a
+round trip. AdaptiveLogFetcher splits a block range into windows, fetches several windows at the
+same time, and resizes the window as it goes:
+- If a window returns too many results, it is bisected until each half succeeds, and subsequent
+  windows are shrunk.
+- If windows are sparse, subsequent windows are grown.
+
+Results are always produced in block order, so callers can checkpoint after every window.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, NamedTuple, Tuple
+
+DEFAULT_INITIAL_WINDOW = 2000
+DEFAULT_MIN_WINDOW = 1
+DEFAULT_MAX_WINDOW = 500000
+# Number of logs per window that the fetcher aims for. Windows which return fewer than half this
+# many logs are considered sparse.
+DEFAULT_TARGET_LOGS = 2000
+DEFAULT_CONCURRENCY = 4
+DEFAULT_GROWTH_FACTOR = 2
+
+# Fragments of the error messages (and error codes) that providers use when a log query matches too
+# many results or spans too many blocks.
+TOO_MANY_RESULTS_MARKERS = [
+    "-32005",
+    "more than",
+    "too many",
+    "limit exceeded",
+    "response size",
+    "block range",
+    "range is too large",
+    "query timeout",
+]
+
+
+class WindowResult(NamedTuple):
+    from_block: int
+    to_block: int
+    logs: List[Any]
+    # Time (in seconds) taken by the request which fetched this window.
+    duration: float
+    # Number of times the window was bisected from the window originally requested.
+    depth: int
+
+
+def is_too_many_results_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in TOO_MANY_RESULTS_MARKERS)
+
+
+class AdaptiveLogFetcher:
+    def __init__(
+        self,
+        fetch: Callable[[int, int], List[Any]],
+        initial_window: int = DEFAULT_INITIAL_WINDOW,
+        min_window: int = DEFAULT_MIN_WINDOW,
+        max_window: int = DEFAULT_MAX_WINDOW,
+        target_logs: int = DEFAULT_TARGET_LOGS,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        growth_factor: int = DEFAULT_GROWTH_FACTOR,
+    ):
+        """
+        Inputs:
+        - fetch
+          Function which fetches the logs between two blocks (inclusive)
+        - initial_window
+          Number of blocks in the first windows
+        - min_window, max_window
+          Bounds on the number of blocks in a window
+        - target_logs
+          Number of logs per window to aim for
+        - concurrency
+          Maximum number of windows to fetch at the same time
+        - growth_factor
+          Factor by which to grow the window after a round of sparse windows
+        """
+        if concurrency < 1:
+            raise ValueError(f"Invalid concurrency: {concurrency}")
+        self.fetch = fetch
+        self.window = max(min_window, min(initial_window, max_window))
+        self.min_window = min_window
+        self.max_window = max_window
+        self.target_logs = target_logs
+        self.concurrency = concurrency
+        self.growth_factor = growth_factor
+        # Every window fetched so far, in block order.
+        self.stats: List[WindowResult] = []
+
+    def fetch_window(
+        self, from_block: int, to_block: int, depth: int = 0
+    ) -> List[WindowResult]:
+        """
+        Fetches the logs in the given window, bisecting it as many times as necessary.
+        """
+        started_at = time.perf_counter()
+        try:
+            logs = self.fetch(from_block, to_block)
+        except Exception as e:
+            if from_block >= to_block or not is_too_many_results_error(e):
+                raise
+            middle = (from_block + to_block) // 2
+            return self.fetch_window(from_block, middle, depth + 1) + self.fetch_window(
+                middle + 1, to_block, depth + 1
+            )
+        return [
+            WindowResult(
+                from_block, to_block, logs, time.perf_counter() - started_at, depth
+            )
+        ]
+
+    def adapt(self, results: List[WindowResult]) -> None:
+        """
+        Resizes the window based on the results of the last round of windows.
+        """
+        bisected = [result for result in results if result.depth > 0]
+        if bisected:
+            self.window = max(
+                self.min_window,
+                min(result.to_block - result.from_block + 1 for result in bisected),
+            )
+            return
+
+        num_blocks = sum(result.to_block - result.from_block + 1 for result in results)
+        num_logs = sum(len(result.logs) for result in results)
+        if (
+            num_logs == 0
+            or max(len(result.logs) for result in results) * 2 < self.target_logs
+        ):
+            self.window = min(self.max_window, self.window * self.growth_factor)
+        elif num_logs * self.window > self.target_logs * num_blocks:
+            # Windows at the current density would exceed the target.
+            self.window = max(
+                self.min_window, (self.target_logs * num_blocks) // num_logs
+            )
+
+    def windows(self, from_block: int, to_block: int) -> Iterator[WindowResult]:
+        """
+        Fetches all the logs between from_block and to_block (inclusive). Yields one WindowResult per
+        window, in block order.
+        """
+        next_block = from_block
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while next_block <= to_block:
+                round_windows: List[Tuple[int, int]] = []
+                while len(round_windows) < self.concurrency and next_block <= to_block:
+                    window_end = min(next_block + self.window - 1, to_block)
+                    round_windows.append((next_block, window_end))
+                    next_block = window_end + 1
+
+                futures = [
+                    executor.submit(self.fetch_window, window_start, window_end)
+                    for window_start, window_end in round_windows
+                ]
+                results: List[WindowResult] = []
+                for future in futures:
+                    results.extend(future.result())
+
+                self.adapt(results)
+                self.stats.extend(results)
+                for result in results:
+                    yield result
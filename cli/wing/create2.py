@@ -0,0 +1,116 @@
+"""
+Deterministic deployments through a CREATE2 factory.
+
+A contract deployed through a CREATE2 factory lives at an address which only depends on the factory
+address, a salt, and the creation code of the contract. Wing derives the salt from the creation code
+itself, so every deployment of the same build of a contract (with the same constructor arguments)
+through the same factory lands at the same address. Before deploying, wing computes that address
+and checks whether there is already code there - if there is, the existing deployment is reused
+and nothing is sent.
+
+Factories follow the interface of the deterministic deployment proxy
+(https://github.com/Arachnid/deterministic-deployment-proxy): the calldata is the 32 byte salt
+followed by the creation code. Most chains have the canonical proxy at
+DETERMINISTIC_DEPLOYER_ADDRESS. On chains which do not, deploy contracts/utils/Create2Factory.sol
+(e.g. with `wing core create2-factory`) and use its address instead.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from brownie import web3
+from eth_utils import keccak, to_checksum_address
+
+from . import abi, registry
+
+# Address of the canonical deterministic deployment proxy, which exists at the same address on most
+# chains.
+DETERMINISTIC_DEPLOYER_ADDRESS = "0x4e59b44847b379578588920cA78FbF26c0B4956C"
+
+# Keys of brownie transaction configs which are passed on to Account.transfer when sending a
+# deployment through a factory.
+TRANSFER_CONFIG_KEYS = [
+    "gas_limit",
+    "gas_buffer",
+    "gas_price",
+    "max_fee",
+    "priority_fee",
+    "nonce",
+    "required_confs",
+    "allow_revert",
+]
+
+
+def creation_code(
+    contract_name: str, constructor_args: Optional[List[Any]] = None
+) -> bytes:
+    """
+    Returns the creation code (bytecode followed by ABI-encoded constructor arguments) of the given
+    contract from its build artifact.
+    """
+    container = registry.contract_container(contract_name)
+    if constructor_args is None:
+        constructor_args = []
+    return bytes.fromhex(
+        abi.to_hex(container.deploy.encode_input(*constructor_args))[2:]
+    )
+
+
+def bytecode_salt(code: bytes) -> bytes:
+    """
+    Returns the salt wing deploys the given creation code with: its keccak256 hash.
+    """
+    return keccak(code)
+
+
+def create2_address(factory_address: str, salt: bytes, code: bytes) -> str:
+    """
+    Computes the address at which the given factory deploys the given creation code with the given
+    salt, as specified in EIP-1014:
+    keccak256(0xff ++ factory_address ++ salt ++ keccak256(code))[12:]
+    """
+    factory = bytes.fromhex(abi.to_hex(factory_address)[2:])
+    return to_checksum_address(keccak(b"\xff" + factory + salt + keccak(code))[12:])
+
+
+def is_deployed(address: str) -> bool:
+    return len(web3.eth.get_code(address)) > 0
+
+
+def send_deployment(
+    factory_address: str, code: bytes, transaction_config: Dict[str, Any]
+) -> Any:
+    """
+    Sends a transaction which deploys the given creation code through the given factory, with the
+    salt derived from the code. Returns the brownie TransactionReceipt.
+
+    The signature (method arguments followed by transaction config) matches brownie ContractTx and
+    ContractContainer.deploy, so that the deployment can be sent through a NonceManager.
+    """
+    kwargs = {
+        key: value
+        for key, value in transaction_config.items()
+        if key in TRANSFER_CONFIG_KEYS
+    }
+    data = abi.to_hex(bytecode_salt(code) + code)
+    return transaction_config["from"].transfer(
+        factory_address, transaction_config.get("value", 0), data=data, **kwargs
+    )
+
+
+def plan_deployment(
+    factory_address: str,
+    contract_name: str,
+    constructor_args: Optional[List[Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Computes the deterministic address of the given contract and checks whether it is already
+    deployed there. Returns a dictionary of the form:
+    {
+        "address": <deterministic address>,
+        "deployed": <True if there is already code at the address>,
+        "code": <creation code>,
+    }
+    """
+    code = creation_code(contract_name, constructor_args)
+    address = create2_address(factory_address, bytecode_salt(code), code)
+    return {"address": address, "deployed": is_deployed(address), "code": code}
@@ -0,0 +1,192 @@
+"""
+Fast-path decoders for event logs.
+
+web3's generic event decoding (web3._utils.events.get_event_data) re-derives the event's types from
+its ABI, builds an ABI codec pipeline and wraps the results in AttributeDicts for every log it
+decodes. For the small, fixed set of events that wing crawls (see wing.characters_events), that
+work can be done once per event instead: compile_decoders turns each event ABI into an
+EventDecoder which slices the words of a raw log directly.
+
+Decoded logs are tuples of the form (block_number, log_index, transaction_hash, event_name, args).
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from eth_utils import to_checksum_address
+
+from . import abi
+
+# Tuple of the form (block_number, log_index, transaction_hash, event_name, args)
+IndexedEvent = Tuple[int, int, str, str, Dict[str, Any]]
+
+WORD_SIZE = 32
+
+
+def to_bytes(value: Any) -> bytes:
+    """
+    Returns the given bytes or (0x-prefixed) hex string as bytes. Logs returned by web3 contain
+    HexBytes, while raw JSON-RPC logs contain hex strings.
+    """
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return bytes(value)
+
+
+def to_int(value: Any) -> int:
+    if isinstance(value, str):
+        return int(value, 16)
+    return value
+
+
+@lru_cache(maxsize=1 << 16)
+def checksum_address(raw_address: bytes) -> str:
+    # Characters logs mention a small number of distinct addresses many times over, and computing
+    # a checksum requires hashing the address.
+    return to_checksum_address(raw_address)
+
+
+def decode_bool(word: bytes) -> bool:
+    if word[-1] > 1 or any(word[:-1]):
+        raise ValueError(f"Invalid bool: 0x{word.hex()}")
+    return word[-1] == 1
+
+
+def word_decoder(type_str: str) -> Callable[[bytes], Any]:
+    """
+    Returns a function which decodes a single ABI-encoded word of the given (static) type.
+    """
+    if type_str == "address":
+        return lambda word: checksum_address(word[12:])
+    if type_str == "bool":
+        return decode_bool
+    if type_str.startswith("uint"):
+        return lambda word: int.from_bytes(word, "big")
+    if type_str.startswith("int"):
+        return lambda word: int.from_bytes(word, "big", signed=True)
+    if type_str.startswith("bytes") and type_str != "bytes":
+        size = int(type_str[len("bytes") :])
+        return lambda word: word[:size]
+    raise ValueError(f"No fast-path decoder for type: {type_str}")
+
+
+def dynamic_decoder(type_str: str) -> Callable[[bytes, int], Any]:
+    """
+    Returns a function which decodes a value of the given dynamic type from log data, given the
+    offset of its head word.
+    """
+    if type_str not in ("string", "bytes"):
+        raise ValueError(f"No fast-path decoder for type: {type_str}")
+
+    def decode(data: bytes, head: int) -> Any:
+        offset = int.from_bytes(data[head : head + WORD_SIZE], "big")
+        length = int.from_bytes(data[offset : offset + WORD_SIZE], "big")
+        start = offset + WORD_SIZE
+        if start + length > len(data):
+            raise ValueError("Log data is too short")
+        value = data[start : start + length]
+        return value.decode("utf-8") if type_str == "string" else value
+
+    return decode
+
+
+class EventDecoder:
+    __slots__ = ("name", "topic", "num_topics", "topic_decoders", "data_decoders")
+
+    def __init__(self, event_abi: Dict[str, Any]) -> None:
+        """
+        Compiles a decoder for the given (non-anonymous) event ABI.
+
+        Inputs:
+        - event_abi
+          ABI of the event
+        """
+        if event_abi.get("anonymous"):
+            raise ValueError(f"No fast-path decoder for anonymous event: {event_abi}")
+
+        self.name: str = event_abi["name"]
+        self.topic = to_bytes(abi.encode_event_topic(event_abi))
+
+        # (name, decoder) for each indexed input, in topic order. Indexed dynamic values are only
+        # available as their hashes, which are returned as is.
+        self.topic_decoders: List[Tuple[str, Callable[[bytes], Any]]] = []
+        # (name, decoder, head offset, is_dynamic) for each non-indexed input, in data order.
+        self.data_decoders: List[Tuple[str, Callable, int, bool]] = []
+        for item in event_abi["inputs"]:
+            if item["indexed"]:
+                if item["type"] in ("string", "bytes"):
+                    decoder: Callable = bytes
+                else:
+                    decoder = word_decoder(item["type"])
+                self.topic_decoders.append((item["name"], decoder))
+            else:
+                head = WORD_SIZE * len(self.data_decoders)
+                if item["type"] in ("string", "bytes"):
+                    self.data_decoders.append(
+                        (item["name"], dynamic_decoder(item["type"]), head, True)
+                    )
+                else:
+                    self.data_decoders.append(
+                        (item["name"], word_decoder(item["type"]), head, False)
+                    )
+        self.num_topics = 1 + len(self.topic_decoders)
+
+    def decode_args(self, topics: List[Any], data: bytes) -> Dict[str, Any]:
+        if len(topics) != self.num_topics:
+            raise ValueError(
+                f"Expected {self.num_topics} topics for {self.name}, got {len(topics)}"
+            )
+        if len(data) < WORD_SIZE * len(self.data_decoders):
+            raise ValueError(f"Log data is too short for {self.name}")
+
+        args: Dict[str, Any] = {}
+        for (name, decoder), topic in zip(self.topic_decoders, topics[1:]):
+            args[name] = decoder(to_bytes(topic))
+        for name, decoder, head, is_dynamic in self.data_decoders:
+            if is_dynamic:
+                args[name] = decoder(data, head)
+            else:
+                args[name] = decoder(data[head : head + WORD_SIZE])
+        return args
+
+    def __call__(self, log: Dict[str, Any]) -> IndexedEvent:
+        return (
+            to_int(log["blockNumber"]),
+            to_int(log["logIndex"]),
+            abi.to_hex(log["transactionHash"]),
+            self.name,
+            self.decode_args(log["topics"], to_bytes(log["data"])),
+        )
+
+
+def compile_decoders(event_abis: Iterable[Dict[str, Any]]) -> Dict[bytes, EventDecoder]:
+    """
+    Compiles decoders for the given event ABIs, keyed by their topic (topic0).
+    """
+    decoders: Dict[bytes, EventDecoder] = {}
+    for event_abi in event_abis:
+        decoder = EventDecoder(event_abi)
+        decoders[decoder.topic] = decoder
+    return decoders
+
+
+def decode_log(
+    log: Dict[str, Any], decoders: Dict[bytes, EventDecoder]
+) -> IndexedEvent:
+    """
+    Decodes the given log with the decoder for its topic.
+    """
+    topic = to_bytes(log["topics"][0])
+    decoder = decoders.get(topic)
+    if decoder is None:
+        raise ValueError(f"No decoder for event topic: 0x{topic.hex()}")
+    return decoder(log)
+
+
+def decode_logs(
+    logs: Iterable[Dict[str, Any]], decoders: Dict[bytes, EventDecoder]
+) -> List[IndexedEvent]:
+    """
+    Decodes the given logs, in order.
+    """
+    return [decode_log(log, decoders) for log in logs]
@@ -0,0 +1,187 @@
+"""
+Dry runs of wing operations.
+
+dry_run executes an operation (e.g. characters_gogogo or facet_cut) against a throwaway copy of the
+chain it would run on, and reports what happened: the gas used by and the cost of every transaction
+the operation sent, whether each transaction succeeded, and why it reverted if it did not.
+
+- On development networks (like a local ganache), the copy is a snapshot of the chain, which is
+  reverted once the operation is done.
+- On live networks, wing launches a local ganache fork of the network (through a temporary brownie
+  development network) with the sender's account unlocked, so the operation can be run as the
+  sender without signing anything with the sender's key. wing reconnects to the live network once
+  the operation is done.
+
+Nothing the operation does during a dry run is ever broadcast to the network it would run on.
+"""
+
+import argparse
+import socket
+from typing import Any, Callable, Dict, List, Optional
+
+from brownie import accounts, network, web3
+from brownie._config import CONFIG
+from brownie.network import chain, history
+
+from . import nonces
+
+FORK_NETWORK_ID = "wing-dry-run-fork"
+FORK_NETWORK_TIMEOUT = 120
+
+
+def is_development_network() -> bool:
+    return CONFIG.network_type == "development"
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def transaction_report(transaction: Any) -> Dict[str, Any]:
+    """
+    Summarizes a brownie TransactionReceipt for a dry run report.
+    """
+    if transaction.status == -1:
+        nonces.wait_for_receipts([transaction])
+    if transaction.contract_name is not None and transaction.fn_name is not None:
+        description = f"{transaction.contract_name}.{transaction.fn_name}"
+    elif transaction.contract_address is not None:
+        description = "deployment"
+    else:
+        description = f"call to {transaction.receiver}"
+    gas_used = transaction.gas_used or 0
+    return {
+        "description": description,
+        "txid": transaction.txid,
+        "to": transaction.receiver,
+        "contract_address": transaction.contract_address,
+        "status": int(transaction.status),
+        "gas_used": gas_used,
+        "gas_price": transaction.gas_price,
+        "cost": gas_used * (transaction.gas_price or 0),
+        "revert_msg": transaction.revert_msg if transaction.status != 1 else None,
+    }
+
+
+def run_and_report(
+    operation: Callable[[Dict[str, Any]], Any],
+    transaction_config: Dict[str, Any],
+    gas_price: int,
+) -> Dict[str, Any]:
+    """
+    Runs the operation with the given transaction config and reports the transactions it sent.
+    """
+    report: Dict[str, Any] = {"result": None}
+    start = len(history)
+    try:
+        report["result"] = operation(transaction_config)
+    except Exception as e:
+        report["error"] = str(e)
+
+    transactions: List[Dict[str, Any]] = [
+        transaction_report(transaction) for transaction in list(history)[start:]
+    ]
+    gas_used = sum(transaction["gas_used"] for transaction in transactions)
+    report["transactions"] = transactions
+    report["gas_used"] = gas_used
+    report["cost"] = sum(transaction["cost"] for transaction in transactions)
+    # What the transactions would have cost at the gas price of the network the operation would have
+    # run on.
+    report["gas_price"] = gas_price
+    report["estimated_cost"] = gas_used * gas_price
+    report["reverted"] = [
+        transaction for transaction in transactions if transaction["status"] != 1
+    ]
+    return report
+
+
+def dry_run(
+    operation: Callable[[Dict[str, Any]], Any],
+    transaction_config: Dict[str, Any],
+    fork_url: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Runs the given operation against a throwaway copy of the connected network and reports the
+    transactions it sent (see run_and_report).
+
+    Inputs:
+    - operation
+      Function which performs the operation, given a brownie transaction config
+    - transaction_config
+      brownie transaction config for the sender
+    - fork_url
+      JSON RPC URL to fork when connected to a live network (default: the URL of the connected
+      network)
+    """
+    sender = str(transaction_config["from"])
+    gas_price = web3.eth.gas_price
+
+    if is_development_network():
+        chain.snapshot()
+        try:
+            report = run_and_report(operation, transaction_config, gas_price)
+        finally:
+            chain.revert()
+            nonces.get_nonce_manager(sender).sync()
+        report["mode"] = "snapshot"
+        return report
+
+    live_network = CONFIG.active_network["id"]
+    if fork_url is None:
+        fork_url = web3.provider.endpoint_uri
+    fork_block = web3.eth.block_number
+    CONFIG.networks[FORK_NETWORK_ID] = {
+        "id": FORK_NETWORK_ID,
+        "name": f"wing dry run ({live_network} fork)",
+        "cmd": "ganache-cli",
+        "host": "http://127.0.0.1",
+        "timeout": FORK_NETWORK_TIMEOUT,
+        "cmd_settings": {
+            "port": free_port(),
+            "accounts": 1,
+            # Pins the fork to the block recorded in the report (ganache-cli forks the latest block
+            # otherwise).
+            "fork": f"{fork_url}@{fork_block}",
+            "unlock": [sender],
+        },
+    }
+
+    network.disconnect()
+    try:
+        network.connect(FORK_NETWORK_ID)
+        try:
+            fork_config = {
+                key: value
+                for key, value in transaction_config.items()
+                if key != "nonce"
+            }
+            # The fork unlocks the sender's account, so transactions are sent from it without the
+            # sender's key.
+            fork_config["from"] = accounts.at(sender, force=True)
+            report = run_and_report(operation, fork_config, gas_price)
+        finally:
+            network.disconnect(kill_rpc=True)
+    finally:
+        del CONFIG.networks[FORK_NETWORK_ID]
+        network.connect(live_network)
+        # Nonces which the sender used on the fork are still available on the live network.
+        nonces.get_nonce_manager(sender).sync()
+
+    report["mode"] = "fork"
+    report["fork_block"] = fork_block
+    return report
+
+
+def add_dry_run_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Run against a snapshot (development networks) or a local ganache fork (live networks) of the network, and report the gas used, costs and revert reasons of the transactions instead of sending them",
+    )
+    parser.add_argument(
+        "--fork-url",
+        default=None,
+        help="JSON RPC URL to fork for --dry-run on live networks (default: the URL of the network)",
+    )
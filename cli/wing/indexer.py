@@ -0,0 +1,605 @@
+"""
+Event-sourced local index of Great Wyrm Characters state.
+
+The indexer crawls the events emitted by a Characters contract (ERC721 Transfer events along with
+the events in wing.characters_events) into a SQLite database, and derives the current owner,
+metadata URI and metadata validity of every character from them. Once the index is up to date,
+questions like "who owns this character?" are answered from the local database rather than over
+RPC.
+
+The index remembers the last block it crawled, so each update only crawls the blocks produced since
+the previous one. It also remembers the hashes of the most recent blocks it crawled (up to a
+configurable confirmation depth). Before each update, it checks those hashes against the chain and,
+if the chain has reorganized, rolls back the events from the reorganized blocks and rebuilds the
+state derived from them.
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from brownie import network, web3
+from web3.exceptions import BlockNotFound
+
+from . import abi, characters_events, crawler, decoders
+
+INDEXED_EVENTS = [
+    characters_events.TRANSFER,
+    characters_events.CONTRACT_INFORMATION_SET,
+    characters_events.INVENTORY_SET,
+    characters_events.TOKEN_URI_SET,
+    characters_events.TOKEN_VALIDITY_SET,
+]
+
+EVENTS_BY_TOPIC: Dict[str, Dict[str, Any]] = {
+    abi.to_hex(abi.encode_event_topic(event_abi)): event_abi
+    for event_abi in INDEXED_EVENTS
+}
+DECODERS = decoders.compile_decoders(INDEXED_EVENTS)
+
+DEFAULT_BLOCK_WINDOW = crawler.DEFAULT_INITIAL_WINDOW
+DEFAULT_CONCURRENCY = crawler.DEFAULT_CONCURRENCY
+DEFAULT_POLL_INTERVAL = 5.0
+# Number of most recent blocks whose hashes are kept to detect reorgs.
+DEFAULT_CONFIRMATION_DEPTH = 64
+
+CONTRACT_EVENTS = ["ContractInformationSet", "InventorySet"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    address TEXT NOT NULL,
+    block_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    token_id INTEGER,
+    args TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS events_by_token ON events (token_id, block_number, log_index);
+CREATE TABLE IF NOT EXISTS tokens (
+    token_id INTEGER PRIMARY KEY,
+    owner TEXT,
+    uri TEXT NOT NULL DEFAULT '',
+    valid INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS contract (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    block_number INTEGER PRIMARY KEY,
+    block_hash TEXT NOT NULL
+);
+"""
+
+IndexedEvent = decoders.IndexedEvent
+
+
+def fetch_logs(address: str, from_block: int, to_block: int) -> List[Any]:
+    """
+    Fetches all the logs for indexed events emitted by the given contract between from_block and
+    to_block (inclusive).
+    """
+    return web3.eth.get_logs(
+        {
+            "address": address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [list(EVENTS_BY_TOPIC)],
+        }
+    )
+
+
+def block_hash(block_number: int) -> Optional[str]:
+    """
+    Returns the hash of the given block on the current chain, or None if the chain does not have
+    that block (yet).
+    """
+    try:
+        return abi.to_hex(bytes(web3.eth.get_block(block_number)["hash"]))
+    except BlockNotFound:
+        return None
+
+
+def is_consistent(logs: List[Any], block_hashes: Dict[int, Optional[str]]) -> bool:
+    """
+    Checks that every block in block_hashes is on the chain, and that each of the given logs comes
+    from the block with the recorded hash (if any).
+    """
+    if None in block_hashes.values():
+        return False
+    for log in logs:
+        expected_hash = block_hashes.get(log["blockNumber"])
+        if (
+            expected_hash is not None
+            and abi.to_hex(bytes(log["blockHash"])) != expected_hash
+        ):
+            return False
+    return True
+
+
+def decode_log(log: Any) -> IndexedEvent:
+    return decoders.decode_log(log, DECODERS)
+
+
+def apply_event(cursor: sqlite3.Cursor, event_name: str, args: Dict[str, Any]) -> None:
+    """
+    Applies the effect of the given event to the derived state (tokens and contract tables).
+    """
+    if event_name == "Transfer":
+        cursor.execute(
+            "INSERT INTO tokens (token_id, owner) VALUES (?, ?) "
+            "ON CONFLICT (token_id) DO UPDATE SET owner = excluded.owner",
+            (args["tokenId"], args["to"]),
+        )
+    elif event_name == "TokenURISet":
+        # setTokenUri invalidates the character's metadata without emitting TokenValiditySet.
+        cursor.execute(
+            "INSERT INTO tokens (token_id, uri, valid) VALUES (?, ?, 0) "
+            "ON CONFLICT (token_id) DO UPDATE SET uri = excluded.uri, valid = 0",
+            (args["tokenId"], args["uri"]),
+        )
+    elif event_name == "TokenValiditySet":
+        cursor.execute(
+            "INSERT INTO tokens (token_id, valid) VALUES (?, ?) "
+            "ON CONFLICT (token_id) DO UPDATE SET valid = excluded.valid",
+            (args["tokenId"], int(args["valid"])),
+        )
+    elif event_name == "ContractInformationSet":
+        cursor.executemany(
+            "INSERT OR REPLACE INTO contract (key, value) VALUES (?, ?)",
+            [(key, args[key]) for key in ["name", "symbol", "uri"]],
+        )
+    elif event_name == "InventorySet":
+        cursor.execute(
+            "INSERT OR REPLACE INTO contract (key, value) VALUES ('inventory', ?)",
+            (args["inventoryAddress"],),
+        )
+
+
+class CharactersIndex:
+    def __init__(
+        self,
+        db_path: str,
+        address: Optional[str] = None,
+        start_block: int = 0,
+        confirmation_depth: int = DEFAULT_CONFIRMATION_DEPTH,
+    ):
+        """
+        Opens (creating, if necessary) the index stored in the SQLite database at db_path.
+
+        Inputs:
+        - db_path
+          Path to SQLite database
+        - address
+          Address of the Characters contract. Only required when creating a new index.
+        - start_block
+          Block from which to start crawling when creating a new index (ideally the block in which
+          the contract was deployed).
+        - confirmation_depth
+          Number of most recent blocks which may be reorganized. Reorgs deeper than this cannot be
+          rolled back, and require the index to be rebuilt.
+        """
+        if confirmation_depth < 1:
+            raise ValueError(f"Invalid confirmation depth: {confirmation_depth}")
+        self.confirmation_depth = confirmation_depth
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+
+        row = self.connection.execute(
+            "SELECT address FROM checkpoint WHERE id = 0"
+        ).fetchone()
+        if row is None:
+            if address is None:
+                raise ValueError(
+                    f"Index at {db_path} has not been created yet, please specify a contract address"
+                )
+            with self.connection:
+                self.connection.execute(
+                    "INSERT INTO checkpoint (id, address, block_number) VALUES (0, ?, ?)",
+                    (address, start_block - 1),
+                )
+            self.address = address
+        else:
+            self.address = row[0]
+            if address is not None and address.lower() != self.address.lower():
+                raise ValueError(
+                    f"Index at {db_path} is for a different contract: {self.address}"
+                )
+
+        # Windows fetched by the most recent update, with their timings.
+        self.windows: List[crawler.WindowResult] = []
+        # Block window that the most recent update settled on.
+        self.block_window = DEFAULT_BLOCK_WINDOW
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def checkpoint(self) -> int:
+        """
+        Returns the last block which has been crawled into the index.
+        """
+        return self.connection.execute(
+            "SELECT block_number FROM checkpoint WHERE id = 0"
+        ).fetchone()[0]
+
+    def apply_events(
+        self,
+        events: List[IndexedEvent],
+        to_block: int,
+        block_hashes: Optional[Dict[int, str]] = None,
+    ) -> None:
+        """
+        Adds the given events to the index and advances the checkpoint to to_block, atomically.
+        Events must be in chain order.
+
+        block_hashes maps block numbers to the hashes of those blocks. Only the hashes of blocks
+        within the confirmation depth of the checkpoint are kept.
+        """
+        with self.connection:
+            cursor = self.connection.cursor()
+            for block_number, log_index, transaction_hash, event_name, args in events:
+                cursor.execute(
+                    "INSERT OR REPLACE INTO events "
+                    "(block_number, log_index, transaction_hash, event, token_id, args) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        block_number,
+                        log_index,
+                        transaction_hash,
+                        event_name,
+                        args.get("tokenId"),
+                        json.dumps(args),
+                    ),
+                )
+                apply_event(cursor, event_name, args)
+            if block_hashes:
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO blocks (block_number, block_hash) VALUES (?, ?)",
+                    block_hashes.items(),
+                )
+            cursor.execute(
+                "DELETE FROM blocks WHERE block_number <= ?",
+                (to_block - self.confirmation_depth,),
+            )
+            cursor.execute(
+                "UPDATE checkpoint SET block_number = ? WHERE id = 0", (to_block,)
+            )
+
+    def find_fork_block(self) -> Optional[int]:
+        """
+        Returns the first indexed block which is no longer on the chain, or None if every indexed
+        block within the confirmation depth is still on the chain.
+
+        When the chain has not reorganized, this makes a single RPC call (for the hash of the
+        checkpoint block).
+        """
+        fork_block: Optional[int] = None
+        rows = self.connection.execute(
+            "SELECT block_number, block_hash FROM blocks ORDER BY block_number DESC"
+        ).fetchall()
+        for block_number, stored_hash in rows:
+            if block_hash(block_number) == stored_hash:
+                return fork_block
+            fork_block = block_number
+
+        if fork_block is not None:
+            raise Exception(
+                f"Chain reorganized below block {fork_block}, deeper than the confirmation depth "
+                f"({self.confirmation_depth}) of the index. The index must be rebuilt."
+            )
+        return None
+
+    def rollback(self, fork_block: int) -> None:
+        """
+        Removes every event from fork_block onwards from the index, rebuilds the state derived from
+        those events, and moves the checkpoint back to the block before fork_block. Only the
+        characters (and contract information) affected by the removed events are rebuilt, by
+        replaying their remaining events.
+        """
+        with self.connection:
+            cursor = self.connection.cursor()
+            removed = cursor.execute(
+                "SELECT DISTINCT token_id, event IN (?, ?) FROM events WHERE block_number >= ?",
+                (*CONTRACT_EVENTS, fork_block),
+            ).fetchall()
+            token_ids = [(token_id,) for token_id, _ in removed if token_id is not None]
+            contract_affected = any(
+                is_contract_event for _, is_contract_event in removed
+            )
+
+            cursor.execute("DELETE FROM events WHERE block_number >= ?", (fork_block,))
+            cursor.execute("DELETE FROM blocks WHERE block_number >= ?", (fork_block,))
+
+            cursor.executemany("DELETE FROM tokens WHERE token_id = ?", token_ids)
+            for (token_id,) in token_ids:
+                for event_name, args in cursor.execute(
+                    "SELECT event, args FROM events WHERE token_id = ? "
+                    "ORDER BY block_number, log_index",
+                    (token_id,),
+                ).fetchall():
+                    apply_event(cursor, event_name, json.loads(args))
+
+            if contract_affected:
+                cursor.execute("DELETE FROM contract")
+                for event_name, args in cursor.execute(
+                    "SELECT event, args FROM events WHERE event IN (?, ?) "
+                    "ORDER BY block_number, log_index",
+                    CONTRACT_EVENTS,
+                ).fetchall():
+                    apply_event(cursor, event_name, json.loads(args))
+
+            cursor.execute(
+                "UPDATE checkpoint SET block_number = ? WHERE id = 0", (fork_block - 1,)
+            )
+
+    def update(
+        self,
+        to_block: Optional[int] = None,
+        block_window: int = DEFAULT_BLOCK_WINDOW,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> int:
+        """
+        Crawls events from the block after the checkpoint up to to_block (default: latest block).
+        Returns the number of events added to the index.
+
+        If the chain has reorganized since the last update, the index is first rolled back to the
+        block at which the chain forked.
+
+        Logs are fetched by a crawler.AdaptiveLogFetcher, starting with windows of block_window
+        blocks and fetching up to concurrency windows at a time. The index is checkpointed after
+        every window.
+        """
+        fork_block = self.find_fork_block()
+        if fork_block is not None:
+            self.rollback(fork_block)
+
+        if to_block is None:
+            to_block = web3.eth.block_number
+
+        fetcher = crawler.AdaptiveLogFetcher(
+            lambda from_block, window_end: fetch_logs(
+                self.address, from_block, window_end
+            ),
+            initial_window=block_window,
+            concurrency=concurrency,
+        )
+        self.windows = fetcher.stats
+
+        num_events = 0
+        for window in fetcher.windows(self.checkpoint() + 1, to_block):
+            # Only blocks within the confirmation depth of to_block may still be reorganized.
+            block_hashes = {
+                block_number: block_hash(block_number)
+                for block_number in range(
+                    max(window.from_block, to_block - self.confirmation_depth + 1),
+                    window.to_block + 1,
+                )
+            }
+            if not is_consistent(window.logs, block_hashes):
+                # The chain reorganized while this window was being crawled. The rest of the
+                # crawl is left to the next update, which starts from the last consistent window.
+                break
+
+            events = sorted(
+                decoders.decode_logs(window.logs, DECODERS),
+                key=lambda event: event[:2],
+            )
+            self.apply_events(events, window.to_block, block_hashes)
+            num_events += len(events)
+
+        self.block_window = fetcher.window
+        return num_events
+
+    def follow(
+        self,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        block_window: int = DEFAULT_BLOCK_WINDOW,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        """
+        Keeps the index up to date, checking for new blocks every poll_interval seconds. Runs until
+        interrupted.
+        """
+        while True:
+            self.update(block_window=block_window, concurrency=concurrency)
+            # Carry the window size learned by each update over to the next one.
+            block_window = self.block_window
+            time.sleep(poll_interval)
+
+    def owner_of(self, token_id: int) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT owner FROM tokens WHERE token_id = ?", (token_id,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def token_uri(self, token_id: int) -> str:
+        row = self.connection.execute(
+            "SELECT uri FROM tokens WHERE token_id = ?", (token_id,)
+        ).fetchone()
+        return "" if row is None else row[0]
+
+    def is_metadata_valid(self, token_id: int) -> bool:
+        row = self.connection.execute(
+            "SELECT valid FROM tokens WHERE token_id = ?", (token_id,)
+        ).fetchone()
+        return row is not None and bool(row[0])
+
+    def history(self, token_id: int) -> List[Dict[str, Any]]:
+        """
+        Returns every indexed event for the given character, in chain order.
+        """
+        rows = self.connection.execute(
+            "SELECT block_number, log_index, transaction_hash, event, args FROM events "
+            "WHERE token_id = ? ORDER BY block_number, log_index",
+            (token_id,),
+        ).fetchall()
+        return [
+            {
+                "block_number": block_number,
+                "log_index": log_index,
+                "transaction_hash": transaction_hash,
+                "event": event_name,
+                "args": json.loads(args),
+            }
+            for block_number, log_index, transaction_hash, event_name, args in rows
+        ]
+
+    def contract_information(self) -> Dict[str, Any]:
+        """
+        Returns the contract name, symbol, metadata URI and inventory address (whichever of them have
+        been set), along with the contract address and checkpoint.
+        """
+        info: Dict[str, Any] = dict(
+            self.connection.execute("SELECT key, value FROM contract").fetchall()
+        )
+        info["address"] = self.address
+        info["checkpoint"] = self.checkpoint()
+        return info
+
+
+def handle_crawl(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    index = CharactersIndex(
+        args.db, args.address, args.start_block, args.confirmation_depth
+    )
+    if args.follow:
+        index.follow(
+            poll_interval=args.poll_interval,
+            block_window=args.block_window,
+            concurrency=args.concurrency,
+        )
+        return
+    num_events = index.update(
+        to_block=args.to_block,
+        block_window=args.block_window,
+        concurrency=args.concurrency,
+    )
+    if args.timings:
+        for window in index.windows:
+            print(
+                json.dumps({**window._asdict(), "logs": len(window.logs)}),
+                file=sys.stderr,
+            )
+    print(f"Indexed {num_events} events up to block {index.checkpoint()}")
+
+
+def handle_owner_of(args: argparse.Namespace) -> None:
+    print(CharactersIndex(args.db).owner_of(args.token_id))
+
+
+def handle_token_uri(args: argparse.Namespace) -> None:
+    print(CharactersIndex(args.db).token_uri(args.token_id))
+
+
+def handle_is_metadata_valid(args: argparse.Namespace) -> None:
+    print(CharactersIndex(args.db).is_metadata_valid(args.token_id))
+
+
+def handle_history(args: argparse.Namespace) -> None:
+    print(json.dumps(CharactersIndex(args.db).history(args.token_id), indent=4))
+
+
+def handle_info(args: argparse.Namespace) -> None:
+    print(json.dumps(CharactersIndex(args.db).contract_information(), indent=4))
+
+
+def generate_cli() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Maintain and query a local index of Great Wyrm Characters events"
+    )
+    parser.set_defaults(func=lambda _: parser.print_help())
+    subcommands = parser.add_subparsers()
+
+    crawl_parser = subcommands.add_parser(
+        "crawl",
+        description="Crawl events from a Great Wyrm Characters contract into the index",
+    )
+    crawl_parser.add_argument(
+        "--network", required=True, help="Name of brownie network to connect to"
+    )
+    crawl_parser.add_argument(
+        "--address",
+        required=False,
+        default=None,
+        help="Address of Characters contract (only required when creating a new index)",
+    )
+    crawl_parser.add_argument(
+        "--db", required=True, help="Path to SQLite database for the index"
+    )
+    crawl_parser.add_argument(
+        "--start-block",
+        type=int,
+        default=0,
+        help="Block to start crawling from when creating a new index (default: 0)",
+    )
+    crawl_parser.add_argument(
+        "--to-block",
+        type=int,
+        default=None,
+        help="Block to crawl up to (default: latest block)",
+    )
+    crawl_parser.add_argument(
+        "--block-window",
+        type=int,
+        default=DEFAULT_BLOCK_WINDOW,
+        help=f"Initial number of blocks to request logs for at a time - adjusted as the crawl progresses (default: {DEFAULT_BLOCK_WINDOW})",
+    )
+    crawl_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum number of block windows to request logs for at the same time (default: {DEFAULT_CONCURRENCY})",
+    )
+    crawl_parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the block range, number of logs and request time for every window to stderr",
+    )
+    crawl_parser.add_argument(
+        "--confirmation-depth",
+        type=int,
+        default=DEFAULT_CONFIRMATION_DEPTH,
+        help=f"Number of most recent blocks to check for reorgs on each update (default: {DEFAULT_CONFIRMATION_DEPTH})",
+    )
+    crawl_parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep crawling new blocks as they are produced",
+    )
+    crawl_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"Seconds to wait between checks for new blocks with --follow (default: {DEFAULT_POLL_INTERVAL})",
+    )
+    crawl_parser.set_defaults(func=handle_crawl)
+
+    for name, handler in [
+        ("owner-of", handle_owner_of),
+        ("token-uri", handle_token_uri),
+        ("is-metadata-valid", handle_is_metadata_valid),
+        ("history", handle_history),
+    ]:
+        query_parser = subcommands.add_parser(name)
+        query_parser.add_argument(
+            "--db", required=True, help="Path to SQLite database for the index"
+        )
+        query_parser.add_argument("--token-id", required=True, type=int)
+        query_parser.set_defaults(func=handler)
+
+    info_parser = subcommands.add_parser("info")
+    info_parser.add_argument(
+        "--db", required=True, help="Path to SQLite database for the index"
+    )
+    info_parser.set_defaults(func=handle_info)
+
+    return parser
@@ -0,0 +1,175 @@
+"""
+Batched moderation of character profiles by game masters.
+
+moderate applies a list of (token_id, valid) decisions to a Characters contract. It reads the
+current metadata validity of every token in the list with a single bulk read, skips the tokens
+whose validity already matches the decision, and submits setMetadataValidity transactions for the
+rest back to back (with nonces allocated by a wing.nonces.NonceManager), waiting for the oldest
+transaction only once the maximum number of transactions are in flight. Decisions for tokens which
+do not exist are reported as errors and never sent.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, IO, List, Optional, Tuple
+
+from . import multicall, nonces
+
+DEFAULT_MAX_IN_FLIGHT = 64
+
+TRUE_VALUES = ["1", "t", "y", "true", "yes", "valid"]
+FALSE_VALUES = ["0", "f", "n", "false", "no", "invalid"]
+
+
+def parse_validity(raw_value: Any) -> bool:
+    if isinstance(raw_value, bool):
+        return raw_value
+    value = str(raw_value).strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    elif value in FALSE_VALUES:
+        return False
+    raise ValueError(
+        f"Invalid validity: {raw_value}. Value must be one of: {','.join(TRUE_VALUES + FALSE_VALUES)}"
+    )
+
+
+def read_decisions(ifp: IO[str]) -> List[Tuple[int, bool]]:
+    """
+    Reads moderation decisions from the given stream, either as CSV (token_id,valid - with an
+    optional header) or as NDJSON (objects with "token_id" or "tokenId", and "valid" keys). If the
+    same token appears more than once, its last decision wins.
+    """
+    lines = [line for line in ifp if line.strip()]
+    decisions: Dict[int, bool] = {}
+    if lines and lines[0].lstrip().startswith("{"):
+        for line in lines:
+            item = json.loads(line)
+            token_id = item["token_id"] if "token_id" in item else item["tokenId"]
+            decisions.pop(int(token_id), None)
+            decisions[int(token_id)] = parse_validity(item["valid"])
+    else:
+        rows = list(csv.reader(lines))
+        if rows and not rows[0][0].strip().isdigit():
+            rows = rows[1:]
+        for row in rows:
+            decisions.pop(int(row[0]), None)
+            decisions[int(row[0])] = parse_validity(row[1])
+    return list(decisions.items())
+
+
+def moderate(
+    contract: Any,
+    decisions: List[Tuple[int, bool]],
+    transaction_config: Dict[str, Any],
+    multicall_address: Optional[str] = multicall.MULTICALL3_ADDRESS,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    confirmations: int = 1,
+) -> Dict[str, Any]:
+    """
+    Applies the given moderation decisions. Returns a summary of the run.
+
+    Inputs:
+    - contract
+      CharactersFacet object for the contract
+    - decisions
+      List of (token_id, valid) pairs
+    - transaction_config
+      brownie transaction config for the game master (the "nonce" and "required_confs" keys are
+      ignored)
+    - multicall_address
+      Address of Multicall3 contract to read current validities and owners through (None to read
+      them with concurrent individual calls)
+    - max_in_flight
+      Maximum number of unconfirmed transactions at any time
+    - confirmations
+      Number of confirmations to wait for before considering a transaction completed
+    """
+    contract.assert_contract_is_instantiated()
+    started_at = time.perf_counter()
+
+    # isMetadataValid is false for tokens which do not exist, and setMetadataValidity does not check
+    # that the token exists, so existence is read (through ownerOf, which reverts for tokens which
+    # do not exist) in the same bulk read as the current validities.
+    calls: List[Tuple[Any, Tuple[int]]] = []
+    for token_id, _ in decisions:
+        calls.append((contract.contract.ownerOf, (token_id,)))
+        calls.append((contract.contract.isMetadataValid, (token_id,)))
+    results = multicall.aggregate(calls, multicall_address=multicall_address)
+
+    errors: List[Dict[str, Any]] = []
+    to_send: List[Tuple[int, bool]] = []
+    unchanged = 0
+    for index, (token_id, valid) in enumerate(decisions):
+        owner, current = results[2 * index], results[2 * index + 1]
+        if not owner.success:
+            errors.append(
+                {"token_id": token_id, "error": f"token does not exist: {owner.error}"}
+            )
+        elif not current.success:
+            errors.append({"token_id": token_id, "error": current.error})
+        elif current.value == valid:
+            unchanged += 1
+        else:
+            to_send.append((token_id, valid))
+
+    manager = nonces.get_nonce_manager(str(transaction_config["from"]))
+    # Other transactions may have been sent from the same account since the manager was last used.
+    manager.sync()
+    config = {
+        key: value
+        for key, value in transaction_config.items()
+        if key not in ("nonce", "required_confs")
+    }
+
+    submitted = 0
+    confirmed: List[Any] = []
+    in_flight: Deque[Tuple[int, Any]] = deque()
+
+    def settle_oldest() -> None:
+        token_id, transaction = in_flight.popleft()
+        nonces.wait_for_receipts([transaction], confirmations)
+        if transaction.status == 1:
+            confirmed.append(transaction)
+        else:
+            errors.append(
+                {
+                    "token_id": token_id,
+                    "txid": transaction.txid,
+                    "error": transaction.revert_msg,
+                }
+            )
+
+    for token_id, valid in to_send:
+        if len(in_flight) >= max_in_flight:
+            settle_oldest()
+        try:
+            transaction = manager.transact(
+                contract.set_metadata_validity,
+                token_id,
+                valid,
+                transaction_config=config,
+            )
+        except Exception as e:
+            errors.append({"token_id": token_id, "error": str(e)})
+            continue
+        submitted += 1
+        in_flight.append((token_id, transaction))
+    while in_flight:
+        settle_oldest()
+
+    gas_used = sum(transaction.gas_used for transaction in confirmed)
+    return {
+        "decisions": len(decisions),
+        "unchanged": unchanged,
+        "submitted": submitted,
+        "confirmed": len(confirmed),
+        "errors": errors,
+        "gas_used": gas_used,
+        "fees": sum(
+            transaction.gas_used * transaction.gas_price for transaction in confirmed
+        ),
+        "seconds": time.perf_counter() - started_at,
+    }
@@ -0,0 +1,179 @@
+"""
+Bulk reads through Multicall3 (https://github.com/mds1/multicall).
+
+Packs many view calls into aggregate3 calls so that reading, say, the owners of thousands of tokens
+takes a handful of RPC round trips instead of one round trip per token. On chains without a
+Multicall3 contract, the calls are made concurrently instead - combined with the JSON-RPC batch
+transport in wing.transport, this also takes a handful of round trips.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from brownie import Contract, web3
+from brownie.network.contract import ContractCall
+from eth_typing.evm import ChecksumAddress
+
+from . import abi
+
+# Address of the canonical Multicall3 deployment, which exists at the same address on most chains.
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CONCURRENCY = 100
+
+# Selector for Error(string), which is how require and revert encode their reasons.
+ERROR_STRING_SELECTOR = "08c379a0"
+
+AGGREGATE3_ABI = {
+    "inputs": [
+        {
+            "components": [
+                {"internalType": "address", "name": "target", "type": "address"},
+                {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                {"internalType": "bytes", "name": "callData", "type": "bytes"},
+            ],
+            "internalType": "struct Multicall3.Call3[]",
+            "name": "calls",
+            "type": "tuple[]",
+        }
+    ],
+    "name": "aggregate3",
+    "outputs": [
+        {
+            "components": [
+                {"internalType": "bool", "name": "success", "type": "bool"},
+                {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+            ],
+            "internalType": "struct Multicall3.Result[]",
+            "name": "returnData",
+            "type": "tuple[]",
+        }
+    ],
+    "stateMutability": "payable",
+    "type": "function",
+}
+
+
+class CallResult(NamedTuple):
+    """
+    Result of a single call made as part of a multicall. If success is False, value is None and
+    error describes the failure.
+    """
+
+    success: bool
+    value: Any
+    error: Optional[str] = None
+
+
+def decode_revert_reason(return_data: str) -> str:
+    """
+    Decodes the reason string from the return data of a reverted call. If the call did not revert
+    with a reason string, returns the raw return data.
+    """
+    raw_hex = abi.to_hex(return_data)[2:]
+    if not raw_hex.startswith(ERROR_STRING_SELECTOR):
+        return f"call reverted: 0x{raw_hex}"
+    raw = bytes.fromhex(raw_hex[len(ERROR_STRING_SELECTOR) :])
+    length = int.from_bytes(raw[32:64], "big")
+    return raw[64 : 64 + length].decode("utf-8", errors="replace")
+
+
+def multicall_contract(multicall_address: ChecksumAddress) -> Contract:
+    return Contract.from_abi("Multicall3", multicall_address, [AGGREGATE3_ABI])
+
+
+def aggregate(
+    calls: Sequence[Tuple[ContractCall, Sequence[Any]]],
+    multicall_address: Optional[ChecksumAddress] = MULTICALL3_ADDRESS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    block_number: Optional[int] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> List[CallResult]:
+    """
+    Makes the given view calls through the Multicall3 contract at the given address, batch_size
+    calls per RPC request.
+
+    Every batch is executed at the same block so that the results are consistent with each other.
+    If block_number is not provided, the latest block at the time of the first batch is used.
+
+    If multicall_address is None, the calls are made individually through call_many, with
+    concurrency concurrent calls.
+
+    Returns one CallResult per call, in the same order as the calls.
+
+    Inputs:
+    - calls
+      (method, args) pairs, where method is a brownie ContractCall (e.g. contract.ownerOf) and
+      args are the arguments to call it with
+    - multicall_address
+      Address of Multicall3 contract (default: canonical Multicall3 deployment)
+    - batch_size
+      Maximum number of calls to pack into a single aggregate3 call
+    - block_number
+      Block at which to make the calls
+    - concurrency
+      Maximum number of calls to make at the same time if multicall_address is None
+    """
+    if batch_size < 1:
+        raise ValueError(f"Invalid batch size: {batch_size}")
+    if block_number is None:
+        block_number = web3.eth.block_number
+    if multicall_address is None:
+        return call_many(calls, block_number=block_number, max_workers=concurrency)
+
+    multicall = multicall_contract(multicall_address)
+    results: List[CallResult] = []
+    for offset in range(0, len(calls), batch_size):
+        batch = calls[offset : offset + batch_size]
+        packed_calls = [
+            (method._address, True, method.encode_input(*args))
+            for method, args in batch
+        ]
+        batch_results = multicall.aggregate3.call(
+            packed_calls, block_identifier=block_number
+        )
+        for (method, _), (success, return_data) in zip(batch, batch_results):
+            if not success:
+                results.append(
+                    CallResult(False, None, decode_revert_reason(return_data))
+                )
+                continue
+            try:
+                results.append(
+                    CallResult(True, method.decode_output(abi.to_hex(return_data)))
+                )
+            except Exception as e:
+                # Calls to addresses without code succeed with empty return data.
+                results.append(CallResult(False, None, f"could not decode output: {e}"))
+
+    return results
+
+
+def call_many(
+    calls: Sequence[Tuple[ContractCall, Sequence[Any]]],
+    block_number: Optional[int] = None,
+    max_workers: int = DEFAULT_CONCURRENCY,
+) -> List[CallResult]:
+    """
+    Makes the given view calls individually but concurrently, from max_workers threads. If a
+    wing.transport.BatchingHTTPProvider is installed, the calls are coalesced into JSON-RPC batch
+    requests.
+
+    Every call is made at the same block. If block_number is not provided, the latest block at the
+    time of the first call is used.
+
+    Returns one CallResult per call, in the same order as the calls.
+    """
+    if block_number is None:
+        block_number = web3.eth.block_number
+
+    def make_call(call: Tuple[ContractCall, Sequence[Any]]) -> CallResult:
+        method, args = call
+        try:
+            return CallResult(True, method.call(*args, block_identifier=block_number))
+        except Exception as e:
+            return CallResult(False, None, str(e))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(make_call, calls))
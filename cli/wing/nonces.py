@@ -0,0 +1,261 @@
+"""
+Local nonce management for pipelined transaction submission.
+
+By default, brownie waits for each transaction to be confirmed before returning it, so a run which
+sends N transactions takes (at least) N blocks. A NonceManager allocates nonces for a signer
+locally, which lets wing send transactions back to back (with required_confs=0) and only wait for
+all of them at the end:
+
+    manager = nonces.get_nonce_manager(signer.address)
+    receipts = [
+        manager.transact(contract.createCharacter, player, transaction_config=transaction_config)
+        for player in players
+    ]
+    nonces.wait_for_receipts(receipts)
+
+The manager tracks the nonces it has handed out. If a transaction fails before it is broadcast,
+its nonce is released and reused by the next transaction, so that later transactions are not stuck
+behind the gap. If no transaction reuses it, wait_for_receipts fills it with a 0-value transfer
+before waiting. If the node reports a nonce error, the manager resynchronizes from the signer's
+pending transaction count.
+"""
+
+import heapq
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from brownie import web3
+from web3.exceptions import TimeExhausted
+
+# Fragments of the error messages that nodes use when a transaction's nonce conflicts with the
+# nonces the node already knows about.
+NONCE_ERROR_MARKERS = [
+    "nonce too low",
+    "nonce too high",
+    "invalid nonce",
+    "already known",
+    "replacement transaction underpriced",
+]
+
+
+def is_nonce_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+
+def may_have_been_broadcast(error: Exception) -> bool:
+    """
+    Checks whether a transaction whose sending raised the given error may have reached the node. Only
+    errors which the node returned in response to the transaction (or which were raised before it was
+    sent, e.g. by gas estimation) mean that it was definitely not broadcast. Connection errors and
+    timeouts (which requests raises as OSErrors) may happen after the node has accepted it.
+    """
+    # brownie attaches the transaction hash to errors for transactions which were broadcast.
+    if getattr(error, "txid", None) is not None:
+        return True
+    return isinstance(error, (OSError, TimeExhausted))
+
+
+def pending_transaction_count(address: str) -> int:
+    return web3.eth.get_transaction_count(address, "pending")
+
+
+class NonceManager:
+    def __init__(
+        self,
+        address: str,
+        transaction_count: Callable[[str], int] = pending_transaction_count,
+    ) -> None:
+        """
+        Inputs:
+        - address
+          Address of the signer
+        - transaction_count
+          Function which returns the number of transactions (including pending transactions) sent
+          by an address
+        """
+        self.address = address
+        self.transaction_count = transaction_count
+        self._lock = threading.Lock()
+        # Next nonce that has never been allocated. None until the first sync.
+        self._next_nonce: Optional[int] = None
+        # Nonces which were allocated and then released, to be reused before _next_nonce.
+        self._released: List[int] = []
+        # Nonces which have been allocated and not released, mapped to their transactions (None
+        # until the transaction has been sent).
+        self.pending: Dict[int, Any] = {}
+
+    def sync(self) -> None:
+        """
+        Resynchronizes the manager with the node. Nonces below the signer's pending transaction
+        count are considered used, whether or not they were allocated by this manager.
+        """
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        chain_nonce = self.transaction_count(self.address)
+        self._released = [nonce for nonce in self._released if nonce >= chain_nonce]
+        heapq.heapify(self._released)
+        if self._next_nonce is None or self._next_nonce < chain_nonce:
+            self._next_nonce = chain_nonce
+        else:
+            # The node does not know about some of the transactions that this manager sent (they
+            # were dropped). Their nonces must be reused, or every later transaction will be stuck.
+            # Nonces which are allocated but whose transactions are still being sent are left alone.
+            for nonce in range(chain_nonce, self._next_nonce):
+                if nonce in self._released or (
+                    nonce in self.pending and self.pending[nonce] is None
+                ):
+                    continue
+                self.pending.pop(nonce, None)
+                heapq.heappush(self._released, nonce)
+
+    def allocate(self) -> int:
+        """
+        Allocates the lowest available nonce.
+        """
+        with self._lock:
+            if self._next_nonce is None:
+                self._sync()
+            if self._released:
+                nonce = heapq.heappop(self._released)
+            else:
+                nonce = self._next_nonce
+                self._next_nonce += 1
+            self.pending[nonce] = None
+            return nonce
+
+    def release(self, nonce: int) -> None:
+        """
+        Returns a nonce whose transaction was never broadcast, so that it can be reused.
+        """
+        with self._lock:
+            if self.pending.pop(nonce, None) is None and nonce not in self._released:
+                heapq.heappush(self._released, nonce)
+
+    def gaps(self) -> List[int]:
+        """
+        Returns the released nonces which are below nonces that have already been used. Transactions
+        with higher nonces cannot be mined until these are used.
+        """
+        with self._lock:
+            return sorted(self._released)
+
+    def fill_gaps(self, account: Any, below: Optional[int] = None) -> List[Any]:
+        """
+        Sends a 0-value transfer from the given (brownie) account to itself with every released
+        nonce which is below a nonce whose transaction has been sent (or below the given nonce), so
+        that the transactions with higher nonces can be mined. Returns the transfers.
+        """
+        with self._lock:
+            if below is None:
+                below = max(
+                    (
+                        nonce
+                        for nonce, transaction in self.pending.items()
+                        if transaction is not None
+                    ),
+                    default=-1,
+                )
+            gaps = sorted(nonce for nonce in self._released if nonce < below)
+            self._released = [nonce for nonce in self._released if nonce >= below]
+            heapq.heapify(self._released)
+            for nonce in gaps:
+                self.pending[nonce] = None
+
+        def transfer_to_self(transaction_config: Dict[str, Any]) -> Any:
+            return account.transfer(
+                account,
+                0,
+                nonce=transaction_config["nonce"],
+                required_confs=transaction_config["required_confs"],
+            )
+
+        return [self._send(nonce, transfer_to_self, (), {}) for nonce in gaps]
+
+    def transact(
+        self, method: Callable, *args: Any, transaction_config: Dict[str, Any]
+    ) -> Any:
+        """
+        Sends a transaction by calling the given brownie ContractTx (or Account.deploy, etc.) with
+        the given arguments and a transaction config with the next nonce. Unless the transaction
+        config says otherwise, returns as soon as the transaction has been broadcast
+        (required_confs=0).
+        """
+        return self._send(self.allocate(), method, args, transaction_config)
+
+    def _send(
+        self,
+        nonce: int,
+        method: Callable,
+        args: Tuple[Any, ...],
+        transaction_config: Dict[str, Any],
+    ) -> Any:
+        config = {"required_confs": 0, **transaction_config, "nonce": nonce}
+        try:
+            transaction = method(*args, config)
+        except Exception as e:
+            if not may_have_been_broadcast(e):
+                self.release(nonce)
+            else:
+                # The nonce stays allocated. If the node turns out not to know about the
+                # transaction, the next sync releases it.
+                with self._lock:
+                    self.pending[nonce] = e
+            if is_nonce_error(e):
+                self.sync()
+            raise
+        with self._lock:
+            self.pending[nonce] = transaction
+        return transaction
+
+    def confirmed(self, nonce: int) -> None:
+        """
+        Stops tracking the transaction with the given nonce.
+        """
+        with self._lock:
+            self.pending.pop(nonce, None)
+
+
+_managers: Dict[str, NonceManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_nonce_manager(address: str) -> NonceManager:
+    """
+    Returns the nonce manager for the given signer. There is a single manager per signer, so that
+    every part of wing that sends transactions for that signer allocates nonces from the same place.
+    """
+    key = address.lower()
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = NonceManager(address)
+        return _managers[key]
+
+
+def wait_for_receipts(transactions: List[Any], required_confs: int = 1) -> List[Any]:
+    """
+    Waits for the given (brownie) transactions to be confirmed, and stops tracking their nonces.
+    Returns the transactions.
+
+    Transactions cannot be mined while a lower nonce of their sender is unused, so the gaps which
+    transactions that failed before they were broadcast left below the given transactions are
+    filled first (see NonceManager.fill_gaps).
+    """
+    highest: Dict[str, Tuple[Any, int]] = {}
+    for transaction in transactions:
+        key = str(transaction.sender).lower()
+        if key in _managers and (
+            key not in highest or transaction.nonce > highest[key][1]
+        ):
+            highest[key] = (transaction.sender, transaction.nonce)
+    for key, (account, nonce) in highest.items():
+        _managers[key].fill_gaps(account, below=nonce)
+
+    for transaction in transactions:
+        transaction.wait(required_confs)
+        manager = _managers.get(str(transaction.sender).lower())
+        if manager is not None:
+            manager.confirmed(transaction.nonce)
+    return transactions
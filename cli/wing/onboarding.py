@@ -0,0 +1,325 @@
+"""
+Bulk character creation for onboarding cohorts of players.
+
+create_characters submits one createCharacter transaction per player, several at a time, with nonces
+allocated by a wing.nonces.NonceManager, so that a cohort is bounded by node throughput rather than
+block time.
+
+Every transaction is recorded in an NDJSON journal as it goes through these states:
+- sending: a nonce has been allocated for the player's transaction, which is about to be sent
+- submitted: the transaction has been broadcast
+- confirmed: the transaction was mined and the character was created
+- failed: the transaction was definitely not broadcast, or it reverted
+
+If sending a transaction fails in a way that leaves it unknown whether the node received it (e.g. a
+connection error or a timeout), its record stays in the sending state, with its nonce and the error.
+
+Players are identified by their position in the input file, so a player who is listed twice gets
+two characters. When a run is resumed with the same journal, confirmed players are skipped, and
+transactions which were submitted by the interrupted run are resolved against the chain before
+anything is resubmitted, so that no player is minted a character twice.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from brownie import web3
+from eth_utils import to_checksum_address
+from tqdm import tqdm
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from . import nonces
+
+DEFAULT_CONCURRENCY = 16
+# Upper bounds (in seconds) of the buckets of the latency histogram.
+LATENCY_BUCKETS = [1, 2, 5, 10, 20, 30, 60, 120, 300]
+
+
+def journal_path(infile: str) -> str:
+    return f"{infile}.journal"
+
+
+def read_players(infile: str) -> List[str]:
+    """
+    Reads player addresses from a CSV or NDJSON file.
+
+    CSV files have one player per row. The address is taken from the "address" or "player" column
+    if the file has a header, and from the first column otherwise. NDJSON files (.ndjson, .jsonl)
+    have one player per line, either as a JSON string or as an object with an "address" or
+    "player" key.
+    """
+    players: List[str] = []
+    _, extension = os.path.splitext(infile)
+    with open(infile, "r", newline="") as ifp:
+        if extension in (".ndjson", ".jsonl"):
+            for line in ifp:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if isinstance(item, dict):
+                    item = item.get("address", item.get("player"))
+                players.append(to_checksum_address(item))
+        else:
+            rows = [row for row in csv.reader(ifp) if row]
+            column = 0
+            if rows and not rows[0][0].startswith("0x"):
+                header = [field.strip().lower() for field in rows[0]]
+                column = next(
+                    (
+                        header.index(name)
+                        for name in ["address", "player"]
+                        if name in header
+                    ),
+                    0,
+                )
+                rows = rows[1:]
+            players = [to_checksum_address(row[column].strip()) for row in rows]
+    return players
+
+
+def read_journal(path: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Returns the latest journal record for each player (by position in the input file). A truncated
+    final record (from an interruption during a write) is ignored.
+    """
+    latest: Dict[int, Dict[str, Any]] = {}
+    if not os.path.isfile(path):
+        return latest
+    with open(path, "r") as ifp:
+        for line in ifp:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            latest[record["index"]] = {**latest.get(record["index"], {}), **record}
+    return latest
+
+
+def latency_histogram(latencies: List[float]) -> Dict[str, int]:
+    histogram = {f"<={bucket}s": 0 for bucket in LATENCY_BUCKETS}
+    histogram[f">{LATENCY_BUCKETS[-1]}s"] = 0
+    for latency in latencies:
+        for bucket in LATENCY_BUCKETS:
+            if latency <= bucket:
+                histogram[f"<={bucket}s"] += 1
+                break
+        else:
+            histogram[f">{LATENCY_BUCKETS[-1]}s"] += 1
+    return histogram
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Journal:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a")
+
+    def record(self, index: int, status: str, **fields: Any) -> None:
+        with self._lock:
+            self._file.write(
+                json.dumps({"index": index, "status": status, **fields}) + "\n"
+            )
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def resolve_record(record: Dict[str, Any], signer: str) -> str:
+    """
+    Determines what happened to a transaction from an interrupted run. Returns one of:
+    - "confirmed": the character was created
+    - "retry": the character was definitely not created
+    - "unresolved": the transaction may have been sent, but cannot be found
+    """
+    if record["status"] in ("confirmed", "failed"):
+        return "confirmed" if record["status"] == "confirmed" else "retry"
+
+    if record["status"] == "submitted":
+        try:
+            receipt = web3.eth.get_transaction_receipt(record["txid"])
+        except TransactionNotFound:
+            receipt = None
+        if receipt is None:
+            try:
+                web3.eth.get_transaction(record["txid"])
+            except TransactionNotFound:
+                # The node does not know about the transaction. It was dropped or replaced, and in
+                # either case cannot be mined any more.
+                return "retry"
+            try:
+                receipt = web3.eth.wait_for_transaction_receipt(record["txid"])
+            except TimeExhausted:
+                return "unresolved"
+        return "confirmed" if receipt["status"] == 1 else "retry"
+
+    # The run was interrupted while sending, or sending failed without showing whether the
+    # transaction was broadcast. If the nonce was never used, the transaction was never sent.
+    if web3.eth.get_transaction_count(signer, "pending") <= record["nonce"]:
+        return "retry"
+    return "unresolved"
+
+
+def create_characters(
+    contract: Any,
+    players: List[str],
+    transaction_config: Dict[str, Any],
+    journal_file: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    confirmations: int = 1,
+    progress: bool = True,
+) -> Dict[str, Any]:
+    """
+    Creates a character for each of the given players. Returns a report of the run.
+
+    Inputs:
+    - contract
+      CharactersFacet object for the contract
+    - players
+      Addresses of the players to create characters for
+    - transaction_config
+      brownie transaction config (the "nonce" and "required_confs" keys are ignored)
+    - journal_file
+      Path to NDJSON journal. If the journal already exists, the run it records is resumed.
+    - concurrency
+      Maximum number of transactions in flight at the same time
+    - confirmations
+      Number of confirmations to wait for before considering a character created
+    - progress
+      Set to False to disable the progress bar
+    """
+    contract.assert_contract_is_instantiated()
+    signer = str(transaction_config["from"])
+    manager = nonces.get_nonce_manager(signer)
+    config = {
+        key: value
+        for key, value in transaction_config.items()
+        if key not in ("nonce", "required_confs")
+    }
+
+    previous = read_journal(journal_file)
+    with Journal(journal_file) as journal:
+        pending_indices: List[int] = []
+        skipped = 0
+        unresolved: List[int] = []
+        for index in range(len(players)):
+            record = previous.get(index)
+            if record is None:
+                pending_indices.append(index)
+                continue
+            resolution = resolve_record(record, signer)
+            if resolution == "confirmed":
+                if record["status"] != "confirmed":
+                    journal.record(index, "confirmed", txid=record.get("txid"))
+                skipped += 1
+            elif resolution == "retry":
+                pending_indices.append(index)
+            else:
+                unresolved.append(index)
+        manager.sync()
+
+        latencies: List[float] = []
+        failures: List[Tuple[int, str]] = []
+        results_lock = threading.Lock()
+
+        with tqdm(
+            total=len(pending_indices), disable=not progress, unit="characters"
+        ) as progress_bar:
+
+            def create(index: int) -> None:
+                player = players[index]
+                started_at = time.perf_counter()
+
+                def send(player: str, tx_config: Dict[str, Any]) -> Any:
+                    journal.record(
+                        index, "sending", player=player, nonce=tx_config["nonce"]
+                    )
+                    return contract.create_character(player, tx_config)
+
+                try:
+                    transaction = manager.transact(
+                        send, player, transaction_config={**config, "required_confs": 0}
+                    )
+                except Exception as e:
+                    if getattr(e, "txid", None) is not None:
+                        # The transaction was broadcast. A resumed run looks up its receipt.
+                        journal.record(index, "submitted", txid=e.txid, error=str(e))
+                    elif nonces.may_have_been_broadcast(e):
+                        # A resumed run checks whether the nonce was used before sending again.
+                        journal.record(index, "sending", error=str(e))
+                    else:
+                        journal.record(index, "failed", error=str(e))
+                    with results_lock:
+                        if nonces.may_have_been_broadcast(e):
+                            unresolved.append(index)
+                        else:
+                            failures.append((index, str(e)))
+                        progress_bar.update(1)
+                    return
+
+                journal.record(
+                    index, "submitted", txid=transaction.txid, nonce=transaction.nonce
+                )
+                nonces.wait_for_receipts([transaction], confirmations)
+                latency = time.perf_counter() - started_at
+                if transaction.status == 1:
+                    journal.record(
+                        index,
+                        "confirmed",
+                        txid=transaction.txid,
+                        block=transaction.block_number,
+                    )
+                else:
+                    journal.record(
+                        index,
+                        "failed",
+                        txid=transaction.txid,
+                        error=transaction.revert_msg,
+                    )
+                with results_lock:
+                    if transaction.status == 1:
+                        latencies.append(latency)
+                    else:
+                        failures.append((index, str(transaction.revert_msg)))
+                    progress_bar.update(1)
+
+            started_at = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                list(executor.map(create, pending_indices))
+            duration = time.perf_counter() - started_at
+
+    return {
+        "players": len(players),
+        "skipped": skipped,
+        "confirmed": len(latencies),
+        "failed": [{"index": index, "error": error} for index, error in failures],
+        "unresolved": unresolved,
+        "seconds": duration,
+        "throughput": len(latencies) / duration if duration > 0 else None,
+        "latency": {
+            "p50": percentile(latencies, 0.5),
+            "p90": percentile(latencies, 0.9),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies) if latencies else None,
+        },
+        "histogram": latency_histogram(latencies),
+    }
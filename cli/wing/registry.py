@@ -0,0 +1,150 @@
+"""
+Process-wide registry of brownie objects which are expensive to construct.
+
+Loading the brownie project scans (and, if necessary, compiles) every contract in the project. The
+registry does this at most once per process, the first time a ContractContainer is requested, and
+hands out the same ContractContainer for a contract for as long as its build artifact is unchanged.
+
+Constructing a contract wrapper (e.g. wing.CharactersFacet.CharactersFacet) for a deployed contract
+loads its ABI and builds a brownie Contract from it. The registry also hands out the same wrapper
+for the same contract at the same address on the same network, for as long as its build artifact is
+unchanged.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
+
+from brownie import network, project
+from brownie.network.contract import ContractContainer
+from eth_utils import to_checksum_address
+
+from . import abi
+
+PROJECT_NAME = "moonworm"
+
+# Maximum number of contract wrappers to hold. The least recently used wrapper is forgotten first.
+MAX_WRAPPERS = 1024
+
+Wrapper = TypeVar("Wrapper")
+
+_lock = threading.RLock()
+_project: Optional[project.main.Project] = None
+# ContractContainers keyed by build artifact path. Values are of the form (mtime_ns, size, container).
+_containers: Dict[str, Tuple[int, int, ContractContainer]] = {}
+# Contract wrappers keyed by (contract name, address, network). Values are of the form
+# (mtime_ns, size, wrapper), where mtime_ns and size are those of the contract's build artifact.
+_wrappers: "OrderedDict[Tuple[str, str, Optional[str]], Tuple[int, int, Any]]" = (
+    OrderedDict()
+)
+
+
+def get_project(project_directory: str = abi.PROJECT_DIRECTORY) -> project.main.Project:
+    """
+    Returns the brownie project for this repository, loading it if it has not already been loaded in
+    this process.
+    """
+    global _project
+    with _lock:
+        if _project is None:
+            _project = project.main.Project(PROJECT_NAME, Path(project_directory))
+        return _project
+
+
+def contract_container(
+    contract_name: str, build_directory: str = abi.BUILD_DIRECTORY
+) -> ContractContainer:
+    """
+    Returns a ContractContainer (which can be used to deploy and verify contracts) for the given
+    contract.
+
+    Inputs:
+    - contract_name
+      Name of contract
+    - build_directory
+      Directory containing the build artifacts (default: build/contracts in the wing project)
+    """
+    build_path = os.path.join(build_directory, f"{contract_name}.json")
+    if not os.path.isfile(build_path):
+        raise IOError(
+            f"File does not exist: {build_path}. Maybe you have to compile the smart contracts?"
+        )
+
+    stat = os.stat(build_path)
+    with _lock:
+        cached = _containers.get(build_path)
+        if (
+            cached is not None
+            and cached[0] == stat.st_mtime_ns
+            and cached[1] == stat.st_size
+        ):
+            return cached[2]
+
+        build = abi.load_artifact(build_path, None)
+        container = ContractContainer(get_project(), build)
+        _containers[build_path] = (stat.st_mtime_ns, stat.st_size, container)
+        return container
+
+
+def contract_wrapper(
+    wrapper_class: Type[Wrapper],
+    address: Optional[str],
+    build_directory: str = abi.BUILD_DIRECTORY,
+) -> Wrapper:
+    """
+    Returns a wrapper of the given class (one of the contract classes generated by moonworm, e.g.
+    wing.CharactersFacet.CharactersFacet) for the contract at the given address on the connected
+    network. Wrappers are shared, so callers must not deploy through them. Without an address,
+    returns a new wrapper (which can be used to deploy the contract).
+
+    Inputs:
+    - wrapper_class
+      Contract wrapper class, named after the contract it wraps
+    - address
+      Address of the deployed contract
+    - build_directory
+      Directory containing the build artifacts (default: build/contracts in the wing project)
+    """
+    if address is None:
+        return wrapper_class(None)
+
+    contract_name = wrapper_class.__name__
+    stat = os.stat(os.path.join(build_directory, f"{contract_name}.json"))
+    key = (contract_name, to_checksum_address(address), network.show_active())
+    with _lock:
+        cached = _wrappers.get(key)
+        if (
+            cached is not None
+            and cached[0] == stat.st_mtime_ns
+            and cached[1] == stat.st_size
+        ):
+            _wrappers.move_to_end(key)
+            return cached[2]
+
+    # Constructed outside the lock, so that other threads are not held up by Contract.from_abi.
+    wrapper = wrapper_class(key[1])
+    with _lock:
+        _wrappers[key] = (stat.st_mtime_ns, stat.st_size, wrapper)
+        _wrappers.move_to_end(key)
+        while len(_wrappers) > MAX_WRAPPERS:
+            _wrappers.popitem(last=False)
+    return wrapper
+
+
+def invalidate() -> None:
+    """
+    Closes the loaded project and forgets it, all ContractContainers and all contract wrappers. The
+    next request for a ContractContainer reloads the project. Call this after recompiling the
+    contracts from within a running process.
+    """
+    global _project
+    with _lock:
+        if _project is not None:
+            # Removes the project's contracts from brownie's global state, so that loading it again
+            # does not fail because a project with the same name is already loaded.
+            _project.close(raises=False)
+        _project = None
+        _containers.clear()
+        _wrappers.clear()
@@ -0,0 +1,436 @@
+"""
+Cached routing tables of Diamond contracts.
+
+The routing table of a Diamond maps each function selector to the address of the facet which serves
+it. RoutingCache reads the routing table of a Diamond with a single DiamondLoupeFacet.facets call and
+stores it on disk, as a snapshot which records the range of blocks it is known to be valid for. A
+snapshot stays valid until the Diamond emits a DiamondCut event, so bringing a snapshot up to date
+only takes a single eth_getLogs request for DiamondCut events since the end of its range. The
+routing table is only read again when there have been cuts.
+
+Lookups (facet_address, facet_function_selectors, facets) are answered from the in-memory
+RoutingTable, without any RPC. RoutingCache brings the latest routing table of a Diamond up to date
+(with one eth_blockNumber request, plus the requests above if there are new blocks) the first time it
+is looked up, and after that only when RoutingCache.refresh is called or the table is older than the
+cache's max_age, so repeated lookups at the latest block make no RPC calls at all.
+
+Snapshots are stored as JSON, one file per (chain ID, Diamond address), in the cache directory
+(WING_CACHE_DIR, or ~/.cache/wing by default). Each file holds up to MAX_SNAPSHOTS snapshots of
+the Diamond, taken at different blocks. The hash of the last block of the most recent snapshot is
+recorded with it, and checked whenever the cache is brought up to date, so that snapshots from a
+chain which has since reorganized (or a development chain which has been restarted) are discarded
+rather than extended. Lookups at blocks a snapshot already covers are trusted without any check.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from brownie import network, web3
+from web3.exceptions import BlockNotFound
+
+from . import abi, crawler, DiamondLoupeFacet, registry
+
+DIAMOND_CUT = {
+    "anonymous": False,
+    "inputs": [
+        {
+            "components": [
+                {"internalType": "address", "name": "facetAddress", "type": "address"},
+                {
+                    "internalType": "enum IDiamondCut.FacetCutAction",
+                    "name": "action",
+                    "type": "uint8",
+                },
+                {
+                    "internalType": "bytes4[]",
+                    "name": "functionSelectors",
+                    "type": "bytes4[]",
+                },
+            ],
+            "indexed": False,
+            "internalType": "struct IDiamondCut.FacetCut[]",
+            "name": "_diamondCut",
+            "type": "tuple[]",
+        },
+        {
+            "indexed": False,
+            "internalType": "address",
+            "name": "_init",
+            "type": "address",
+        },
+        {
+            "indexed": False,
+            "internalType": "bytes",
+            "name": "_calldata",
+            "type": "bytes",
+        },
+    ],
+    "name": "DiamondCut",
+    "type": "event",
+}
+
+DIAMOND_CUT_TOPIC = abi.to_hex(abi.encode_event_topic(DIAMOND_CUT))
+
+CACHE_DIRECTORY_ENV_VAR = "WING_CACHE_DIR"
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "wing")
+
+# Maximum number of snapshots kept for each Diamond. The oldest snapshots are discarded first.
+MAX_SNAPSHOTS = 16
+
+
+def normalize_selector(selector: Any) -> str:
+    """
+    Returns the given selector (bytes or hex string, with or without 0x prefix) as a lowercase
+    0x-prefixed hex string, so that selectors read from a Diamond can be compared against selectors
+    from the selector index.
+    """
+    return abi.to_hex(selector).lower()
+
+
+def diamond_routing(
+    diamond_address: str, block_number: Optional[Union[str, int]] = "latest"
+) -> Dict[str, str]:
+    """
+    Reads the routing table of the given Diamond contract - a dictionary mapping each selector to
+    the address of the facet it is routed to - with a single call to DiamondLoupeFacet.facets.
+    """
+    loupe = registry.contract_wrapper(
+        DiamondLoupeFacet.DiamondLoupeFacet, diamond_address
+    )
+    routing: Dict[str, str] = {}
+    for facet_address, selectors in loupe.facets(block_number):
+        for selector in selectors:
+            routing[normalize_selector(selector)] = str(facet_address)
+    return routing
+
+
+def block_hash(block_number: int) -> Optional[str]:
+    try:
+        return abi.to_hex(bytes(web3.eth.get_block(block_number)["hash"]))
+    except BlockNotFound:
+        return None
+
+
+def last_cut_block(
+    diamond_address: str, from_block: int, to_block: int
+) -> Optional[int]:
+    """
+    Returns the number of the last block between from_block and to_block (inclusive) in which the
+    given Diamond emitted a DiamondCut event, or None if it emitted none.
+    """
+    fetcher = crawler.AdaptiveLogFetcher(
+        lambda window_start, window_end: web3.eth.get_logs(
+            {
+                "address": diamond_address,
+                "fromBlock": window_start,
+                "toBlock": window_end,
+                "topics": [DIAMOND_CUT_TOPIC],
+            }
+        ),
+        initial_window=max(to_block - from_block + 1, 1),
+    )
+    last_block: Optional[int] = None
+    for window in fetcher.windows(from_block, to_block):
+        for log in window.logs:
+            last_block = max(log["blockNumber"], last_block or 0)
+    return last_block
+
+
+class RoutingTable:
+    """
+    Routing table of a Diamond contract, valid for all blocks from from_block to to_block
+    (inclusive). All lookups are local.
+    """
+
+    def __init__(
+        self, address: str, from_block: int, to_block: int, routing: Dict[str, str]
+    ) -> None:
+        self.address = address
+        self.from_block = from_block
+        self.to_block = to_block
+        self.routing = routing
+
+    def facet_address(self, selector: Any) -> Optional[str]:
+        """
+        Returns the address of the facet which serves the given selector, or None if the Diamond
+        does not route the selector.
+        """
+        return self.routing.get(normalize_selector(selector))
+
+    def facet_function_selectors(self, facet_address: str) -> List[str]:
+        facet_address = facet_address.lower()
+        return [
+            selector
+            for selector, address in self.routing.items()
+            if address.lower() == facet_address
+        ]
+
+    def facet_addresses(self) -> List[str]:
+        return list(dict.fromkeys(self.routing.values()))
+
+    def facets(self) -> List[List[Any]]:
+        """
+        Returns the routing table in the form returned by DiamondLoupeFacet.facets:
+        [[facet_address, [selector, ...]], ...]
+        """
+        return [
+            [facet_address, self.facet_function_selectors(facet_address)]
+            for facet_address in self.facet_addresses()
+        ]
+
+
+class RoutingCache:
+    """
+    Inputs:
+    - cache_directory
+      Directory to cache routing tables in (default: $WING_CACHE_DIR, or ~/.cache/wing)
+    - max_age
+      Number of seconds after which the latest routing table of a Diamond is brought up to date
+      again when it is looked up. If None, it is only brought up to date by refresh.
+    """
+
+    def __init__(
+        self, cache_directory: Optional[str] = None, max_age: Optional[float] = None
+    ) -> None:
+        if cache_directory is None:
+            cache_directory = os.environ.get(
+                CACHE_DIRECTORY_ENV_VAR, DEFAULT_CACHE_DIRECTORY
+            )
+        self.cache_directory = os.path.join(cache_directory, "routing")
+        self.max_age = max_age
+        self._chain_id: Optional[int] = None
+        # Snapshots which have already been loaded in this process, keyed by cache file path.
+        self._snapshots: Dict[str, List[Dict[str, Any]]] = {}
+        # Latest routing tables, keyed by cache file path. Values are of the form
+        # (time.monotonic() when the table was brought up to date, table).
+        self._latest: Dict[str, Tuple[float, RoutingTable]] = {}
+
+    def cache_path(self, diamond_address: str) -> str:
+        if self._chain_id is None:
+            self._chain_id = web3.eth.chain_id
+        return os.path.join(
+            self.cache_directory, f"{self._chain_id}-{diamond_address.lower()}.json"
+        )
+
+    def load(self, diamond_address: str) -> List[Dict[str, Any]]:
+        """
+        Returns the snapshots of the given Diamond, most recent first.
+        """
+        path = self.cache_path(diamond_address)
+        snapshots = self._snapshots.get(path)
+        if snapshots is not None:
+            return snapshots
+        snapshots = []
+        if os.path.isfile(path):
+            try:
+                with open(path, "r") as ifp:
+                    snapshots = json.load(ifp)["snapshots"]
+            except (OSError, ValueError, KeyError):
+                snapshots = []
+        self._snapshots[path] = snapshots
+        return snapshots
+
+    def store(self, diamond_address: str, snapshots: List[Dict[str, Any]]) -> None:
+        path = self.cache_path(diamond_address)
+        snapshots = sorted(
+            snapshots, key=lambda snapshot: snapshot["to_block"], reverse=True
+        )[:MAX_SNAPSHOTS]
+        self._snapshots[path] = snapshots
+        try:
+            os.makedirs(self.cache_directory, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as ofp:
+                json.dump({"address": diamond_address, "snapshots": snapshots}, ofp)
+            os.replace(temp_path, path)
+        except OSError:
+            # The cache is only a cache - an unwritable cache directory should not prevent anything
+            # from working.
+            pass
+
+    def clear(self, diamond_address: str) -> None:
+        path = self.cache_path(diamond_address)
+        self._snapshots.pop(path, None)
+        self._latest.pop(path, None)
+        if os.path.isfile(path):
+            os.remove(path)
+
+    def refresh(self, diamond_address: str) -> RoutingTable:
+        """
+        Brings the routing table of the given Diamond up to date with the latest block, and returns
+        it. Lookups at the latest block return this table until the next refresh.
+        """
+        table = self._table_at(diamond_address, web3.eth.block_number)
+        self._latest[self.cache_path(diamond_address)] = (time.monotonic(), table)
+        return table
+
+    def table(
+        self, diamond_address: str, block_number: Optional[int] = None
+    ) -> RoutingTable:
+        """
+        Returns the routing table of the given Diamond at the given block (default: latest block).
+
+        Inputs:
+        - diamond_address
+          Address of Diamond contract
+        - block_number
+          Block at which to return the routing table. Tables for blocks which are covered by an
+          existing snapshot are returned without any RPC. Without a block number, returns the table
+          from the last refresh (refreshing it first if it has never been refreshed in this
+          process, or if it is older than max_age).
+        """
+        if block_number is None:
+            latest = self._latest.get(self.cache_path(diamond_address))
+            if latest is None or (
+                self.max_age is not None and time.monotonic() - latest[0] > self.max_age
+            ):
+                return self.refresh(diamond_address)
+            return latest[1]
+        return self._table_at(diamond_address, block_number)
+
+    def _table_at(self, diamond_address: str, block_number: int) -> RoutingTable:
+        snapshots = self.load(diamond_address)
+        for snapshot in snapshots:
+            if snapshot["from_block"] <= block_number <= snapshot["to_block"]:
+                return self._table(diamond_address, snapshot)
+
+        latest = snapshots[0] if snapshots else None
+        if (
+            latest is not None
+            and block_hash(latest["to_block"]) != latest["block_hash"]
+        ):
+            # The chain has reorganized since the snapshots were taken.
+            snapshots = []
+            latest = None
+
+        if latest is not None and latest["to_block"] < block_number:
+            cut_block = last_cut_block(
+                diamond_address, latest["to_block"] + 1, block_number
+            )
+            if cut_block is None:
+                snapshot = {**latest, "to_block": block_number}
+                snapshots = [snapshot] + snapshots[1:]
+            else:
+                snapshot = self._read(diamond_address, cut_block, block_number)
+                snapshots = [snapshot] + snapshots
+        else:
+            snapshot = self._read(diamond_address, block_number, block_number)
+            snapshots = snapshots + [snapshot]
+
+        if snapshot["to_block"] >= snapshots[0]["to_block"]:
+            snapshot["block_hash"] = block_hash(snapshot["to_block"])
+        self.store(diamond_address, snapshots)
+        return self._table(diamond_address, snapshot)
+
+    def facet_address(
+        self, diamond_address: str, selector: Any, block_number: Optional[int] = None
+    ) -> Optional[str]:
+        return self.table(diamond_address, block_number).facet_address(selector)
+
+    def _read(
+        self, diamond_address: str, from_block: int, to_block: int
+    ) -> Dict[str, Any]:
+        return {
+            "from_block": from_block,
+            "to_block": to_block,
+            "routing": diamond_routing(diamond_address, to_block),
+        }
+
+    def _table(self, diamond_address: str, snapshot: Dict[str, Any]) -> RoutingTable:
+        return RoutingTable(
+            diamond_address,
+            snapshot["from_block"],
+            snapshot["to_block"],
+            snapshot["routing"],
+        )
+
+
+def handle_facet_address(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    table = RoutingCache(args.cache_dir).table(args.address, args.block_number)
+    json.dump(
+        {selector: table.facet_address(selector) for selector in args.selectors},
+        sys.stdout,
+        indent=4,
+    )
+
+
+def handle_facets(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    table = RoutingCache(args.cache_dir).table(args.address, args.block_number)
+    json.dump(
+        {
+            "address": table.address,
+            "from_block": table.from_block,
+            "to_block": table.to_block,
+            "facets": table.facets(),
+        },
+        sys.stdout,
+        indent=4,
+    )
+
+
+def handle_clear(args: argparse.Namespace) -> None:
+    network.connect(args.network)
+    RoutingCache(args.cache_dir).clear(args.address)
+
+
+def generate_cli() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Look up facets of Diamond contracts from a local cache of their routing tables"
+    )
+    parser.set_defaults(func=lambda _: parser.print_help())
+    subcommands = parser.add_subparsers()
+
+    def add_cache_arguments(subparser: argparse.ArgumentParser) -> None:
+        subparser.add_argument(
+            "--network", required=True, help="Name of brownie network to connect to"
+        )
+        subparser.add_argument(
+            "--address", required=True, help="Address of Diamond contract"
+        )
+        subparser.add_argument(
+            "--cache-dir",
+            required=False,
+            default=None,
+            help=f"Directory to cache routing tables in (default: ${CACHE_DIRECTORY_ENV_VAR}, or {DEFAULT_CACHE_DIRECTORY})",
+        )
+
+    facet_address_parser = subcommands.add_parser(
+        "facet-address",
+        description="Print the facet which serves each of the given selectors",
+    )
+    add_cache_arguments(facet_address_parser)
+    facet_address_parser.add_argument(
+        "--block-number",
+        required=False,
+        type=int,
+        help="Block at which to look up the selectors, defaults to latest",
+    )
+    facet_address_parser.add_argument(
+        "--selectors", required=True, nargs="+", help="Selectors to look up"
+    )
+    facet_address_parser.set_defaults(func=handle_facet_address)
+
+    facets_parser = subcommands.add_parser(
+        "facets", description="Print the routing table of a Diamond contract"
+    )
+    add_cache_arguments(facets_parser)
+    facets_parser.add_argument(
+        "--block-number",
+        required=False,
+        type=int,
+        help="Block at which to print the routing table, defaults to latest",
+    )
+    facets_parser.set_defaults(func=handle_facets)
+
+    clear_parser = subcommands.add_parser(
+        "clear", description="Forget the cached routing tables of a Diamond contract"
+    )
+    add_cache_arguments(clear_parser)
+    clear_parser.set_defaults(func=handle_clear)
+
+    return parser
@@ -0,0 +1,549 @@
+"""
+Long-lived wing server, which runs wing commands without paying wing's startup costs on every
+invocation.
+
+Every `wing` invocation imports brownie and the command group it runs, builds argument parsers,
+connects to a network (launching or attaching to its RPC), and loads contract build artifacts and
+ABIs. A wing server does all of this once and keeps it warm: it imports every command group up front,
+caches each group's argument parser, and stays connected to the networks its commands use.
+
+While a server is running, `wing` forwards its command line to the server (see wing.client) and
+prints the server's output, unless the WING_NO_SERVER environment variable is set. The server runs
+a command exactly as `wing` would, except that:
+- Commands which need a terminal are run locally instead: commands which read from stdin, and
+  transacting commands which would prompt for a password (pass --password, or use --signer-agent
+  with an account the signer agent already holds).
+- Commands from a different working directory than the server's are run locally, so that relative
+  paths in arguments keep their meaning.
+
+Commands run concurrently, except for transacting commands and dry runs, which run alone: they wait
+for the commands which are already running to finish, and the commands after them wait for them. A
+dry run on a development network snapshots the chain and reverts it afterwards, which would also
+roll back the transactions of any command running at the same time.
+
+The server listens on a Unix socket (WING_SERVER_SOCKET, or wing-server.sock in XDG_RUNTIME_DIR or
+the temporary directory by default) which only its owner can access, in the same way as the signer
+agent (see wing.signer_agent). It can also listen for HTTP POST requests on a localhost port; HTTP
+requests must carry the token the server writes (readable only by its owner) next to its socket, as
+"Authorization: Bearer <token>".
+
+Requests and responses are single lines of JSON (HTTP requests and responses have the same bodies):
+- {"argv": [<wing arguments>], "cwd": <working directory>}
+  Responds with {"stdout": <output>, "stderr": <error output>, "exit_code": <exit code>}, or with
+  {"fallback": true} if the command should be run locally
+- {"method": "status"}
+  Responds with {"pid": <pid>, "cwd": <working directory>, "network": <connected network>,
+  "in_flight": <number of commands running>}
+- {"method": "stop"}
+
+Errors are reported as {"error": <message>}.
+"""
+
+import argparse
+import http.server
+import importlib
+import io
+import json
+import os
+import secrets
+import socketserver
+import sys
+import threading
+import traceback
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from brownie import network
+from brownie._config import CONFIG
+
+from . import cli, client, signer_agent
+from .version import VERSION
+
+TOKEN_FILE_SUFFIX = ".token"
+
+
+class ThreadLocalStream:
+    """
+    Stands in for sys.stdout, sys.stderr or sys.stdin, so that each command the server runs reads and
+    writes its own streams while other commands run concurrently in other threads. Threads which are
+    not running a command use the stream the server was started with.
+    """
+
+    def __init__(self, default: Any) -> None:
+        self._default = default
+        self._local = threading.local()
+
+    def _target(self) -> Any:
+        return getattr(self._local, "stream", None) or self._default
+
+    @contextmanager
+    def redirect(self, stream: Any) -> Iterator[None]:
+        self._local.stream = stream
+        try:
+            yield
+        finally:
+            self._local.stream = None
+
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def read(self, *args: Any) -> str:
+        return self._target().read(*args)
+
+    def readline(self, *args: Any) -> str:
+        return self._target().readline(*args)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._target())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target(), name)
+
+
+class NetworkGate:
+    """
+    Makes brownie's network.connect idempotent, and serializes network switches.
+
+    Command handlers call network.connect at the start of every command, which fails if brownie is
+    already connected. Once the gate is installed, connecting to the network brownie is already
+    connected to is a no-op, and connecting to a different network waits for the commands which are
+    using the current network to finish before switching. A thread which is waiting to switch
+    networks (or disconnect) is not counted as using the network, so that two commands switching
+    networks at the same time wait for each other in turn rather than for each other forever.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        # Idents of the threads which are running commands on the connected network.
+        self._users: Set[int] = set()
+        self._connect = network.connect
+        self._disconnect = network.disconnect
+
+    def install(self) -> None:
+        network.connect = self.connect
+        network.disconnect = self.disconnect
+
+    def uninstall(self) -> None:
+        network.connect = self._connect
+        network.disconnect = self._disconnect
+
+    def _wait_for_other_users(self) -> None:
+        self._users.discard(threading.get_ident())
+        while self._users:
+            self._condition.wait()
+
+    def connect(
+        self, network_name: Optional[str] = None, launch_rpc: bool = True
+    ) -> None:
+        if network_name is None:
+            network_name = CONFIG.settings["networks"]["default"]
+        with self._condition:
+            if not (network.is_connected() and network.show_active() == network_name):
+                self._wait_for_other_users()
+                if network.is_connected():
+                    self._disconnect()
+                self._connect(network_name, launch_rpc)
+            self._users.add(threading.get_ident())
+
+    def disconnect(self, kill_rpc: bool = True) -> None:
+        with self._condition:
+            self._wait_for_other_users()
+            if network.is_connected():
+                self._disconnect(kill_rpc)
+
+    def release(self) -> None:
+        """
+        Marks the current thread as no longer using the connected network.
+        """
+        with self._condition:
+            self._users.discard(threading.get_ident())
+            self._condition.notify_all()
+
+    def in_flight(self) -> int:
+        with self._condition:
+            return len(self._users)
+
+
+class CommandLock:
+    """
+    Lets any number of commands run at the same time, except for exclusive commands, which run alone.
+    Commands which are waiting to run exclusively go before the commands which arrive after them.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._running = 0
+        self._exclusive = False
+        self._waiting_exclusive = 0
+
+    @contextmanager
+    def hold(self, exclusive: bool) -> Iterator[None]:
+        with self._condition:
+            if exclusive:
+                self._waiting_exclusive += 1
+                while self._exclusive or self._running:
+                    self._condition.wait()
+                self._waiting_exclusive -= 1
+                self._exclusive = True
+            else:
+                while self._exclusive or self._waiting_exclusive:
+                    self._condition.wait()
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._running -= 1
+                if exclusive:
+                    self._exclusive = False
+                self._condition.notify_all()
+
+
+def is_exclusive(args: argparse.Namespace) -> bool:
+    """
+    Checks whether the command with the given parsed arguments sends transactions or makes a dry run,
+    in which case it must not run at the same time as any other command.
+    """
+    return hasattr(args, "sender") or bool(getattr(args, "dry_run", False))
+
+
+def needs_terminal(args: argparse.Namespace) -> bool:
+    """
+    Checks whether the command with the given parsed arguments would read from stdin or prompt for a
+    password, in which case it has to run in the terminal it was invoked from.
+    """
+    # Commands which read input from a file read it from stdin when given "-".
+    if getattr(args, "infile", None) == "-":
+        return True
+    sender = getattr(args, "sender", None)
+    if sender is None or getattr(args, "password", None) is not None:
+        return False
+    if not getattr(args, "signer_agent", False):
+        return True
+    try:
+        socket_path = signer_agent.default_socket_path()
+        response = signer_agent.request(
+            socket_path,
+            {"method": "key", "keystore": signer_agent.keystore_path(sender)},
+        )
+    except Exception:
+        return True
+    return bool(response.get("locked"))
+
+
+class WingServer:
+    def __init__(self) -> None:
+        self.cwd = os.getcwd()
+        self.gate = NetworkGate()
+        self.command_lock = CommandLock()
+        # Argument parsers, keyed by command group.
+        self._parsers: Dict[Optional[str], argparse.ArgumentParser] = {}
+        self._parsers_lock = threading.Lock()
+        self.stdout = ThreadLocalStream(sys.stdout)
+        self.stderr = ThreadLocalStream(sys.stderr)
+        self.stdin = ThreadLocalStream(sys.stdin)
+        self.stop_event = threading.Event()
+
+    def warm_up(self) -> None:
+        """
+        Imports every command group which the server runs commands from.
+        """
+        for name, (module_name, _) in cli.COMMAND_GROUPS.items():
+            if name not in client.LOCAL_GROUPS:
+                importlib.import_module(module_name, cli.__package__)
+
+    def install(self) -> None:
+        """
+        Installs the network gate and the per-command streams.
+        """
+        self.gate.install()
+        sys.stdout = self.stdout
+        sys.stderr = self.stderr
+        sys.stdin = self.stdin
+
+    def uninstall(self) -> None:
+        self.gate.uninstall()
+        sys.stdout = self.stdout._default
+        sys.stderr = self.stderr._default
+        sys.stdin = self.stdin._default
+
+    def parser(self, argv: List[str]) -> argparse.ArgumentParser:
+        group = cli.selected_group(argv)
+        with self._parsers_lock:
+            if group not in self._parsers:
+                self._parsers[group] = cli.generate_cli(argv)
+            return self._parsers[group]
+
+    def run_command(self, argv: List[str], cwd: Optional[str]) -> Dict[str, Any]:
+        """
+        Runs the given wing command line and returns its output and exit code, or a fallback
+        response if the command should be run by the client instead.
+        """
+        if cwd is None or os.path.realpath(cwd) != os.path.realpath(self.cwd):
+            return {"fallback": True}
+        if cli.selected_group(argv) in client.LOCAL_GROUPS:
+            return {"fallback": True}
+        return self.execute(argv)
+
+    def execute(
+        self, argv: List[str], interactive: bool = False, stdin: str = ""
+    ) -> Dict[str, Any]:
+        """
+        Runs the given wing command line in the current thread and returns its output and exit code.
+        Unless interactive is True, returns a fallback response instead of running commands which
+        need a terminal (see needs_terminal). Transacting commands and dry runs wait until they can
+        run alone (see is_exclusive).
+        """
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        exit_code = 0
+        with self.stdout.redirect(stdout), self.stderr.redirect(
+            stderr
+        ), self.stdin.redirect(io.StringIO(stdin)):
+            try:
+                args = self.parser(argv).parse_args(argv)
+                if not interactive and needs_terminal(args):
+                    return {"fallback": True}
+                with self.command_lock.hold(is_exclusive(args)):
+                    args.func(args)
+            except SystemExit as e:
+                if e.code is None:
+                    exit_code = 0
+                elif isinstance(e.code, int):
+                    exit_code = e.code
+                else:
+                    print(e.code, file=stderr)
+                    exit_code = 1
+            except Exception:
+                traceback.print_exc(file=stderr)
+                exit_code = 1
+            finally:
+                self.gate.release()
+        return {
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+            "exit_code": exit_code,
+        }
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "version": VERSION,
+            "cwd": self.cwd,
+            "network": network.show_active(),
+            "in_flight": self.gate.in_flight(),
+        }
+
+    def handle_request_object(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if "argv" in request:
+            return self.run_command(request["argv"], request.get("cwd"))
+        method = request.get("method")
+        if method == "status":
+            return self.status()
+        elif method == "stop":
+            self.stop_event.set()
+            return {}
+        raise ValueError(f"Unknown method: {method}")
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, wing_server: WingServer) -> None:
+        self.socket_path = socket_path
+        self.wing_server = wing_server
+
+        socket_directory = os.path.dirname(os.path.abspath(socket_path))
+        os.makedirs(socket_directory, mode=0o700, exist_ok=True)
+        if os.stat(socket_directory).st_uid != os.getuid():
+            raise PermissionError(
+                f"Refusing to listen in {socket_directory}, which belongs to another user"
+            )
+        if os.path.exists(socket_path):
+            if is_running(socket_path):
+                raise RuntimeError(f"wing server is already running at {socket_path}")
+            os.remove(socket_path)
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, UnixRequestHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def verify_request(self, request: Any, client_address: Any) -> bool:
+        return signer_agent.peer_is_owner(request)
+
+
+class UnixRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                response = self.server.wing_server.handle_request_object(
+                    json.loads(line)
+                )
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class HTTPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port: int, token: str, wing_server: WingServer) -> None:
+        self.token = token
+        self.wing_server = wing_server
+        super().__init__(("127.0.0.1", port), HTTPRequestHandler)
+
+
+class HTTPRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        if not secrets.compare_digest(
+            self.headers.get("Authorization", ""), f"Bearer {self.server.token}"
+        ):
+            self.send_response(401)
+            self.end_headers()
+            return
+        try:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            response = self.server.wing_server.handle_request_object(json.loads(body))
+        except Exception as e:
+            response = {"error": str(e)}
+        encoded = json.dumps(response).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def request(socket_path: str, request_object: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sends a single request to the server listening on the given socket and returns its response.
+    """
+    sock = client.connect(socket_path)
+    if sock is None:
+        raise ConnectionError(f"No wing server is listening on {socket_path}")
+    with sock, sock.makefile("rwb") as stream:
+        stream.write((json.dumps(request_object) + "\n").encode("utf-8"))
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        raise ConnectionError(f"wing server at {socket_path} closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(f"wing server error: {response['error']}")
+    return response
+
+
+def is_running(socket_path: str) -> bool:
+    try:
+        request(socket_path, {"method": "status"})
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def write_token(path: str) -> str:
+    token = secrets.token_hex(32)
+    previous_umask = os.umask(0o177)
+    try:
+        with open(path, "w") as ofp:
+            ofp.write(token)
+    finally:
+        os.umask(previous_umask)
+    return token
+
+
+def serve(
+    socket_path: str, http_port: Optional[int] = None, warm_up: bool = True
+) -> None:
+    """
+    Runs a wing server on the given socket (and, optionally, on the given localhost HTTP port) until
+    it receives a stop request.
+    """
+    wing_server = WingServer()
+    unix_server = UnixServer(socket_path, wing_server)
+    servers: List[socketserver.BaseServer] = [unix_server]
+    token_path = socket_path + TOKEN_FILE_SUFFIX
+    if http_port is not None:
+        servers.append(HTTPServer(http_port, write_token(token_path), wing_server))
+
+    if warm_up:
+        wing_server.warm_up()
+    wing_server.install()
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        wing_server.stop_event.wait()
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        wing_server.uninstall()
+        for path in [socket_path, token_path]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def handle_start(args: argparse.Namespace) -> None:
+    print(f"wing server listening on {args.socket}", file=sys.stderr)
+    if args.http_port is not None:
+        print(
+            f"wing server listening on http://127.0.0.1:{args.http_port} (token: {args.socket}{TOKEN_FILE_SUFFIX})",
+            file=sys.stderr,
+        )
+    serve(args.socket, args.http_port)
+
+
+def handle_stop(args: argparse.Namespace) -> None:
+    request(args.socket, {"method": "stop"})
+
+
+def handle_status(args: argparse.Namespace) -> None:
+    json.dump(request(args.socket, {"method": "status"}), sys.stdout, indent=4)
+
+
+def generate_cli() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Long-lived wing server which keeps connections, contracts and parsers warm across wing invocations"
+    )
+    parser.set_defaults(func=lambda _: parser.print_help())
+    subcommands = parser.add_subparsers()
+
+    def add_socket_argument(subparser: argparse.ArgumentParser) -> None:
+        subparser.add_argument(
+            "--socket",
+            default=client.default_socket_path(),
+            help=f"Path to the server's Unix socket (default: ${client.SERVER_SOCKET_ENV_VAR}, or {client.default_socket_path()})",
+        )
+
+    start_parser = subcommands.add_parser(
+        "start",
+        description="Run a wing server in the foreground, in the current working directory",
+    )
+    add_socket_argument(start_parser)
+    start_parser.add_argument(
+        "--http-port",
+        type=int,
+        default=None,
+        help="Also listen for HTTP POST requests on this port on 127.0.0.1",
+    )
+    start_parser.set_defaults(func=handle_start)
+
+    stop_parser = subcommands.add_parser("stop", description="Stop the wing server")
+    add_socket_argument(stop_parser)
+    stop_parser.set_defaults(func=handle_stop)
+
+    status_parser = subcommands.add_parser(
+        "status", description="Show the state of the wing server"
+    )
+    add_socket_argument(status_parser)
+    status_parser.set_defaults(func=handle_status)
+
+    return parser
@@ -0,0 +1,377 @@
+"""
+Signer agent which keeps decrypted keystores in memory across wing invocations.
+
+Decrypting a keystore runs its key derivation function (usually scrypt), which takes hundreds of
+milliseconds or more by design. Transacting commands which are run with --signer-agent load the
+sender's account through the agent instead: the first time an account is used, the agent decrypts its
+keystore (with the password the command prompts for), and it hands out the decrypted key to every
+subsequent command without any key derivation until the account has been idle for the agent's idle
+timeout. The agent exits once it has held no accounts, and has had no requests for keys, for the
+idle timeout.
+
+The agent listens on a Unix socket (WING_SIGNER_AGENT_SOCKET, or wing-signer-agent.sock in
+XDG_RUNTIME_DIR or the temporary directory by default) which only its owner can access: the socket
+is created with mode 0600 in a directory with mode 0700, and on Linux the agent also refuses
+connections from processes owned by other users. Commands run with --signer-agent start the agent
+if it is not running.
+
+Requests and responses are single lines of JSON. Requests are objects with a "method" key:
+- {"method": "key", "keystore": <path>, "password": <password, optional>}
+  Responds with {"key": <private key>}, or {"locked": true} if the keystore is not held by the
+  agent and no password was given
+- {"method": "forget", "keystore": <path>}
+- {"method": "status"}
+  Responds with {"keystores": {<path>: <seconds until forgotten>}}
+- {"method": "stop"}
+
+Errors are reported as {"error": <message>}.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from getpass import getpass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from brownie import network
+from brownie._config import _get_data_folder
+from eth_account import Account
+
+from . import client
+
+SOCKET_PATH_ENV_VAR = "WING_SIGNER_AGENT_SOCKET"
+SOCKET_NAME = "wing-signer-agent.sock"
+
+DEFAULT_IDLE_TIMEOUT = 15 * 60
+# Seconds to wait for an agent started by a command to start listening.
+STARTUP_TIMEOUT = 10.0
+REAPER_INTERVAL = 1.0
+
+
+def default_socket_path() -> str:
+    return os.environ.get(SOCKET_PATH_ENV_VAR) or client.runtime_socket_path(
+        SOCKET_NAME
+    )
+
+
+def keystore_path(sender: str) -> str:
+    """
+    Resolves the given --sender to a keystore file in the same way as brownie's accounts.load: either
+    a path to a keystore file (with or without the .json extension), or the name of an account in
+    brownie's accounts directory.
+    """
+    json_file = Path(sender).expanduser()
+    if not json_file.exists() or json_file.is_dir():
+        if json_file.with_suffix(".json").exists():
+            json_file = json_file.with_suffix(".json")
+        else:
+            json_file = _get_data_folder().joinpath("accounts", json_file.name)
+            if json_file.suffix != ".json":
+                json_file = json_file.with_suffix(".json")
+            if not json_file.exists():
+                raise FileNotFoundError(f"Cannot find {json_file}")
+    return str(json_file.resolve())
+
+
+def peer_is_owner(connection: socket.socket) -> bool:
+    """
+    Checks that the process on the other end of the given Unix socket connection belongs to the
+    current user. Always true on platforms without SO_PEERCRED.
+    """
+    if not hasattr(socket, "SO_PEERCRED"):
+        return True
+    credentials = connection.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    _, uid, _ = struct.unpack("3i", credentials)
+    return uid == os.getuid()
+
+
+class SignerAgent(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(
+        self, socket_path: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    ) -> None:
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        # Decrypted keys, keyed by keystore path. Values are of the form
+        # (mtime_ns, private_key, last_used).
+        self.keys: Dict[str, Tuple[int, str, float]] = {}
+        self.last_activity = time.monotonic()
+        # Number of keystores being decrypted. The agent does not exit while it is decrypting.
+        self.decrypting = 0
+        self._lock = threading.Lock()
+
+        socket_directory = os.path.dirname(os.path.abspath(socket_path))
+        os.makedirs(socket_directory, mode=0o700, exist_ok=True)
+        if os.stat(socket_directory).st_uid != os.getuid():
+            raise PermissionError(
+                f"Refusing to listen in {socket_directory}, which belongs to another user"
+            )
+        if os.path.exists(socket_path):
+            if is_running(socket_path):
+                raise RuntimeError(f"Signer agent is already running at {socket_path}")
+            os.remove(socket_path)
+        # Create the socket with mode 0600 from the start, rather than changing its mode after it
+        # has been bound.
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, SignerAgentHandler)
+        finally:
+            os.umask(previous_umask)
+
+    def verify_request(self, request: Any, client_address: Any) -> bool:
+        return peer_is_owner(request)
+
+    def handle_request_object(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        method = request.get("method")
+        now = time.monotonic()
+        with self._lock:
+            # Only requests for keys count as activity. In particular, status requests (which are
+            # made to check whether the agent is running) must not keep an idle agent alive.
+            if method in ("key", "forget"):
+                self.last_activity = now
+            if method == "key":
+                path = request["keystore"]
+                mtime_ns = os.stat(path).st_mtime_ns
+                cached = self.keys.get(path)
+                if cached is not None and cached[0] == mtime_ns:
+                    self.keys[path] = (mtime_ns, cached[1], now)
+                    return {"key": cached[1]}
+                if request.get("password") is None:
+                    return {"locked": True}
+                self.decrypting += 1
+            elif method == "forget":
+                self.keys.pop(request["keystore"], None)
+                return {}
+            elif method == "status":
+                return {
+                    "keystores": {
+                        path: max(0.0, self.idle_timeout - (now - last_used))
+                        for path, (_, _, last_used) in self.keys.items()
+                    }
+                }
+            elif method == "stop":
+                threading.Thread(target=self.shutdown, daemon=True).start()
+                return {}
+            else:
+                raise ValueError(f"Unknown method: {method}")
+
+        # Decrypt outside the lock, so that other requests are not held up by key derivation.
+        try:
+            with open(path, "r") as ifp:
+                encrypted = json.load(ifp)
+            private_key = (
+                "0x" + bytes(Account.decrypt(encrypted, request["password"])).hex()
+            )
+        finally:
+            with self._lock:
+                self.decrypting -= 1
+                self.last_activity = time.monotonic()
+        with self._lock:
+            self.keys[path] = (mtime_ns, private_key, self.last_activity)
+        return {"key": private_key}
+
+    def reap(self) -> None:
+        """
+        Forgets keys which have been idle for longer than the idle timeout, and stops the agent once
+        it has held no keys for the idle timeout.
+        """
+        while True:
+            time.sleep(REAPER_INTERVAL)
+            now = time.monotonic()
+            with self._lock:
+                for path, (_, _, last_used) in list(self.keys.items()):
+                    if now - last_used > self.idle_timeout:
+                        del self.keys[path]
+                idle = (
+                    not self.keys
+                    and not self.decrypting
+                    and now - self.last_activity > self.idle_timeout
+                )
+            if idle:
+                self.shutdown()
+                return
+
+    def serve(self) -> None:
+        threading.Thread(target=self.reap, daemon=True).start()
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+class SignerAgentHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                response = self.server.handle_request_object(json.loads(line))
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+def request(socket_path: str, request_object: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sends a single request to the agent listening on the given socket and returns its response.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            stream.write((json.dumps(request_object) + "\n").encode("utf-8"))
+            stream.flush()
+            line = stream.readline()
+    if not line:
+        raise ConnectionError(f"Signer agent at {socket_path} closed the connection")
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(f"Signer agent error: {response['error']}")
+    return response
+
+
+def is_running(socket_path: str) -> bool:
+    try:
+        request(socket_path, {"method": "status"})
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def ensure_running(
+    socket_path: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+) -> None:
+    """
+    Starts an agent in the background on the given socket, unless one is already running there.
+    """
+    if is_running(socket_path):
+        return
+    subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "wing.cli",
+            "signer-agent",
+            "start",
+            "--socket",
+            socket_path,
+            "--idle-timeout",
+            str(idle_timeout),
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while not is_running(socket_path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Signer agent did not start listening on {socket_path}")
+        time.sleep(0.05)
+
+
+def load_account(
+    sender: str,
+    password: Optional[str] = None,
+    socket_path: Optional[str] = None,
+) -> Any:
+    """
+    Loads the account for the given --sender through the signer agent, starting the agent if it is
+    not running. Only prompts for a password if the agent does not already hold the account.
+    """
+    if socket_path is None:
+        socket_path = default_socket_path()
+    path = keystore_path(sender)
+    ensure_running(socket_path)
+
+    response = request(socket_path, {"method": "key", "keystore": path})
+    if response.get("locked"):
+        if password is None:
+            password = getpass(f'Enter password for "{Path(path).stem}": ')
+        response = request(
+            socket_path, {"method": "key", "keystore": path, "password": password}
+        )
+    return network.accounts.add(response["key"])
+
+
+def handle_start(args: argparse.Namespace) -> None:
+    agent = SignerAgent(args.socket, args.idle_timeout)
+    print(f"Signer agent listening on {args.socket}", file=sys.stderr)
+    agent.serve()
+
+
+def handle_stop(args: argparse.Namespace) -> None:
+    request(args.socket, {"method": "stop"})
+
+
+def handle_status(args: argparse.Namespace) -> None:
+    json.dump(request(args.socket, {"method": "status"}), sys.stdout, indent=4)
+
+
+def handle_forget(args: argparse.Namespace) -> None:
+    request(args.socket, {"method": "forget", "keystore": keystore_path(args.sender)})
+
+
+def generate_cli() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Signer agent which keeps decrypted keystores in memory across wing invocations"
+    )
+    parser.set_defaults(func=lambda _: parser.print_help())
+    subcommands = parser.add_subparsers()
+
+    def add_socket_argument(subparser: argparse.ArgumentParser) -> None:
+        subparser.add_argument(
+            "--socket",
+            default=default_socket_path(),
+            help=f"Path to the agent's Unix socket (default: ${SOCKET_PATH_ENV_VAR}, or {default_socket_path()})",
+        )
+
+    start_parser = subcommands.add_parser(
+        "start", description="Run a signer agent in the foreground"
+    )
+    add_socket_argument(start_parser)
+    start_parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help=f"Seconds after which an unused account is forgotten, and after which an agent which holds no accounts exits (default: {DEFAULT_IDLE_TIMEOUT})",
+    )
+    start_parser.set_defaults(func=handle_start)
+
+    stop_parser = subcommands.add_parser(
+        "stop", description="Stop the signer agent, forgetting every account"
+    )
+    add_socket_argument(stop_parser)
+    stop_parser.set_defaults(func=handle_stop)
+
+    status_parser = subcommands.add_parser(
+        "status",
+        description="List the keystores the signer agent holds, with the number of seconds until each is forgotten",
+    )
+    add_socket_argument(status_parser)
+    status_parser.set_defaults(func=handle_status)
+
+    forget_parser = subcommands.add_parser(
+        "forget", description="Make the signer agent forget an account"
+    )
+    add_socket_argument(forget_parser)
+    forget_parser.add_argument(
+        "--sender",
+        required=True,
+        help="Path to keystore file (or brownie account name)",
+    )
+    forget_parser.set_defaults(func=handle_forget)
+
+    return parser
@@ -0,0 +1,232 @@
+"""
+Full-collection snapshots of Great Wyrm Characters contracts.
+
+A snapshot enumerates every character (through totalSupply and tokenByIndex) at a single block and
+records its owner, metadata URI and metadata validity. Snapshots are written in columnar form:
+
+{
+    "address": "<contract address>",
+    "block": <block number>,
+    "total_supply": <number of characters>,
+    "columns": {
+        "token_id": [...],
+        "owner": [...],
+        "uri": [...],
+        "valid": [...]
+    }
+}
+
+While a snapshot is being taken, completed chunks are appended to a checkpoint file next to the
+output file (<outfile>.partial). If the export is interrupted, running it again with the same
+output file resumes from the checkpoint, at the block the snapshot was started at.
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from brownie import web3
+from tqdm import tqdm
+
+from . import characters_reads, multicall
+
+COLUMNS = ["token_id", "owner", "uri", "valid"]
+
+DEFAULT_CHUNK_SIZE = multicall.DEFAULT_BATCH_SIZE
+DEFAULT_CONCURRENCY = 4
+# Maximum number of calls in flight at the same time, across all chunks, without Multicall3.
+MAX_CONCURRENT_CALLS = multicall.DEFAULT_CONCURRENCY
+
+
+def checkpoint_path(outfile: str) -> str:
+    return f"{outfile}.partial"
+
+
+def read_checkpoint(path: str) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reads the records in the given checkpoint file. The first record is the snapshot header, and
+    every subsequent record is a completed chunk. A truncated final record (from an interruption
+    during a write) is ignored.
+
+    Returns the records and the size in bytes of the part of the file that they take up, to which
+    the file should be truncated before any more records are appended to it.
+    """
+    records: List[Dict[str, Any]] = []
+    offset = 0
+    with open(path, "rb") as ifp:
+        for line in ifp:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                records.append(json.loads(line.decode("utf-8")))
+            except ValueError:
+                break
+            offset += len(line)
+    return records, offset
+
+
+def snapshot_chunk(
+    contract: Any,
+    offset: int,
+    size: int,
+    block_number: int,
+    multicall_address: Optional[str],
+    call_concurrency: int = multicall.DEFAULT_CONCURRENCY,
+) -> Dict[str, Any]:
+    """
+    Reads the token IDs for the given range of indices, and then the owners, URIs and metadata
+    validity of those tokens, all at the given block. Without Multicall3, makes at most
+    call_concurrency calls at the same time.
+    """
+    read_options = {
+        "multicall_address": multicall_address,
+        "batch_size": size,
+        "block_number": block_number,
+        "concurrency": call_concurrency,
+    }
+    token_id_results = characters_reads.token_by_index_many(
+        contract, list(range(offset, offset + size)), **read_options
+    )
+    for index, result in enumerate(token_id_results, start=offset):
+        if not result.success:
+            raise Exception(f"Could not read token at index {index}: {result.error}")
+    token_ids = [result.value for result in token_id_results]
+
+    owners = characters_reads.owner_of_many(contract, token_ids, **read_options)
+    uris = characters_reads.token_uri_many(contract, token_ids, **read_options)
+    validities = characters_reads.is_metadata_valid_many(
+        contract, token_ids, **read_options
+    )
+
+    return {
+        "offset": offset,
+        "token_id": token_ids,
+        "owner": [str(result.value) if result.success else None for result in owners],
+        "uri": [result.value if result.success else None for result in uris],
+        "valid": [result.value if result.success else None for result in validities],
+    }
+
+
+def export_snapshot(
+    contract: Any,
+    outfile: str,
+    block_number: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    multicall_address: Optional[str] = multicall.MULTICALL3_ADDRESS,
+    progress: bool = True,
+) -> Dict[str, Any]:
+    """
+    Takes a snapshot of every character on the given contract and writes it to outfile. Returns
+    the snapshot.
+
+    Inputs:
+    - contract
+      CharactersFacet object for the contract
+    - outfile
+      Path to which to write the snapshot
+    - block_number
+      Block at which to take the snapshot (default: latest block). Ignored when resuming, since a
+      snapshot is always completed at the block it was started at.
+    - chunk_size
+      Number of characters to read in each chunk
+    - concurrency
+      Number of chunks to read at the same time
+    - multicall_address
+      Address of Multicall3 contract to make reads through. If None, reads are made as concurrent
+      individual calls (see wing.transport for JSON-RPC batching of those calls), with at most
+      MAX_CONCURRENT_CALLS calls in flight across all chunks.
+    - progress
+      Set to False to disable the progress bar
+    """
+    contract.assert_contract_is_instantiated()
+    partial_path = checkpoint_path(outfile)
+
+    records: List[Dict[str, Any]] = []
+    if os.path.isfile(partial_path):
+        records, valid_size = read_checkpoint(partial_path)
+        # Drops any truncated record, so that new chunks are not appended to it.
+        with open(partial_path, "r+b") as ofp:
+            ofp.truncate(valid_size)
+
+    if records:
+        header = records[0]
+        if header["address"] != contract.address:
+            raise ValueError(
+                f"Checkpoint {partial_path} is for a different contract: {header['address']}"
+            )
+        chunks = records[1:]
+    else:
+        if block_number is None:
+            block_number = web3.eth.block_number
+        header = {
+            "address": contract.address,
+            "block": block_number,
+            "total_supply": contract.total_supply(block_number),
+            "chunk_size": chunk_size,
+        }
+        chunks = []
+        with open(partial_path, "w") as ofp:
+            ofp.write(json.dumps(header) + "\n")
+
+    block_number = header["block"]
+    total_supply = header["total_supply"]
+    chunk_size = header["chunk_size"]
+
+    completed_offsets: Set[int] = {chunk["offset"] for chunk in chunks}
+    pending_offsets = [
+        offset
+        for offset in range(0, total_supply, chunk_size)
+        if offset not in completed_offsets
+    ]
+
+    # Shares the calls in flight between the chunks which are read at the same time.
+    call_concurrency = max(1, MAX_CONCURRENT_CALLS // concurrency)
+    write_lock = threading.Lock()
+    with tqdm(
+        total=total_supply,
+        initial=sum(len(chunk["token_id"]) for chunk in chunks),
+        disable=not progress,
+        unit="characters",
+    ) as progress_bar, open(partial_path, "a") as ofp:
+
+        def run_chunk(offset: int) -> None:
+            size = min(chunk_size, total_supply - offset)
+            chunk = snapshot_chunk(
+                contract,
+                offset,
+                size,
+                block_number,
+                multicall_address,
+                call_concurrency,
+            )
+            with write_lock:
+                ofp.write(json.dumps(chunk) + "\n")
+                ofp.flush()
+                chunks.append(chunk)
+                progress_bar.update(size)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # list() propagates the first exception raised by any chunk.
+            list(executor.map(run_chunk, pending_offsets))
+
+    chunks.sort(key=lambda chunk: chunk["offset"])
+    snapshot = {
+        "address": header["address"],
+        "block": block_number,
+        "total_supply": total_supply,
+        "columns": {
+            column: [value for chunk in chunks for value in chunk[column]]
+            for column in COLUMNS
+        },
+    }
+
+    temp_path = f"{outfile}.tmp"
+    with open(temp_path, "w") as ofp:
+        json.dump(snapshot, ofp, separators=(",", ":"))
+    os.replace(temp_path, outfile)
+    os.remove(partial_path)
+
+    return snapshot
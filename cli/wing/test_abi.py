@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+
+from . import abi
+
+OWNER_OF_ABI = {
+    "inputs": [{"internalType": "uint256", "name": "tokenId", "type": "uint256"}],
+    "name": "ownerOf",
+    "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+    "stateMutability": "view",
+    "type": "function",
+}
+
+TRANSFER_ABI = {
+    "anonymous": False,
+    "inputs": [
+        {"indexed": True, "internalType": "address", "name": "from", "type": "address"},
+        {"indexed": True, "internalType": "address", "name": "to", "type": "address"},
+        {
+            "indexed": True,
+            "internalType": "uint256",
+            "name": "tokenId",
+            "type": "uint256",
+        },
+    ],
+    "name": "Transfer",
+    "type": "event",
+}
+
+
+class ArtifactLoaderTests(unittest.TestCase):
+    def setUp(self):
+        self.project_dir = tempfile.TemporaryDirectory()
+        self.build_dir = os.path.join(self.project_dir.name, "build", "contracts")
+        os.makedirs(self.build_dir)
+        self.artifact = {
+            "abi": [OWNER_OF_ABI, TRANSFER_ABI],
+            "ast": {"nodes": [{"id": i, "src": "0:0:0"} for i in range(10000)]},
+            "bytecode": "0x" + "60" * 5000,
+            "contractName": "Characters",
+        }
+        self.artifact_path = os.path.join(self.build_dir, "Characters.json")
+        with open(self.artifact_path, "w") as ofp:
+            json.dump(self.artifact, ofp, sort_keys=True, indent=2)
+        abi.clear_selector_index_cache()
+
+    def tearDown(self):
+        self.project_dir.cleanup()
+        abi.clear_selector_index_cache()
+
+    def test_load_artifact_extracts_requested_fields(self):
+        """
+        Checks that load_artifact extracts exactly the requested fields, even when they straddle
+        read chunk boundaries.
+        """
+        chunk_size = abi.ARTIFACT_READ_CHUNK_SIZE
+        try:
+            abi.ARTIFACT_READ_CHUNK_SIZE = 13
+            abi._artifact_cache.clear()
+            fields = abi.load_artifact(
+                self.artifact_path, ("abi", "bytecode", "missing")
+            )
+        finally:
+            abi.ARTIFACT_READ_CHUNK_SIZE = chunk_size
+        self.assertEqual(
+            fields,
+            {"abi": self.artifact["abi"], "bytecode": self.artifact["bytecode"]},
+        )
+        self.assertEqual(abi.load_artifact(self.artifact_path, None), self.artifact)
+
+    def test_load_artifact_reloads_modified_artifacts(self):
+        """
+        Checks that load_artifact does not serve stale results for artifacts which have changed.
+        """
+        self.assertEqual(len(abi.get_abi_json("Characters", self.build_dir)), 2)
+        with open(self.artifact_path, "w") as ofp:
+            json.dump({"abi": [OWNER_OF_ABI]}, ofp)
+        self.assertEqual(abi.get_abi_json("Characters", self.build_dir), [OWNER_OF_ABI])
+
+    def test_selector_index(self):
+        """
+        Checks that the selector index contains function selectors and event topics, and that it is
+        persisted next to the build artifacts.
+        """
+        index = abi.selector_index(self.project_dir.name)
+        entry = index["Characters"]
+        self.assertEqual(
+            entry["functions"],
+            {"ownerOf(uint256)": abi.encode_function_signature(OWNER_OF_ABI)},
+        )
+        self.assertEqual(
+            entry["events"],
+            {"Transfer(address,address,uint256)": abi.encode_event_topic(TRANSFER_ABI)},
+        )
+
+        index_path = os.path.join(
+            self.project_dir.name, "build", abi.SELECTOR_INDEX_FILE
+        )
+        with open(index_path, "r") as ifp:
+            self.assertEqual(json.load(ifp), index)
@@ -0,0 +1,129 @@
+import io
+import json
+import threading
+import unittest
+
+from . import batch
+
+
+class BatchFileTests(unittest.TestCase):
+    def test_read_batch(self):
+        batch_file = io.StringIO(
+            "\n".join(
+                [
+                    "# Comment",
+                    "",
+                    "wing characters name --network development --address 0x1",
+                    "characters token-uri --network development --address 0x1 --token-id 1",
+                    'core facet-cut --facet-name "Characters Facet"',
+                    json.dumps({"argv": ["routing", "--help"], "stdin": "lol"}),
+                ]
+            )
+        )
+        commands = list(batch.read_batch(batch_file))
+        self.assertEqual([command.line for command in commands], [3, 4, 5, 6])
+        self.assertEqual(
+            commands[0].argv,
+            ["characters", "name", "--network", "development", "--address", "0x1"],
+        )
+        self.assertEqual(commands[1].argv[:2], ["characters", "token-uri"])
+        self.assertEqual(
+            commands[2].argv, ["core", "facet-cut", "--facet-name", "Characters Facet"]
+        )
+        self.assertEqual(commands[3].argv, ["routing", "--help"])
+        self.assertEqual(commands[3].stdin, "lol")
+
+    def test_invalid_lines(self):
+        with self.assertRaises(ValueError):
+            batch.parse_batch_line(1, '{"argv": "routing --help"}')
+        with self.assertRaises(ValueError):
+            batch.parse_batch_line(1, "{not json")
+        with self.assertRaises(ValueError):
+            batch.parse_batch_line(1, 'characters name --address "0x1')
+
+    def test_is_read(self):
+        runner = batch.BatchRunner()
+        reads = [
+            "characters name --network development --address 0x1",
+            "terminus balance-of --network development --address 0x1 --account 0x2 --id 1",
+        ]
+        non_reads = [
+            "characters approve --network development --address 0x1 --sender lol --operator 0x2 --token-id 1",
+            "characters verify-contract --network development --address 0x1",
+            "characters name --no-such-option",
+            "routing clear",
+        ]
+        runner.wing_server.install()
+        try:
+            for line in reads:
+                self.assertTrue(runner.is_read(batch.parse_batch_line(1, line)), line)
+            for line in non_reads:
+                self.assertFalse(runner.is_read(batch.parse_batch_line(1, line)), line)
+        finally:
+            runner.wing_server.uninstall()
+
+    def test_run_batch(self):
+        commands = batch.read_batch(
+            io.StringIO(
+                "\n".join(
+                    [
+                        "routing --help",
+                        "routing no-such-command",
+                        "serve status",
+                        "index --help",
+                    ]
+                )
+            )
+        )
+        output = io.StringIO()
+        num_commands, num_failed = batch.run_batch(commands, output)
+        self.assertEqual((num_commands, num_failed), (4, 2))
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([result["line"] for result in results], [1, 2, 3, 4])
+        self.assertEqual([result["exit_code"] for result in results], [0, 2, 2, 0])
+        self.assertIn("facet-address", results[0]["stdout"])
+        self.assertIn("invalid choice", results[1]["stderr"])
+        self.assertIn("Cannot run in a batch", results[2]["stderr"])
+
+    def test_stop_on_error(self):
+        commands = batch.read_batch(
+            io.StringIO("routing --help\nrouting no-such-command\nrouting --help\n")
+        )
+        output = io.StringIO()
+        self.assertEqual(
+            batch.run_batch(commands, output, stop_on_error=True),
+            (2, 1),
+        )
+
+    def test_reads_are_streamed(self):
+        """
+        Checks that the result of a read is yielded before the next command is available.
+        """
+
+        class FakeRunner(batch.BatchRunner):
+            def is_read(self, command):
+                return command.argv[0] == "read"
+
+            def run_command(self, command):
+                return {"line": command.line, "exit_code": 0}
+
+        first_result = threading.Event()
+
+        def commands():
+            yield batch.BatchCommand(1, ["read"])
+            yield batch.BatchCommand(2, ["read"])
+            # A producer which only writes more commands once it has seen the first results.
+            self.assertTrue(first_result.wait(10))
+            yield batch.BatchCommand(3, ["write"])
+            yield batch.BatchCommand(4, ["read"])
+
+        lines = []
+        for result in FakeRunner().run(commands()):
+            lines.append(result["line"])
+            first_result.set()
+        self.assertEqual(lines, [1, 2, 3, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
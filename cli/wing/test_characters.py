@@ -1,14 +1,28 @@
+import io
+import json
+import os
+import tempfile
 import unittest
 
 from brownie import accounts, network, web3 as web3_client, ZERO_ADDRESS
 from brownie.exceptions import VirtualMachineError
 from brownie.network import chain
+from eth_account import Account
 from moonworm.watch import _fetch_events_chunk
 
-from . import characters_events, CharactersFacet, MockERC20, MockTerminus
-from .core import characters_gogogo
+from . import (
+    batch,
+    characters_events,
+    CharactersFacet,
+    DiamondLoupeFacet,
+    MockERC20,
+    MockTerminus,
+)
+from .core import characters_gogogo, diamond_gogogo, multi_facet_cut, plan_upgrade
+from .routing import diamond_routing
 
 MAX_UINT = 2**256 - 1
+KEYSTORE_PASSWORD = "peppercorn"
 
 
 class CharactersTestCase(unittest.TestCase):
@@ -115,6 +129,49 @@ class CharactersSetupTests(CharactersTestCase):
         self.assertEqual(self.characters.symbol(), self.contract_symbol)
         self.assertEqual(self.characters.contract_uri(), self.contract_uri)
 
+    def test_characters_setup_attaches_facets_in_one_transaction(self):
+        """
+        Checks that characters_gogogo attaches (and initializes) every facet in a single diamondCut
+        transaction: one transaction for each of the 5 contracts it deploys, and one for the cut.
+        """
+        self.assertEqual(
+            self.deployed_contracts["attached"],
+            ["DiamondLoupeFacet", "OwnershipFacet", "CharactersFacet"],
+        )
+        self.assertEqual(
+            set(self.deployed_contracts["contracts"]),
+            {
+                "DiamondCutFacet",
+                "Diamond",
+                "DiamondLoupeFacet",
+                "OwnershipFacet",
+                "CharactersFacet",
+            },
+        )
+        self.assertEqual(self.postdeployment_block - self.predeployment_block, 6)
+
+    def test_diamond_gogogo_reports_failed_deployment(self):
+        """
+        Checks that, when one of the concurrent deployments fails, diamond_gogogo reports the failed
+        deployment along with the contracts which were deployed, and does not attach any facets.
+
+        The Diamond constructor attaches the DiamondCutFacet, which fails if there is no contract at
+        the DiamondCutFacet address.
+        """
+        result = diamond_gogogo(
+            self.owner.address,
+            self.owner_tx_config,
+            diamond_cut_address=self.random_person.address,
+        )
+        self.assertEqual(result["error"], "Failed to deploy Diamond")
+        self.assertEqual(result["attached"], [])
+        self.assertEqual(
+            result["contracts"]["DiamondCutFacet"], self.random_person.address
+        )
+        self.assertNotIn("Diamond", result["contracts"])
+        self.assertIn("DiamondLoupeFacet", result["contracts"])
+        self.assertIn("OwnershipFacet", result["contracts"])
+
 
 class CharacterCreationTests(CharactersTestCase):
     def test_character_creation_requires_character_creation_terminus_token(self):
@@ -441,3 +498,292 @@ class TestCharacterProfiles(CharactersTestCase):
         self.assertFalse(self.characters.is_metadata_valid(self.token_id))
         self.characters.set_metadata_validity(self.token_id, True, {"from": self.admin})
         self.assertTrue(self.characters.is_metadata_valid(self.token_id))
+
+
+class BatchEntrypointTests(CharactersTestCase):
+    # Number of characters created (or moderated) in each batch
+    BATCH_SIZE = 10
+
+    def test_create_characters(self):
+        """
+        Tests createCharacters
+
+        Checks that createCharacters burns one character creation token per player, creates
+        characters with consecutive token IDs for the players in order, and costs substantially less
+        gas per character than createCharacter.
+        """
+        self.terminus.mint(
+            self.player.address,
+            self.character_creation_terminus_pool_id,
+            self.BATCH_SIZE + 1,
+            "",
+            self.owner_tx_config,
+        )
+        players = [
+            self.random_person.address if i % 2 == 0 else self.admin.address
+            for i in range(self.BATCH_SIZE)
+        ]
+
+        single_tx = self.characters.create_character(
+            self.player.address, {"from": self.player}
+        )
+
+        total_supply_0 = self.characters.total_supply()
+        character_creation_token_balance_0 = self.terminus.balance_of(
+            self.player.address, self.character_creation_terminus_pool_id
+        )
+
+        batch_tx = self.characters.create_characters(players, {"from": self.player})
+
+        self.assertEqual(batch_tx.return_value, total_supply_0 + 1)
+        self.assertEqual(
+            self.characters.total_supply(), total_supply_0 + self.BATCH_SIZE
+        )
+        self.assertEqual(
+            self.terminus.balance_of(
+                self.player.address, self.character_creation_terminus_pool_id
+            ),
+            character_creation_token_balance_0 - self.BATCH_SIZE,
+        )
+        for i, player in enumerate(players):
+            self.assertEqual(self.characters.owner_of(total_supply_0 + 1 + i), player)
+
+        gas_per_character = batch_tx.gas_used / self.BATCH_SIZE
+        print(
+            f"\ncreateCharacter: {single_tx.gas_used} gas, createCharacters: {gas_per_character:.0f} gas per character"
+        )
+        self.assertLess(gas_per_character, single_tx.gas_used * 0.9)
+
+    def test_create_characters_requires_a_token_per_player(self):
+        """
+        Tests createCharacters
+
+        Checks that createCharacters reverts if the sender does not have a character creation token
+        for every player.
+        """
+        self.terminus.mint(
+            self.random_person.address,
+            self.character_creation_terminus_pool_id,
+            1,
+            "",
+            self.owner_tx_config,
+        )
+        total_supply_0 = self.characters.total_supply()
+
+        with self.assertRaises(VirtualMachineError):
+            self.characters.create_characters(
+                [self.random_person.address, self.random_person.address],
+                {"from": self.random_person},
+            )
+
+        self.assertEqual(self.characters.total_supply(), total_supply_0)
+
+    def test_set_metadata_validity_batch(self):
+        """
+        Tests setMetadataValidityBatch
+
+        Checks that game masters can set the metadata validity of many characters at once, at a
+        lower gas cost per character than setMetadataValidity, and that other accounts cannot.
+        """
+        self.terminus.mint(
+            self.player.address,
+            self.character_creation_terminus_pool_id,
+            self.BATCH_SIZE,
+            "",
+            self.owner_tx_config,
+        )
+        self.characters.create_characters(
+            [self.player.address] * self.BATCH_SIZE, {"from": self.player}
+        )
+        token_ids = [self.characters.total_supply() - i for i in range(self.BATCH_SIZE)]
+        valid = [i % 3 != 0 for i in range(self.BATCH_SIZE)]
+
+        with self.assertRaises(VirtualMachineError):
+            self.characters.set_metadata_validity_batch(
+                token_ids, valid, {"from": self.player}
+            )
+        with self.assertRaises(VirtualMachineError):
+            self.characters.set_metadata_validity_batch(
+                token_ids, valid[:-1], {"from": self.admin}
+            )
+        for token_id in token_ids:
+            self.assertFalse(self.characters.is_metadata_valid(token_id))
+
+        single_tx = self.characters.set_metadata_validity(
+            token_ids[0], True, {"from": self.admin}
+        )
+        batch_tx = self.characters.set_metadata_validity_batch(
+            token_ids, valid, {"from": self.admin}
+        )
+
+        for token_id, expected_validity in zip(token_ids, valid):
+            self.assertEqual(
+                self.characters.is_metadata_valid(token_id), expected_validity
+            )
+
+        gas_per_character = batch_tx.gas_used / self.BATCH_SIZE
+        print(
+            f"\nsetMetadataValidity: {single_tx.gas_used} gas, setMetadataValidityBatch: {gas_per_character:.0f} gas per character"
+        )
+        self.assertLess(gas_per_character, single_tx.gas_used)
+
+    def test_set_metadata_validity_batch_command(self):
+        """
+        Tests the set-metadata-validity-batch command
+
+        Checks that the values of --valid are parsed as booleans, so that the command can set
+        characters' metadata to valid and to invalid.
+        """
+        self.terminus.mint(
+            self.player.address,
+            self.character_creation_terminus_pool_id,
+            2,
+            "",
+            self.owner_tx_config,
+        )
+        self.characters.create_characters(
+            [self.player.address] * 2, {"from": self.player}
+        )
+        token_ids = [self.characters.total_supply() - 1, self.characters.total_supply()]
+        self.characters.set_metadata_validity(token_ids[1], True, {"from": self.admin})
+
+        # The command is sent by a new game master, with a keystore, so the admin lends them the
+        # (otherwise non-transferable) game master badge.
+        game_master = accounts.add()
+        self.owner.transfer(game_master, "1 ether")
+        self.terminus.set_pool_transferable(
+            self.admin_terminus_pool_id, True, self.owner_tx_config
+        )
+        self.terminus.safe_transfer_from(
+            self.admin.address,
+            game_master.address,
+            self.admin_terminus_pool_id,
+            1,
+            b"",
+            {"from": self.admin},
+        )
+        try:
+            with tempfile.TemporaryDirectory() as tempdir:
+                keystore_path = os.path.join(tempdir, "game_master.json")
+                with open(keystore_path, "w") as ofp:
+                    json.dump(
+                        Account.encrypt(game_master.private_key, KEYSTORE_PASSWORD), ofp
+                    )
+
+                command = f"characters set-metadata-validity-batch --network development --address {self.characters.address} --sender {keystore_path} --password {KEYSTORE_PASSWORD} --token-ids {token_ids[0]} {token_ids[1]} --valid true false"
+                results = list(
+                    batch.BatchRunner().run(batch.read_batch(io.StringIO(command)))
+                )
+        finally:
+            self.terminus.safe_transfer_from(
+                game_master.address,
+                self.admin.address,
+                self.admin_terminus_pool_id,
+                1,
+                b"",
+                {"from": game_master},
+            )
+            self.terminus.set_pool_transferable(
+                self.admin_terminus_pool_id, False, self.owner_tx_config
+            )
+
+        self.assertEqual(results[0]["exit_code"], 0, results)
+        self.assertTrue(self.characters.is_metadata_valid(token_ids[0]))
+        self.assertFalse(self.characters.is_metadata_valid(token_ids[1]))
+
+
+class UpgradePlanTests(CharactersTestCase):
+    def test_plan_upgrade(self):
+        """
+        Tests plan_upgrade
+
+        Checks that planning an upgrade to the CharactersFacet that is already attached produces no
+        cuts, that an upgrade to a new deployment of CharactersFacet only replaces its selectors
+        (leaving supportsInterface, which DiamondLoupeFacet takes precedence on, and the other facets
+        alone), and that the planned cuts can be applied in a single diamondCut transaction.
+        """
+        diamond_address = self.characters.address
+        current_facet_address = self.deployed_contracts["contracts"]["CharactersFacet"]
+        routing_0 = diamond_routing(diamond_address)
+
+        plan = plan_upgrade(diamond_address, {"CharactersFacet": current_facet_address})
+        self.assertEqual(plan["cuts"], [])
+        self.assertEqual(
+            plan["unchanged"],
+            len(
+                [
+                    address
+                    for address in routing_0.values()
+                    if address == current_facet_address
+                ]
+            ),
+        )
+
+        new_facet = CharactersFacet.CharactersFacet(None)
+        new_facet.deploy(self.owner_tx_config)
+        plan = plan_upgrade(diamond_address, {"CharactersFacet": new_facet.address})
+        self.assertEqual(plan["add"], 0)
+        self.assertEqual(plan["remove"], 0)
+        self.assertEqual(plan["unchanged"], 0)
+        self.assertEqual(len(plan["cuts"]), 1)
+        self.assertEqual(plan["cuts"][0][:2], [new_facet.address, 1])
+
+        multi_facet_cut(diamond_address, plan["cuts"], self.owner_tx_config)
+
+        routing_1 = diamond_routing(diamond_address)
+        self.assertEqual(set(routing_1), set(routing_0))
+        for selector, address in routing_0.items():
+            if address == current_facet_address:
+                self.assertEqual(routing_1[selector], new_facet.address)
+            else:
+                self.assertEqual(routing_1[selector], address)
+        self.assertEqual(self.characters.name(), self.contract_name)
+
+        loupe = DiamondLoupeFacet.DiamondLoupeFacet(diamond_address)
+        self.assertEqual(loupe.facet_address(plan["cuts"][0][2][0]), new_facet.address)
+        self.assertEqual(
+            plan_upgrade(diamond_address, {"CharactersFacet": new_facet.address})[
+                "cuts"
+            ],
+            [],
+        )
+
+
+class BatchCommandTests(CharactersTestCase):
+    def test_reads_see_earlier_transactions(self):
+        """
+        Checks that reads after a transaction in a batch see the state the transaction left behind,
+        and that concurrent reads are reported in the order of the batch.
+        """
+        account = Account.create()
+        self.owner.transfer(account.address, "1 ether")
+        with tempfile.TemporaryDirectory() as tempdir:
+            keystore_path = os.path.join(tempdir, "batch.json")
+            with open(keystore_path, "w") as ofp:
+                json.dump(Account.encrypt(account.key, KEYSTORE_PASSWORD), ofp)
+
+            terminus = self.terminus.address
+            characters = self.characters.address
+            operator = self.random_person.address
+            is_approved = f"terminus is-approved-for-all --network development --address {terminus} --account {account.address} --operator {operator}"
+            name = f"characters name --network development --address {characters}"
+            lines = [
+                is_approved,
+                name,
+                f"terminus set-approval-for-all --network development --address {terminus} --sender {keystore_path} --password {KEYSTORE_PASSWORD} --operator {operator} --approved true",
+                is_approved,
+                name,
+            ]
+            results = list(
+                batch.BatchRunner(concurrency=4).run(
+                    batch.read_batch(io.StringIO("\n".join(lines)))
+                )
+            )
+
+        self.assertEqual([result["line"] for result in results], [1, 2, 3, 4, 5])
+        self.assertEqual(
+            [result["exit_code"] for result in results], [0, 0, 0, 0, 0], results
+        )
+        self.assertEqual(results[0]["stdout"].strip(), "False")
+        self.assertEqual(results[3]["stdout"].strip(), "True")
+        self.assertEqual(results[1]["stdout"], results[4]["stdout"])
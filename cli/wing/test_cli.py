@@ -0,0 +1,119 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import unittest
+
+from . import client
+from .cli import COMMAND_GROUPS
+
+# Startup budgets (in seconds) for wing invocations, e.g. 0.5 for `wing --version` and 4.0 for
+# `wing <group> --help`. The group budget includes the time it takes to import brownie, which
+# dominates. Wall times depend on the machine, so the benchmarks only run when their budget is set.
+VERSION_STARTUP_BUDGET_ENV_VAR = "WING_VERSION_STARTUP_BUDGET"
+GROUP_STARTUP_BUDGET_ENV_VAR = "WING_GROUP_STARTUP_BUDGET"
+
+CLI_DIRECTORY = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+LOADED_MODULES_SCRIPT = """
+import json
+import sys
+
+sys.argv = ["wing"] + json.loads(sys.argv[1])
+
+from wing import cli
+
+try:
+    cli.main()
+except SystemExit:
+    pass
+
+print(json.dumps(sorted(sys.modules)), file=sys.stderr)
+"""
+
+
+def best_wall_time(command, runs=3):
+    """
+    Runs the given command the given number of times and returns the fastest wall time.
+    """
+    best = float("inf")
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        subprocess.run(
+            command,
+            cwd=CLI_DIRECTORY,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        best = min(best, time.perf_counter() - started_at)
+    return best
+
+
+def loaded_modules(argv):
+    """
+    Runs wing with the given arguments in a fresh interpreter and returns the names of all modules
+    which were imported in the process.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", LOADED_MODULES_SCRIPT, json.dumps(argv)],
+        cwd=CLI_DIRECTORY,
+        env=dict(os.environ, **{client.NO_SERVER_ENV_VAR: "1"}),
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    return set(json.loads(result.stderr.strip().splitlines()[-1]))
+
+
+class CLIStartupTests(unittest.TestCase):
+    def test_version_does_not_import_groups(self):
+        """
+        Checks that `wing --version` does not import brownie or any command group.
+        """
+        modules = loaded_modules(["--version"])
+        self.assertNotIn("brownie", modules)
+        for module_name, _ in COMMAND_GROUPS.values():
+            self.assertNotIn(f"wing{module_name}", modules)
+
+    def test_group_help_imports_only_selected_group(self):
+        """
+        Checks that `wing characters --help` imports the characters group and no other group.
+        """
+        modules = loaded_modules(["characters", "--help"])
+        self.assertIn("wing.CharactersFacet", modules)
+        for name, (module_name, _) in COMMAND_GROUPS.items():
+            if name != "characters":
+                self.assertNotIn(f"wing{module_name}", modules)
+
+    @unittest.skipUnless(
+        os.environ.get(VERSION_STARTUP_BUDGET_ENV_VAR),
+        f"{VERSION_STARTUP_BUDGET_ENV_VAR} is not set",
+    )
+    def test_version_startup_budget(self):
+        """
+        Benchmarks `wing --version` against the budget in WING_VERSION_STARTUP_BUDGET.
+        """
+        budget = float(os.environ[VERSION_STARTUP_BUDGET_ENV_VAR])
+        wall_time = best_wall_time([sys.executable, "-m", "wing.cli", "--version"])
+        print(f"wing --version: {wall_time:.3f}s", file=sys.stderr)
+        self.assertLess(wall_time, budget)
+
+    @unittest.skipUnless(
+        os.environ.get(GROUP_STARTUP_BUDGET_ENV_VAR),
+        f"{GROUP_STARTUP_BUDGET_ENV_VAR} is not set",
+    )
+    def test_group_help_startup_budget(self):
+        """
+        Benchmarks `wing <group> --help` against the budget in WING_GROUP_STARTUP_BUDGET for every
+        command group.
+        """
+        budget = float(os.environ[GROUP_STARTUP_BUDGET_ENV_VAR])
+        for name in COMMAND_GROUPS:
+            wall_time = best_wall_time(
+                [sys.executable, "-m", "wing.cli", name, "--help"], runs=1
+            )
+            print(f"wing {name} --help: {wall_time:.3f}s", file=sys.stderr)
+            self.assertLess(wall_time, budget, name)
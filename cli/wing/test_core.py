@@ -0,0 +1,45 @@
+import unittest
+
+from .core import FACET_ACTIONS, ZERO_ADDRESS, diff_routing
+
+OLD_FACET = "0x1111111111111111111111111111111111111111"
+NEW_FACET = "0x2222222222222222222222222222222222222222"
+OTHER_FACET = "0x3333333333333333333333333333333333333333"
+
+
+class DiffRoutingTests(unittest.TestCase):
+    def test_unchanged_routing_needs_no_cuts(self):
+        routing = {"0xaaaaaaaa": NEW_FACET, "0xbbbbbbbb": OTHER_FACET}
+        plan = diff_routing(routing, {"0xaaaaaaaa": NEW_FACET.lower()}, {NEW_FACET})
+        self.assertEqual(plan["cuts"], [])
+        self.assertEqual(plan["unchanged"], 1)
+
+    def test_diff_adds_replaces_and_removes_only_changed_selectors(self):
+        routing = {
+            "0xaaaaaaaa": OLD_FACET,
+            "0xbbbbbbbb": OLD_FACET,
+            "0xcccccccc": OLD_FACET,
+            "0xdddddddd": OTHER_FACET,
+        }
+        targets = {
+            "0xaaaaaaaa": NEW_FACET,
+            "0xbbbbbbbb": NEW_FACET,
+            "0xeeeeeeee": NEW_FACET,
+        }
+        plan = diff_routing(routing, targets, {OLD_FACET})
+        self.assertEqual(
+            plan["cuts"],
+            [
+                [NEW_FACET, FACET_ACTIONS["add"], ["0xeeeeeeee"]],
+                [NEW_FACET, FACET_ACTIONS["replace"], ["0xaaaaaaaa", "0xbbbbbbbb"]],
+                [ZERO_ADDRESS, FACET_ACTIONS["remove"], ["0xcccccccc"]],
+            ],
+        )
+        self.assertEqual(
+            (plan["add"], plan["replace"], plan["remove"], plan["unchanged"]),
+            (1, 2, 1, 0),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import unittest
+from typing import List, Tuple
+
+from . import crawler
+
+
+class FakeLogSource:
+    """
+    Serves one log per block in logs_at, and raises the same error as a provider with a result
+    limit when a query matches more than max_results logs.
+    """
+
+    def __init__(self, logs_at: List[int], max_results: int):
+        self.logs_at = logs_at
+        self.max_results = max_results
+        self.lock = threading.Lock()
+        self.requests: List[Tuple[int, int]] = []
+
+    def __call__(self, from_block: int, to_block: int) -> List[int]:
+        with self.lock:
+            self.requests.append((from_block, to_block))
+        logs = [block for block in self.logs_at if from_block <= block <= to_block]
+        if len(logs) > self.max_results:
+            raise ValueError(
+                {
+                    "code": -32005,
+                    "message": f"query returned more than {self.max_results} results",
+                }
+            )
+        return logs
+
+
+class AdaptiveLogFetcherTests(unittest.TestCase):
+    def test_windows_cover_range_in_order(self):
+        source = FakeLogSource(list(range(0, 1000, 7)), max_results=10)
+        fetcher = crawler.AdaptiveLogFetcher(
+            source, initial_window=50, target_logs=8, concurrency=3
+        )
+        results = list(fetcher.windows(0, 999))
+
+        self.assertEqual(results[0].from_block, 0)
+        self.assertEqual(results[-1].to_block, 999)
+        for previous, current in zip(results, results[1:]):
+            self.assertEqual(current.from_block, previous.to_block + 1)
+        self.assertEqual(
+            [log for result in results for log in result.logs],
+            list(range(0, 1000, 7)),
+        )
+        self.assertEqual(fetcher.stats, results)
+
+    def test_bisects_when_provider_reports_too_many_results(self):
+        source = FakeLogSource(list(range(100)), max_results=10)
+        fetcher = crawler.AdaptiveLogFetcher(
+            source, initial_window=100, target_logs=10, concurrency=1
+        )
+        results = list(fetcher.windows(0, 99))
+
+        self.assertEqual(
+            [log for result in results for log in result.logs], list(range(100))
+        )
+        self.assertTrue(all(len(result.logs) <= 10 for result in results))
+        self.assertTrue(any(result.depth > 0 for result in results))
+        self.assertLess(fetcher.window, 100)
+
+    def test_grows_window_when_sparse(self):
+        source = FakeLogSource([5, 50000], max_results=10)
+        fetcher = crawler.AdaptiveLogFetcher(
+            source, initial_window=10, target_logs=10, concurrency=2
+        )
+        results = list(fetcher.windows(0, 99999))
+
+        self.assertEqual([log for result in results for log in result.logs], [5, 50000])
+        # A fixed window of 10 blocks would have taken 10000 requests.
+        self.assertLess(len(source.requests), 50)
+
+    def test_other_errors_are_raised(self):
+        def fetch(from_block: int, to_block: int) -> List[int]:
+            raise ValueError("execution reverted")
+
+        fetcher = crawler.AdaptiveLogFetcher(fetch, initial_window=10)
+        with self.assertRaises(ValueError):
+            list(fetcher.windows(0, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
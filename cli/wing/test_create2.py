@@ -0,0 +1,115 @@
+import unittest
+
+from brownie import accounts, network
+from brownie.network import chain
+
+from . import DiamondLoupeFacet, create2, registry
+from .core import diamond_gogogo
+
+FACETS = ["DiamondCutFacet", "DiamondLoupeFacet", "OwnershipFacet"]
+
+
+class Create2AddressTests(unittest.TestCase):
+    def test_create2_address(self):
+        """
+        Checks create2_address against the examples in EIP-1014.
+        """
+        self.assertEqual(
+            create2.create2_address(
+                "0x0000000000000000000000000000000000000000", bytes(32), b"\x00"
+            ),
+            "0x4D1A2e2bB4F88F0250f26Ffff098B0b30B26BF38",
+        )
+        self.assertEqual(
+            create2.create2_address(
+                "0xdeadbeef00000000000000000000000000000000",
+                bytes.fromhex(
+                    "000000000000000000000000feed000000000000000000000000000000000000"
+                ),
+                b"\x00",
+            ),
+            "0xD04116cDd17beBE565EB2422F2497E06cC1C9833",
+        )
+        self.assertEqual(
+            create2.create2_address(
+                "0x00000000000000000000000000000000deadbeef",
+                bytes.fromhex(
+                    "00000000000000000000000000000000000000000000000000000000cafebabe"
+                ),
+                bytes.fromhex("deadbeef"),
+            ),
+            "0x60f3f640a8508fC6a86d45DF051962668E1e8AC7",
+        )
+
+
+class Create2DeploymentTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        try:
+            network.connect()
+        except:
+            pass
+
+        cls.owner = accounts[0]
+        cls.owner_tx_config = {"from": cls.owner}
+        cls.factory = registry.contract_container("Create2Factory").deploy(
+            cls.owner_tx_config
+        )
+
+    def test_diamond_gogogo_reuses_create2_facets(self):
+        """
+        Checks that diamond_gogogo deploys facets to their deterministic addresses through the
+        factory, and that a second Diamond reuses them, only deploying the Diamond itself and
+        attaching the facets.
+        """
+        expected_addresses = {
+            facet_name: create2.plan_deployment(self.factory.address, facet_name)[
+                "address"
+            ]
+            for facet_name in FACETS
+        }
+
+        first = diamond_gogogo(
+            self.owner.address,
+            self.owner_tx_config,
+            create2_factory=self.factory.address,
+        )
+        self.assertNotIn("error", first)
+        self.assertEqual(first["reused"], [])
+        for facet_name in FACETS:
+            self.assertEqual(
+                first["contracts"][facet_name], expected_addresses[facet_name]
+            )
+
+        predeployment_block = len(chain)
+        second = diamond_gogogo(
+            self.owner.address,
+            self.owner_tx_config,
+            create2_factory=self.factory.address,
+        )
+        self.assertNotIn("error", second)
+        self.assertEqual(second["reused"], FACETS)
+        self.assertNotEqual(
+            second["contracts"]["Diamond"], first["contracts"]["Diamond"]
+        )
+        for facet_name in FACETS:
+            self.assertEqual(
+                second["contracts"][facet_name], expected_addresses[facet_name]
+            )
+        # One transaction for the Diamond, one for the diamondCut.
+        self.assertEqual(len(chain) - predeployment_block, 2)
+
+        loupe = DiamondLoupeFacet.DiamondLoupeFacet(second["contracts"]["Diamond"])
+        self.assertEqual(set(loupe.facet_addresses()), set(expected_addresses.values()))
+
+    def test_missing_factory(self):
+        with self.assertRaises(ValueError):
+            diamond_gogogo(
+                self.owner.address,
+                self.owner_tx_config,
+                create2_factory=accounts[5].address,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
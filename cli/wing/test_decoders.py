@@ -0,0 +1,181 @@
+import time
+import unittest
+from typing import Any, Dict, List
+
+from eth_abi import encode
+from eth_abi.abi import default_codec
+from hexbytes import HexBytes
+from web3._utils.events import get_event_data
+
+from . import abi, characters_events, decoders
+
+EVENTS = [
+    characters_events.TRANSFER,
+    characters_events.CONTRACT_INFORMATION_SET,
+    characters_events.INVENTORY_SET,
+    characters_events.TOKEN_URI_SET,
+    characters_events.TOKEN_VALIDITY_SET,
+]
+
+CONTRACT_ADDRESS = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+PLAYER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+ADMIN = "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"
+
+EVENTS_BY_TOPIC = {
+    HexBytes(abi.encode_event_topic(event_abi)): event_abi for event_abi in EVENTS
+}
+
+# Number of logs decoded by each path in the benchmark.
+BENCHMARK_LOGS = 20000
+
+
+def make_log(
+    event_abi: Dict[str, Any], values: Dict[str, Any], index: int
+) -> Dict[str, Any]:
+    """
+    Encodes a log for the given event, in the form in which web3 returns logs from eth_getLogs.
+    """
+    topics = [HexBytes(abi.encode_event_topic(event_abi))]
+    data_types: List[str] = []
+    data_values: List[Any] = []
+    for item in event_abi["inputs"]:
+        if item["indexed"]:
+            topics.append(HexBytes(encode([item["type"]], [values[item["name"]]])))
+        else:
+            data_types.append(item["type"])
+            data_values.append(values[item["name"]])
+    return {
+        "address": CONTRACT_ADDRESS,
+        "blockHash": HexBytes(b"\x01" * 32),
+        "blockNumber": 100 + index // 10,
+        "data": HexBytes(encode(data_types, data_values)),
+        "logIndex": index % 10,
+        "removed": False,
+        "topics": topics,
+        "transactionHash": HexBytes(index.to_bytes(32, "big")),
+        "transactionIndex": 0,
+    }
+
+
+def sample_logs(num_logs: int) -> List[Dict[str, Any]]:
+    """
+    Returns a mix of Characters logs which is dominated (as a real crawl is) by Transfer,
+    TokenURISet and TokenValiditySet logs.
+    """
+    logs = [
+        make_log(
+            characters_events.CONTRACT_INFORMATION_SET,
+            {"name": "Great Wyrm", "symbol": "WYRM", "uri": "https://example.com"},
+            0,
+        ),
+        make_log(characters_events.INVENTORY_SET, {"inventoryAddress": ADMIN}, 1),
+    ]
+    while len(logs) < num_logs:
+        token_id = len(logs)
+        logs.append(
+            make_log(
+                characters_events.TRANSFER,
+                {
+                    "from": "0x0000000000000000000000000000000000000000",
+                    "to": PLAYER,
+                    "tokenId": token_id,
+                },
+                len(logs),
+            )
+        )
+        logs.append(
+            make_log(
+                characters_events.TOKEN_URI_SET,
+                {
+                    "tokenId": token_id,
+                    "changer": PLAYER,
+                    "uri": f"https://example.com/characters/{token_id}/profile.json",
+                },
+                len(logs),
+            )
+        )
+        logs.append(
+            make_log(
+                characters_events.TOKEN_VALIDITY_SET,
+                {"tokenId": token_id, "changer": ADMIN, "valid": token_id % 2 == 0},
+                len(logs),
+            )
+        )
+    return logs[:num_logs]
+
+
+def web3_decode(log: Dict[str, Any]) -> decoders.IndexedEvent:
+    event = get_event_data(default_codec, EVENTS_BY_TOPIC[log["topics"][0]], log)
+    return (
+        event["blockNumber"],
+        event["logIndex"],
+        abi.to_hex(bytes(event["transactionHash"])),
+        event["event"],
+        dict(event["args"]),
+    )
+
+
+class DecoderTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.decoders = decoders.compile_decoders(EVENTS)
+
+    def test_decoders_match_web3(self):
+        logs = sample_logs(300)
+        self.assertEqual(
+            decoders.decode_logs(logs, self.decoders),
+            [web3_decode(log) for log in logs],
+        )
+
+    def test_decoders_accept_raw_json_rpc_logs(self):
+        log = sample_logs(4)[3]
+        raw_log = {
+            key: value.hex() if isinstance(value, bytes) else value
+            for key, value in log.items()
+        }
+        raw_log["topics"] = ["0x" + bytes(topic).hex() for topic in log["topics"]]
+        raw_log["blockNumber"] = hex(log["blockNumber"])
+        raw_log["logIndex"] = hex(log["logIndex"])
+        self.assertEqual(
+            decoders.decode_log(raw_log, self.decoders),
+            decoders.decode_log(log, self.decoders),
+        )
+
+    def test_unknown_topic_is_rejected(self):
+        log = sample_logs(3)[2]
+        log["topics"] = [HexBytes(b"\x00" * 32)] + log["topics"][1:]
+        with self.assertRaises(ValueError):
+            decoders.decode_log(log, self.decoders)
+
+    def test_wrong_number_of_topics_is_rejected(self):
+        log = sample_logs(3)[2]
+        log["topics"] = log["topics"][:-1]
+        with self.assertRaises(ValueError):
+            decoders.decode_log(log, self.decoders)
+
+    def test_benchmark_against_web3(self):
+        """
+        Decodes the same logs through the fast path and through web3's get_event_data, and reports
+        the throughput of each.
+        """
+        logs = sample_logs(BENCHMARK_LOGS)
+
+        started_at = time.perf_counter()
+        decoders.decode_logs(logs, self.decoders)
+        fast_path_seconds = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for log in logs:
+            web3_decode(log)
+        web3_seconds = time.perf_counter() - started_at
+
+        print(
+            f"\nDecoded {len(logs)} logs: fast path {len(logs) / fast_path_seconds:.0f} logs/s, "
+            f"web3 {len(logs) / web3_seconds:.0f} logs/s "
+            f"({web3_seconds / fast_path_seconds:.1f}x)"
+        )
+        self.assertLess(fast_path_seconds, web3_seconds)
+
+
+if __name__ == "__main__":
+    unittest.main()
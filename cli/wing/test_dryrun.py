@@ -0,0 +1,167 @@
+import unittest
+from types import SimpleNamespace
+
+from brownie import web3 as web3_client
+from brownie.network import chain
+
+from . import dryrun, nonces
+from .core import characters_gogogo, facet_cut
+from .test_characters import CharactersTestCase
+
+SENDER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+LIVE_NETWORK = "mainnet"
+
+
+class DryRunTests(CharactersTestCase):
+    def test_dry_run_characters_gogogo(self):
+        """
+        Checks that a dry run of characters_gogogo on a development network reports every
+        transaction of the deployment, and leaves no trace on the chain.
+        """
+        block_0 = len(chain)
+        report = dryrun.dry_run(
+            lambda tx_config: characters_gogogo(
+                self.terminus.address,
+                self.admin_terminus_pool_id,
+                self.character_creation_terminus_pool_id,
+                "Dry Run Characters",
+                "DRY",
+                "",
+                tx_config,
+            ),
+            self.owner_tx_config,
+        )
+        self.assertEqual(len(chain), block_0)
+
+        self.assertEqual(report["mode"], "snapshot")
+        self.assertNotIn("error", report)
+        self.assertNotIn("error", report["result"])
+        # Five deployments and one diamondCut.
+        self.assertEqual(len(report["transactions"]), 6)
+        self.assertEqual(report["reverted"], [])
+        self.assertTrue(
+            all(transaction["gas_used"] > 0 for transaction in report["transactions"])
+        )
+        self.assertEqual(
+            report["gas_used"],
+            sum(transaction["gas_used"] for transaction in report["transactions"]),
+        )
+        self.assertEqual(
+            report["estimated_cost"], report["gas_used"] * report["gas_price"]
+        )
+        self.assertEqual(
+            web3_client.eth.get_code(report["result"]["contracts"]["Diamond"]), b""
+        )
+
+    def test_dry_run_reports_revert_reasons(self):
+        """
+        Checks that a dry run of a cut which adds selectors the Diamond already has reports the
+        revert reason.
+        """
+        block_0 = len(chain)
+        report = dryrun.dry_run(
+            lambda tx_config: facet_cut(
+                self.characters.address,
+                "CharactersFacet",
+                self.deployed_contracts["contracts"]["CharactersFacet"],
+                "add",
+                tx_config,
+            ),
+            self.owner_tx_config,
+        )
+        self.assertEqual(len(chain), block_0)
+
+        self.assertIn("error", report)
+        self.assertEqual(len(report["reverted"]), 1)
+        self.assertIn("already exists", report["reverted"][0]["revert_msg"])
+
+
+class FakeNetwork:
+    """
+    Stands in for brownie.network, with a live network and the dry run fork of it. Tracks the
+    transactions that the sender sends on each of them.
+    """
+
+    def __init__(self, transaction_count: int):
+        self.active = LIVE_NETWORK
+        self.connections = []
+        self.transaction_counts = {
+            LIVE_NETWORK: transaction_count,
+            dryrun.FORK_NETWORK_ID: transaction_count,
+        }
+
+    def connect(self, network_id):
+        self.active = network_id
+        self.connections.append(network_id)
+
+    def disconnect(self, kill_rpc=False):
+        self.active = None
+
+    def transaction_count(self, address):
+        return self.transaction_counts[self.active]
+
+    def send(self, transaction_config):
+        self.transaction_counts[self.active] += 1
+        return SimpleNamespace(nonce=transaction_config["nonce"])
+
+
+class ForkDryRunTests(unittest.TestCase):
+    """
+    Tests the nonce bookkeeping of dry runs on live networks, with the networks stubbed out.
+    """
+
+    def setUp(self) -> None:
+        self.network = FakeNetwork(transaction_count=7)
+        self.manager = nonces.NonceManager(SENDER, self.network.transaction_count)
+        nonces._managers[SENDER.lower()] = self.manager
+
+        self.originals = {
+            name: getattr(dryrun, name)
+            for name in ["network", "web3", "CONFIG", "accounts"]
+        }
+        dryrun.network = self.network
+        dryrun.web3 = SimpleNamespace(
+            eth=SimpleNamespace(gas_price=1, block_number=100),
+            provider=SimpleNamespace(endpoint_uri="http://127.0.0.1:8545"),
+        )
+        dryrun.CONFIG = SimpleNamespace(
+            network_type="live", active_network={"id": LIVE_NETWORK}, networks={}
+        )
+        dryrun.accounts = SimpleNamespace(at=lambda address, force: address)
+
+    def tearDown(self) -> None:
+        for name, value in self.originals.items():
+            setattr(dryrun, name, value)
+        nonces._managers.pop(SENDER.lower(), None)
+
+    def test_fork_transactions_do_not_use_live_nonces(self):
+        self.assertEqual(
+            self.manager.transact(self.network.send, transaction_config={}).nonce, 7
+        )
+
+        def operation(transaction_config):
+            return [
+                self.manager.transact(
+                    self.network.send, transaction_config=transaction_config
+                ).nonce
+                for _ in range(2)
+            ]
+
+        report = dryrun.dry_run(operation, {"from": SENDER})
+
+        self.assertEqual(report["mode"], "fork")
+        self.assertEqual(report["fork_block"], 100)
+        self.assertEqual(report["result"], [8, 9])
+        self.assertEqual(
+            self.network.connections, [dryrun.FORK_NETWORK_ID, LIVE_NETWORK]
+        )
+        self.assertEqual(dryrun.CONFIG.networks, {})
+        # The transactions sent on the fork were never sent on the live network, so their nonces are
+        # used again.
+        self.assertEqual(
+            self.manager.transact(self.network.send, transaction_config={}).nonce, 8
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
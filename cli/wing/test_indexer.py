@@ -0,0 +1,238 @@
+import os
+import tempfile
+import unittest
+
+from brownie.network import chain
+
+from .indexer import CharactersIndex
+from .test_characters import CharactersTestCase
+
+CONTRACT_ADDRESS = "0x4e59b44847b379578588920cA78FbF26c0B4956C"
+INVENTORY = "0xD04116cDd17beBE565EB2422F2497E06cC1C9833"
+PLAYER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+OTHER_PLAYER = "0x3C44CdDdB6a900fa2b585dd299e03d12FA4293BC"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+class CharactersIndexTestCase(CharactersTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Extends the Great Wyrm Characters setup with enough character creation badges for the
+        player to create several characters.
+        """
+        super().setUpClass()
+        cls.terminus.mint(
+            cls.player.address,
+            cls.character_creation_terminus_pool_id,
+            10,
+            "",
+            cls.owner_tx_config,
+        )
+
+    def setUp(self) -> None:
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.index = CharactersIndex(
+            os.path.join(self.db_dir.name, "index.sqlite"),
+            self.characters.address,
+            self.predeployment_block,
+            confirmation_depth=16,
+        )
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self.db_dir.cleanup()
+
+
+class ApplyEventsTests(unittest.TestCase):
+    """
+    Tests the state derived from events, with hand-written events and without a chain.
+    """
+
+    def setUp(self) -> None:
+        self.db_dir = tempfile.TemporaryDirectory()
+        self.index = CharactersIndex(
+            os.path.join(self.db_dir.name, "index.sqlite"), CONTRACT_ADDRESS, 10
+        )
+
+    def tearDown(self) -> None:
+        self.index.close()
+        self.db_dir.cleanup()
+
+    def test_events_derive_state(self):
+        self.assertEqual(self.index.checkpoint(), 9)
+        self.assertIsNone(self.index.owner_of(1))
+
+        self.index.apply_events(
+            [
+                (
+                    10,
+                    0,
+                    "0x01",
+                    "Transfer",
+                    {"from": ZERO_ADDRESS, "to": PLAYER, "tokenId": 1},
+                ),
+                (
+                    10,
+                    1,
+                    "0x01",
+                    "TokenURISet",
+                    {"tokenId": 1, "uri": "https://example.com/1.json"},
+                ),
+                (11, 0, "0x02", "TokenValiditySet", {"tokenId": 1, "valid": True}),
+                (
+                    11,
+                    1,
+                    "0x02",
+                    "ContractInformationSet",
+                    {
+                        "name": "Characters",
+                        "symbol": "GWC",
+                        "uri": "https://example.com",
+                    },
+                ),
+            ],
+            11,
+        )
+        self.assertEqual(self.index.checkpoint(), 11)
+        self.assertEqual(self.index.owner_of(1), PLAYER)
+        self.assertEqual(self.index.token_uri(1), "https://example.com/1.json")
+        self.assertTrue(self.index.is_metadata_valid(1))
+        self.assertEqual(self.index.contract_information()["symbol"], "GWC")
+
+        # Setting a new metadata URI invalidates the metadata.
+        self.index.apply_events(
+            [
+                (
+                    12,
+                    0,
+                    "0x03",
+                    "Transfer",
+                    {"from": PLAYER, "to": OTHER_PLAYER, "tokenId": 1},
+                ),
+                (
+                    12,
+                    1,
+                    "0x03",
+                    "TokenURISet",
+                    {"tokenId": 1, "uri": "https://example.com/2.json"},
+                ),
+                (13, 0, "0x04", "InventorySet", {"inventoryAddress": INVENTORY}),
+            ],
+            15,
+        )
+        self.assertEqual(self.index.checkpoint(), 15)
+        self.assertEqual(self.index.owner_of(1), OTHER_PLAYER)
+        self.assertEqual(self.index.token_uri(1), "https://example.com/2.json")
+        self.assertFalse(self.index.is_metadata_valid(1))
+        self.assertEqual(self.index.contract_information()["inventory"], INVENTORY)
+        self.assertEqual(
+            [event["event"] for event in self.index.history(1)],
+            [
+                "Transfer",
+                "TokenURISet",
+                "TokenValiditySet",
+                "Transfer",
+                "TokenURISet",
+            ],
+        )
+
+    def test_index_is_for_one_contract(self):
+        self.index.close()
+        db_path = os.path.join(self.db_dir.name, "index.sqlite")
+        with self.assertRaises(ValueError):
+            CharactersIndex(db_path, PLAYER)
+        self.index = CharactersIndex(db_path)
+        self.assertEqual(self.index.address, CONTRACT_ADDRESS)
+
+
+class CharactersIndexTests(CharactersIndexTestCase):
+    def test_index_matches_contract(self):
+        self.characters.create_character(self.player.address, {"from": self.player})
+        token_id = self.characters.total_supply()
+        self.characters.set_token_uri(
+            token_id, "https://example.com/profile.json", True, {"from": self.player}
+        )
+
+        self.index.update()
+
+        self.assertEqual(self.index.checkpoint(), chain.height)
+        self.assertEqual(self.index.owner_of(token_id), self.player.address)
+        self.assertEqual(
+            self.index.token_uri(token_id), self.characters.token_uri(token_id)
+        )
+        self.assertEqual(
+            self.index.is_metadata_valid(token_id),
+            self.characters.is_metadata_valid(token_id),
+        )
+        self.assertEqual(self.index.contract_information()["name"], self.contract_name)
+
+        # No new blocks, and no reorg - nothing to do.
+        self.assertEqual(self.index.update(), 0)
+
+    def test_reorg_rolls_back_affected_characters(self):
+        self.characters.create_character(self.player.address, {"from": self.player})
+        stable_token_id = self.characters.total_supply()
+        self.index.update()
+
+        chain.snapshot()
+        self.characters.create_character(self.player.address, {"from": self.player})
+        reorged_token_id = self.characters.total_supply()
+        self.characters.set_token_uri(
+            reorged_token_id,
+            "https://example.com/orphaned.json",
+            True,
+            {"from": self.player},
+        )
+        self.index.update()
+        self.assertEqual(self.index.owner_of(reorged_token_id), self.player.address)
+
+        # Replace the indexed blocks with a different history, in which the same character is
+        # created for a different account.
+        chain.revert()
+        self.terminus.mint(
+            self.random_person.address,
+            self.character_creation_terminus_pool_id,
+            1,
+            "",
+            self.owner_tx_config,
+        )
+        self.characters.create_character(
+            self.random_person.address, {"from": self.random_person}
+        )
+        self.assertEqual(self.characters.total_supply(), reorged_token_id)
+        chain.mine(2)
+
+        self.index.update()
+
+        self.assertEqual(self.index.checkpoint(), chain.height)
+        self.assertEqual(self.index.owner_of(stable_token_id), self.player.address)
+        self.assertEqual(
+            self.index.owner_of(reorged_token_id), self.random_person.address
+        )
+        self.assertEqual(self.index.token_uri(reorged_token_id), "")
+        self.assertFalse(self.index.is_metadata_valid(reorged_token_id))
+        self.assertEqual(
+            [event["event"] for event in self.index.history(reorged_token_id)],
+            ["Transfer"],
+        )
+
+    def test_reorg_detected_after_restart(self):
+        db_path = os.path.join(self.db_dir.name, "index.sqlite")
+
+        chain.snapshot()
+        self.characters.create_character(self.player.address, {"from": self.player})
+        token_id = self.characters.total_supply()
+        self.index.update()
+        self.index.close()
+
+        chain.revert()
+        self.index = CharactersIndex(db_path)
+        self.index.update()
+
+        self.assertEqual(self.index.checkpoint(), chain.height)
+        self.assertIsNone(self.index.owner_of(token_id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import unittest
+
+from brownie import accounts
+
+from . import moderation
+from .test_multicall import BulkReadsTestCase
+
+
+class ModerationTests(BulkReadsTestCase):
+    def test_moderate_submits_only_changed_tokens(self):
+        """
+        Tests moderate
+
+        The bulk reads setup creates three characters for the player, the second of which already
+        has a validated profile.
+        """
+        decisions = moderation.read_decisions(
+            io.StringIO(
+                "token_id,valid\n"
+                f"{self.token_ids[0]},true\n"
+                f"{self.token_ids[1]},true\n"
+                f"{self.token_ids[2]},false\n"
+                f"{self.token_ids[2]},true\n"
+            )
+        )
+        self.assertEqual(
+            decisions,
+            [
+                (self.token_ids[0], True),
+                (self.token_ids[1], True),
+                (self.token_ids[2], True),
+            ],
+        )
+
+        summary = moderation.moderate(
+            self.characters,
+            decisions,
+            {"from": self.admin},
+            multicall_address=self.multicall_address,
+            max_in_flight=1,
+        )
+
+        self.assertEqual(summary["decisions"], 3)
+        self.assertEqual(summary["unchanged"], 1)
+        self.assertEqual(summary["submitted"], 2)
+        self.assertEqual(summary["confirmed"], 2)
+        self.assertEqual(summary["errors"], [])
+        self.assertGreater(summary["gas_used"], 0)
+        for token_id in self.token_ids:
+            self.assertTrue(self.characters.is_metadata_valid(token_id))
+
+        # Running the same decisions again submits nothing.
+        summary = moderation.moderate(
+            self.characters,
+            decisions,
+            {"from": self.admin},
+            multicall_address=self.multicall_address,
+        )
+        self.assertEqual(summary["unchanged"], 3)
+        self.assertEqual(summary["submitted"], 0)
+
+    def test_moderate_reports_failures(self):
+        """
+        Tests moderate
+
+        Checks that decisions for tokens which do not exist, and transactions sent by accounts which
+        are not game masters, are reported as errors.
+        """
+        nonexistent_token_id = self.characters.total_supply() + 1000
+        summary = moderation.moderate(
+            self.characters,
+            [(nonexistent_token_id, True)],
+            {"from": self.admin},
+            multicall_address=self.multicall_address,
+        )
+        self.assertEqual(summary["submitted"], 0)
+        self.assertEqual(len(summary["errors"]), 1)
+
+        self.characters.set_metadata_validity(
+            self.token_ids[0], False, {"from": self.admin}
+        )
+        summary = moderation.moderate(
+            self.characters,
+            [(self.token_ids[0], True)],
+            {"from": accounts[9]},
+            multicall_address=self.multicall_address,
+        )
+        self.assertEqual(summary["confirmed"], 0)
+        self.assertEqual(len(summary["errors"]), 1)
+        self.assertFalse(self.characters.is_metadata_valid(self.token_ids[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+from brownie import web3 as web3_client
+from brownie.network import chain
+
+from . import characters_reads, registry, transport
+from .test_characters import CharactersTestCase
+
+
+class BulkReadsTestCase(CharactersTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Extends the Great Wyrm Characters setup with a Multicall3 contract and three characters for
+        the player, the second of which has a validated profile.
+        """
+        super().setUpClass()
+
+        multicall = registry.contract_container("Multicall3").deploy(
+            cls.owner_tx_config
+        )
+        cls.multicall_address = multicall.address
+
+        cls.terminus.mint(
+            cls.player.address,
+            cls.character_creation_terminus_pool_id,
+            3,
+            "",
+            cls.owner_tx_config,
+        )
+        cls.token_ids = []
+        for _ in range(3):
+            cls.characters.create_character(cls.player.address, {"from": cls.player})
+            token_id = cls.characters.total_supply()
+            cls.characters.set_token_uri(
+                token_id,
+                f"https://example.com/characters/{token_id}/profile.json",
+                True,
+                {"from": cls.player},
+            )
+            cls.token_ids.append(token_id)
+
+        cls.characters.set_metadata_validity(
+            cls.token_ids[1], True, {"from": cls.admin}
+        )
+
+
+class BulkReadsTests(BulkReadsTestCase):
+    def test_bulk_reads_match_single_reads(self):
+        """
+        Tests owner_of_many, token_uri_many, is_metadata_valid_many
+
+        Checks that bulk reads return the same results as single reads, in input order, even when
+        the reads are split across several batches.
+        """
+        token_ids = list(reversed(self.token_ids))
+        for bulk_read, single_read in [
+            (characters_reads.owner_of_many, self.characters.owner_of),
+            (characters_reads.token_uri_many, self.characters.token_uri),
+            (
+                characters_reads.is_metadata_valid_many,
+                self.characters.is_metadata_valid,
+            ),
+        ]:
+            results = bulk_read(
+                self.characters,
+                token_ids,
+                multicall_address=self.multicall_address,
+                batch_size=2,
+            )
+            self.assertEqual(len(results), len(token_ids))
+            for token_id, result in zip(token_ids, results):
+                self.assertTrue(result.success)
+                self.assertIsNone(result.error)
+                self.assertEqual(result.value, single_read(token_id))
+
+    def test_bulk_reads_report_failures_per_item(self):
+        """
+        Tests owner_of_many
+
+        Checks that a read which reverts (ownerOf on a token which does not exist) is reported as a
+        failure without affecting the other reads.
+        """
+        nonexistent_token_id = self.characters.total_supply() + 1000
+        results = characters_reads.owner_of_many(
+            self.characters,
+            [self.token_ids[0], nonexistent_token_id, self.token_ids[1]],
+            multicall_address=self.multicall_address,
+        )
+        self.assertTrue(results[0].success)
+        self.assertEqual(results[0].value, self.player.address)
+        self.assertFalse(results[1].success)
+        self.assertIsNone(results[1].value)
+        self.assertIsNotNone(results[1].error)
+        self.assertTrue(results[2].success)
+        self.assertEqual(results[2].value, self.player.address)
+
+    def test_bulk_reads_at_pinned_block(self):
+        """
+        Tests balance_of_many
+
+        Checks that bulk reads are made at the given block.
+        """
+        block_number = len(chain) - 1
+        balance_0 = self.characters.balance_of(self.random_person.address)
+        self.characters.transfer_from(
+            self.player.address,
+            self.random_person.address,
+            self.token_ids[2],
+            {"from": self.player},
+        )
+
+        pinned_results = characters_reads.balance_of_many(
+            self.characters,
+            [self.random_person.address],
+            multicall_address=self.multicall_address,
+            block_number=block_number,
+        )
+        self.assertTrue(pinned_results[0].success)
+        self.assertEqual(pinned_results[0].value, balance_0)
+
+        latest_results = characters_reads.balance_of_many(
+            self.characters,
+            [self.random_person.address],
+            multicall_address=self.multicall_address,
+        )
+        self.assertEqual(latest_results[0].value, balance_0 + 1)
+
+    def test_bulk_reads_without_multicall(self):
+        """
+        Tests owner_of_many, token_uri_many
+
+        Checks that bulk reads without a Multicall3 contract, through the JSON-RPC batch transport,
+        return the same results as single reads.
+        """
+        original_provider = web3_client.provider
+        try:
+            transport.install(max_batch_size=2)
+            owner_results = characters_reads.owner_of_many(
+                self.characters, self.token_ids, multicall_address=None
+            )
+            uri_results = characters_reads.token_uri_many(
+                self.characters, self.token_ids, multicall_address=None
+            )
+        finally:
+            web3_client.provider = original_provider
+
+        for token_id, owner_result, uri_result in zip(
+            self.token_ids, owner_results, uri_results
+        ):
+            self.assertTrue(owner_result.success)
+            self.assertEqual(owner_result.value, self.characters.owner_of(token_id))
+            self.assertTrue(uri_result.success)
+            self.assertEqual(uri_result.value, self.characters.token_uri(token_id))
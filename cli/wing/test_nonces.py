@@ -0,0 +1,186 @@
+import threading
+import unittest
+from typing import Any, Dict, List
+
+from . import nonces
+from .nonces import NonceManager
+
+SIGNER = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+
+class FakeNode:
+    """
+    Tracks the transactions sent for a single signer, in place of an Ethereum node.
+    """
+
+    def __init__(self, transaction_count: int = 0):
+        self.sent: Dict[int, Any] = {}
+        self.base_count = transaction_count
+        self.lock = threading.Lock()
+
+    def transaction_count(self, address: str) -> int:
+        # Pending transaction count: the number of contiguous nonces which the node knows about.
+        count = self.base_count
+        while count in self.sent:
+            count += 1
+        return count
+
+
+class FakeTransaction:
+    def __init__(self, nonce: int):
+        self.nonce = nonce
+
+
+class FailedBeforeBroadcast(Exception):
+    pass
+
+
+class NonceManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.node = FakeNode(transaction_count=7)
+        self.manager = NonceManager(SIGNER, self.node.transaction_count)
+
+    def send(self, *args: Any) -> FakeTransaction:
+        transaction_config = args[-1]
+        nonce = transaction_config["nonce"]
+        with self.node.lock:
+            self.node.sent[nonce] = transaction_config
+        return FakeTransaction(nonce)
+
+    def fail(self, *args: Any) -> None:
+        raise FailedBeforeBroadcast("gas estimation failed")
+
+    def test_transactions_get_consecutive_nonces(self):
+        transactions = [
+            self.manager.transact(self.send, transaction_config={"from": SIGNER})
+            for _ in range(5)
+        ]
+        self.assertEqual([tx.nonce for tx in transactions], [7, 8, 9, 10, 11])
+        self.assertTrue(
+            all(config["required_confs"] == 0 for config in self.node.sent.values())
+        )
+        self.assertEqual(sorted(self.manager.pending), [7, 8, 9, 10, 11])
+
+    def test_concurrent_transactions_get_distinct_nonces(self):
+        transactions: List[FakeTransaction] = []
+
+        def worker():
+            for _ in range(50):
+                transactions.append(
+                    self.manager.transact(self.send, transaction_config={})
+                )
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(
+            sorted(tx.nonce for tx in transactions), list(range(7, 7 + 400))
+        )
+
+    def test_failed_transaction_nonce_is_reused(self):
+        self.manager.transact(self.send, transaction_config={})
+        with self.assertRaises(FailedBeforeBroadcast):
+            self.manager.transact(self.fail, transaction_config={})
+        self.assertEqual(self.manager.gaps(), [8])
+
+        transaction = self.manager.transact(self.send, transaction_config={})
+        self.assertEqual(transaction.nonce, 8)
+        self.assertEqual(self.manager.gaps(), [])
+        self.assertEqual(
+            self.manager.transact(self.send, transaction_config={}).nonce, 9
+        )
+
+    def test_possibly_broadcast_transaction_nonce_is_kept(self):
+        def time_out(*args: Any) -> None:
+            transaction_config = args[-1]
+            # The node accepts the transaction, but the response is lost.
+            with self.node.lock:
+                self.node.sent[transaction_config["nonce"]] = transaction_config
+            raise TimeoutError("read timed out")
+
+        with self.assertRaises(TimeoutError):
+            self.manager.transact(time_out, transaction_config={})
+        self.assertEqual(self.manager.gaps(), [])
+        self.manager.sync()
+        self.assertEqual(
+            self.manager.transact(self.send, transaction_config={}).nonce, 8
+        )
+
+    def test_possibly_broadcast_transaction_nonce_is_released_if_unknown(self):
+        self.manager.transact(self.send, transaction_config={})
+
+        def time_out(*args: Any) -> None:
+            raise ConnectionError("connection reset")
+
+        with self.assertRaises(ConnectionError):
+            self.manager.transact(time_out, transaction_config={})
+        self.assertEqual(self.manager.gaps(), [])
+        # The node never received the transaction.
+        self.manager.sync()
+        self.assertEqual(self.manager.gaps(), [8])
+
+    def test_may_have_been_broadcast(self):
+        self.assertFalse(nonces.may_have_been_broadcast(ValueError("nonce too low")))
+        self.assertTrue(nonces.may_have_been_broadcast(TimeoutError("timed out")))
+        error = ValueError("reverted")
+        error.txid = "0x01"
+        self.assertTrue(nonces.may_have_been_broadcast(error))
+
+    def test_fill_gaps(self):
+        first = self.manager.allocate()
+        self.manager.transact(self.send, transaction_config={})
+        last = self.manager.allocate()
+        self.manager.release(first)
+        self.manager.release(last)
+        self.assertEqual(self.manager.gaps(), [7, 9])
+
+        manager = self
+
+        class FakeAccount:
+            def transfer(self, to, amount, nonce, required_confs):
+                return manager.send({"nonce": nonce})
+
+        # Only the gap below the highest sent nonce blocks anything.
+        fillers = self.manager.fill_gaps(FakeAccount())
+        self.assertEqual([filler.nonce for filler in fillers], [7])
+        self.assertEqual(self.manager.gaps(), [9])
+        self.assertEqual(self.node.transaction_count(SIGNER), 9)
+
+    def test_sync_skips_nonces_used_elsewhere(self):
+        self.manager.transact(self.send, transaction_config={})
+        # Another wallet sends transactions for the same signer.
+        self.node.sent[8] = {}
+        self.node.sent[9] = {}
+        self.manager.sync()
+        self.assertEqual(
+            self.manager.transact(self.send, transaction_config={}).nonce, 10
+        )
+
+    def test_sync_reuses_nonces_of_dropped_transactions(self):
+        for _ in range(3):
+            self.manager.transact(self.send, transaction_config={})
+        # The node drops the last two transactions.
+        del self.node.sent[9]
+        del self.node.sent[8]
+        self.manager.sync()
+
+        self.assertEqual(self.manager.gaps(), [8, 9])
+        self.assertEqual(
+            [
+                self.manager.transact(self.send, transaction_config={}).nonce
+                for _ in range(3)
+            ],
+            [8, 9, 10],
+        )
+
+    def test_confirmed_transactions_are_not_tracked(self):
+        transaction = self.manager.transact(self.send, transaction_config={})
+        self.manager.confirmed(transaction.nonce)
+        self.assertEqual(self.manager.pending, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import json
+import os
+import tempfile
+import unittest
+
+from brownie import accounts
+
+from . import onboarding
+from .test_characters import CharactersTestCase
+
+
+class OnboardingTestCase(CharactersTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Extends the Great Wyrm Characters setup with an onboarding operator, who holds character
+        creation badges and creates characters for a cohort of new players.
+        """
+        super().setUpClass()
+        cls.operator = accounts[4]
+        cls.terminus.mint(
+            cls.operator.address,
+            cls.character_creation_terminus_pool_id,
+            100,
+            "",
+            cls.owner_tx_config,
+        )
+        cls.cohort = [account.address for account in accounts[5:10]]
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.infile = os.path.join(self.tempdir.name, "cohort.csv")
+        with open(self.infile, "w") as ofp:
+            ofp.write("name,address\n")
+            for index, address in enumerate(self.cohort):
+                ofp.write(f"player {index},{address}\n")
+        self.journal_file = onboarding.journal_path(self.infile)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+
+class OnboardingTests(OnboardingTestCase):
+    def test_create_many(self):
+        balances_0 = [self.characters.balance_of(player) for player in self.cohort]
+
+        players = onboarding.read_players(self.infile)
+        self.assertEqual(players, self.cohort)
+        report = onboarding.create_characters(
+            self.characters,
+            players,
+            {"from": self.operator},
+            self.journal_file,
+            concurrency=3,
+            progress=False,
+        )
+
+        self.assertEqual(report["confirmed"], len(self.cohort))
+        self.assertEqual(report["failed"], [])
+        self.assertEqual(sum(report["histogram"].values()), len(self.cohort))
+        for player, balance_0 in zip(self.cohort, balances_0):
+            self.assertEqual(self.characters.balance_of(player), balance_0 + 1)
+
+        # Running again with the same journal does not create any more characters.
+        report = onboarding.create_characters(
+            self.characters,
+            players,
+            {"from": self.operator},
+            self.journal_file,
+            progress=False,
+        )
+        self.assertEqual(report["skipped"], len(self.cohort))
+        self.assertEqual(report["confirmed"], 0)
+        for player, balance_0 in zip(self.cohort, balances_0):
+            self.assertEqual(self.characters.balance_of(player), balance_0 + 1)
+
+    def test_resume_resolves_submitted_transactions(self):
+        """
+        Simulates a run which was interrupted after the first player's transaction was submitted but
+        before its confirmation was journaled.
+        """
+        balances_0 = [self.characters.balance_of(player) for player in self.cohort]
+
+        transaction = self.characters.create_character(
+            self.cohort[0], {"from": self.operator}
+        )
+        with open(self.journal_file, "w") as ofp:
+            ofp.write(
+                json.dumps(
+                    {
+                        "index": 0,
+                        "status": "sending",
+                        "player": self.cohort[0],
+                        "nonce": transaction.nonce,
+                    }
+                )
+                + "\n"
+            )
+            ofp.write(
+                json.dumps(
+                    {
+                        "index": 0,
+                        "status": "submitted",
+                        "txid": transaction.txid,
+                        "nonce": transaction.nonce,
+                    }
+                )
+                + "\n"
+            )
+
+        report = onboarding.create_characters(
+            self.characters,
+            onboarding.read_players(self.infile),
+            {"from": self.operator},
+            self.journal_file,
+            progress=False,
+        )
+
+        self.assertEqual(report["skipped"], 1)
+        self.assertEqual(report["confirmed"], len(self.cohort) - 1)
+        for player, balance_0 in zip(self.cohort, balances_0):
+            self.assertEqual(self.characters.balance_of(player), balance_0 + 1)
+
+    def test_read_players_ndjson(self):
+        infile = os.path.join(self.tempdir.name, "cohort.ndjson")
+        with open(infile, "w") as ofp:
+            ofp.write(json.dumps(self.cohort[0].lower()) + "\n")
+            ofp.write(json.dumps({"address": self.cohort[1]}) + "\n")
+            ofp.write("\n")
+            ofp.write(json.dumps({"player": self.cohort[2]}) + "\n")
+        self.assertEqual(onboarding.read_players(infile), self.cohort[:3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import tempfile
+import unittest
+
+from . import registry
+
+ADDRESS = "0x4e59b44847b379578588920cA78FbF26c0B4956C"
+OTHER_ADDRESS = "0xD04116cDd17beBE565EB2422F2497E06cC1C9833"
+
+
+class FakeProject:
+    def __init__(self):
+        self.closed = False
+
+    def close(self, raises=True):
+        self.closed = True
+
+
+class FakeContainer:
+    constructed = 0
+
+    def __init__(self, project, build):
+        FakeContainer.constructed += 1
+        self.project = project
+        self.build = build
+
+
+class FakeFacet:
+    constructed = 0
+
+    def __init__(self, contract_address):
+        FakeFacet.constructed += 1
+        self.address = contract_address
+
+
+class ContractContainerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        registry.invalidate()
+        FakeContainer.constructed = 0
+        self.original_contract_container = registry.ContractContainer
+        registry.ContractContainer = FakeContainer
+        # Stands in for the brownie project, so that the tests do not load (and compile) it.
+        registry._project = FakeProject()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.artifact_path = os.path.join(self.tempdir.name, "FakeFacet.json")
+        with open(self.artifact_path, "w") as ofp:
+            ofp.write('{"abi": [], "contractName": "FakeFacet"}')
+
+    def tearDown(self) -> None:
+        registry.ContractContainer = self.original_contract_container
+        registry.invalidate()
+        self.tempdir.cleanup()
+
+    def container(self):
+        return registry.contract_container("FakeFacet", self.tempdir.name)
+
+    def test_containers_are_shared(self):
+        container = self.container()
+        self.assertEqual(container.build["contractName"], "FakeFacet")
+        self.assertIs(container.project, registry._project)
+        self.assertIs(self.container(), container)
+        self.assertEqual(FakeContainer.constructed, 1)
+
+    def test_artifact_changes_reload_containers(self):
+        container = self.container()
+
+        # Size changes.
+        with open(self.artifact_path, "w") as ofp:
+            ofp.write('{"abi": [], "contractName": "FakeFacet", "bytecode": ""}')
+        reloaded = self.container()
+        self.assertIsNot(reloaded, container)
+        self.assertIn("bytecode", reloaded.build)
+
+        # Modification time changes, with the same size.
+        stat = os.stat(self.artifact_path)
+        os.utime(
+            self.artifact_path,
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000),
+        )
+        self.assertIsNot(self.container(), reloaded)
+        self.assertEqual(FakeContainer.constructed, 3)
+
+    def test_missing_artifact(self):
+        with self.assertRaises(IOError):
+            registry.contract_container("NoSuchFacet", self.tempdir.name)
+
+    def test_invalidate_closes_project(self):
+        loaded_project = registry._project
+        container = self.container()
+        registry.invalidate()
+        self.assertTrue(loaded_project.closed)
+        self.assertIsNone(registry._project)
+
+        registry._project = FakeProject()
+        self.assertIsNot(self.container(), container)
+
+
+class ContractWrapperTests(unittest.TestCase):
+    def setUp(self) -> None:
+        registry.invalidate()
+        FakeFacet.constructed = 0
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.artifact_path = os.path.join(self.tempdir.name, "FakeFacet.json")
+        with open(self.artifact_path, "w") as ofp:
+            ofp.write('{"abi": []}')
+
+    def tearDown(self) -> None:
+        registry.invalidate()
+        self.tempdir.cleanup()
+
+    def wrapper(self, address):
+        return registry.contract_wrapper(FakeFacet, address, self.tempdir.name)
+
+    def test_wrappers_are_shared_by_address(self):
+        wrapper = self.wrapper(ADDRESS)
+        self.assertEqual(wrapper.address, ADDRESS)
+        self.assertIs(self.wrapper(ADDRESS.lower()), wrapper)
+        self.assertIsNot(self.wrapper(OTHER_ADDRESS), wrapper)
+        self.assertEqual(FakeFacet.constructed, 2)
+
+    def test_wrappers_without_address_are_not_shared(self):
+        self.assertIsNot(self.wrapper(None), self.wrapper(None))
+
+    def test_artifact_changes_invalidate_wrappers(self):
+        wrapper = self.wrapper(ADDRESS)
+        with open(self.artifact_path, "w") as ofp:
+            ofp.write('{"abi": [], "contractName": "FakeFacet"}')
+        self.assertIsNot(self.wrapper(ADDRESS), wrapper)
+
+    def test_least_recently_used_wrapper_is_forgotten(self):
+        max_wrappers = registry.MAX_WRAPPERS
+        registry.MAX_WRAPPERS = 1
+        try:
+            wrapper = self.wrapper(ADDRESS)
+            self.wrapper(OTHER_ADDRESS)
+            self.assertIsNot(self.wrapper(ADDRESS), wrapper)
+            self.assertEqual(FakeFacet.constructed, 3)
+        finally:
+            registry.MAX_WRAPPERS = max_wrappers
+
+
+if __name__ == "__main__":
+    unittest.main()
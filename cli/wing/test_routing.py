@@ -0,0 +1,108 @@
+import tempfile
+import unittest
+
+from brownie.network import chain
+
+from . import CharactersFacet, DiamondLoupeFacet, routing
+from .core import multi_facet_cut, plan_upgrade
+from .test_characters import CharactersTestCase
+
+
+class RoutingCacheTests(CharactersTestCase):
+    def setUp(self) -> None:
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache = routing.RoutingCache(self.cache_dir.name)
+        self.diamond_address = self.characters.address
+
+        # Count the reads of the routing table.
+        self.reads = []
+        self.original_diamond_routing = routing.diamond_routing
+
+        def counting_diamond_routing(diamond_address, block_number="latest"):
+            self.reads.append(block_number)
+            return self.original_diamond_routing(diamond_address, block_number)
+
+        routing.diamond_routing = counting_diamond_routing
+
+    def tearDown(self) -> None:
+        routing.diamond_routing = self.original_diamond_routing
+        self.cache_dir.cleanup()
+
+    def test_lookups_match_loupe(self):
+        loupe = DiamondLoupeFacet.DiamondLoupeFacet(self.diamond_address)
+        table = self.cache.table(self.diamond_address)
+        self.assertEqual(len(self.reads), 1)
+
+        facets = loupe.facets()
+        self.assertEqual(
+            [facet_address for facet_address, _ in facets], table.facet_addresses()
+        )
+        for facet_address, selectors in facets:
+            self.assertEqual(
+                table.facet_function_selectors(facet_address),
+                [routing.normalize_selector(selector) for selector in selectors],
+            )
+            for selector in selectors:
+                self.assertEqual(table.facet_address(selector), facet_address)
+        self.assertIsNone(table.facet_address("0xffffffff"))
+
+        # The same block is served from the cache, in this process and in the next.
+        self.cache.table(self.diamond_address, table.to_block)
+        routing.RoutingCache(self.cache_dir.name).table(
+            self.diamond_address, table.to_block
+        )
+        self.assertEqual(len(self.reads), 1)
+
+    def test_cache_is_invalidated_by_diamond_cut(self):
+        selector = routing.normalize_selector(
+            CharactersFacet.CharactersFacet(
+                self.diamond_address
+            ).contract.name.signature
+        )
+        old_facet_address = DiamondLoupeFacet.DiamondLoupeFacet(
+            self.diamond_address
+        ).facet_address(selector)
+
+        table_0 = self.cache.table(self.diamond_address)
+        self.assertEqual(table_0.facet_address(selector), old_facet_address)
+
+        # Lookups at the latest block are served from the last refresh.
+        chain.mine(3)
+        self.assertIs(self.cache.table(self.diamond_address), table_0)
+
+        # New blocks without cuts only extend the snapshot.
+        table_1 = self.cache.refresh(self.diamond_address)
+        self.assertEqual(len(self.reads), 1)
+        self.assertEqual(table_1.from_block, table_0.from_block)
+        self.assertEqual(table_1.to_block, table_0.to_block + 3)
+
+        new_facet = CharactersFacet.CharactersFacet(None)
+        new_facet.deploy(self.owner_tx_config)
+        plan = plan_upgrade(
+            self.diamond_address, {"CharactersFacet": new_facet.address}
+        )
+        cut_transaction = multi_facet_cut(
+            self.diamond_address, plan["cuts"], self.owner_tx_config
+        )
+
+        table_2 = self.cache.refresh(self.diamond_address)
+        self.assertEqual(len(self.reads), 2)
+        self.assertEqual(table_2.from_block, cut_transaction.block_number)
+        self.assertEqual(table_2.facet_address(selector), new_facet.address)
+
+        # Blocks from before the cut are still served from the earlier snapshot.
+        table_3 = self.cache.table(self.diamond_address, table_1.to_block)
+        self.assertEqual(len(self.reads), 2)
+        self.assertEqual(table_3.facet_address(selector), old_facet_address)
+
+    def test_latest_table_expires_after_max_age(self):
+        cache = routing.RoutingCache(self.cache_dir.name, max_age=0)
+        table_0 = cache.table(self.diamond_address)
+        chain.mine(1)
+        table_1 = cache.table(self.diamond_address)
+        self.assertEqual(table_1.to_block, table_0.to_block + 1)
+        self.assertEqual(len(self.reads), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
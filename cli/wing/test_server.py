@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+import urllib.error
+import urllib.request
+
+from . import client, dryrun, server
+
+
+class WingServerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tempdir.name, "server", "server.sock")
+        self.http_port = dryrun.free_port()
+        self.thread = threading.Thread(
+            target=server.serve,
+            args=(self.socket_path, self.http_port),
+            kwargs={"warm_up": False},
+            daemon=True,
+        )
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not server.is_running(self.socket_path):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+
+    def tearDown(self) -> None:
+        if server.is_running(self.socket_path):
+            server.request(self.socket_path, {"method": "stop"})
+        self.thread.join(10)
+        self.tempdir.cleanup()
+
+    def command(self, argv, cwd=None):
+        return server.request(
+            self.socket_path,
+            {"argv": argv, "cwd": cwd if cwd is not None else os.getcwd()},
+        )
+
+    def test_socket_permissions(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+        self.assertEqual(
+            stat.S_IMODE(os.stat(self.socket_path + server.TOKEN_FILE_SUFFIX).st_mode),
+            0o600,
+        )
+
+    def test_command_output_and_exit_code(self):
+        response = self.command(["routing", "--help"])
+        self.assertEqual(response["exit_code"], 0)
+        self.assertIn("facet-address", response["stdout"])
+        self.assertEqual(response["stderr"], "")
+
+        response = self.command(["routing", "no-such-command"])
+        self.assertEqual(response["exit_code"], 2)
+        self.assertEqual(response["stdout"], "")
+        self.assertIn("invalid choice", response["stderr"])
+
+    def test_concurrent_commands_capture_their_own_output(self):
+        responses = [None] * 8
+
+        def run(index):
+            argv = ["routing", "--help"] if index % 2 == 0 else ["index", "--help"]
+            responses[index] = self.command(argv)
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for index, response in enumerate(responses):
+            self.assertEqual(response["exit_code"], 0)
+            if index % 2 == 0:
+                self.assertIn("facet-address", response["stdout"])
+            else:
+                self.assertNotIn("facet-address", response["stdout"])
+
+    def test_fallback(self):
+        self.assertEqual(
+            self.command(["routing", "--help"], cwd=self.tempdir.name),
+            {"fallback": True},
+        )
+        self.assertEqual(
+            self.command(["signer-agent", "status"]),
+            {"fallback": True},
+        )
+        self.assertIsNone(
+            client.forward(["routing", "--help"], socket_path=self.socket_path + "x")
+        )
+
+    def test_status_and_stop(self):
+        status = server.request(self.socket_path, {"method": "status"})
+        self.assertEqual(status["pid"], os.getpid())
+        self.assertEqual(status["in_flight"], 0)
+
+        server.request(self.socket_path, {"method": "stop"})
+        self.thread.join(10)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_http_requires_token(self):
+        body = json.dumps({"argv": ["routing", "--help"], "cwd": os.getcwd()})
+        url = f"http://127.0.0.1:{self.http_port}/"
+
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(urllib.request.Request(url, body.encode("utf-8")))
+        self.assertEqual(raised.exception.code, 401)
+
+        with open(self.socket_path + server.TOKEN_FILE_SUFFIX, "r") as ifp:
+            token = ifp.read()
+        authorized = urllib.request.Request(
+            url, body.encode("utf-8"), {"Authorization": f"Bearer {token}"}
+        )
+        with urllib.request.urlopen(authorized) as response:
+            result = json.loads(response.read())
+        self.assertEqual(result["exit_code"], 0)
+        self.assertIn("facet-address", result["stdout"])
+
+
+class CommandLockTests(unittest.TestCase):
+    def run_in_thread(self, lock, exclusive, events, name):
+        """
+        Starts a thread which holds the lock while it records its name in events and waits for the
+        returned threading.Event.
+        """
+        finish = threading.Event()
+
+        def hold():
+            with lock.hold(exclusive):
+                events.append(name)
+                finish.wait(10)
+
+        thread = threading.Thread(target=hold, daemon=True)
+        thread.start()
+        return thread, finish
+
+    def wait_for(self, events, count):
+        deadline = time.monotonic() + 10
+        while len(events) < count:
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+    def test_exclusive_commands_run_alone(self):
+        lock = server.CommandLock()
+        events = []
+
+        first_read, finish_first_read = self.run_in_thread(
+            lock, False, events, "read 1"
+        )
+        second_read, finish_second_read = self.run_in_thread(
+            lock, False, events, "read 2"
+        )
+        # Reads run at the same time.
+        self.wait_for(events, 2)
+
+        transaction, finish_transaction = self.run_in_thread(
+            lock, True, events, "transaction"
+        )
+        time.sleep(0.1)
+        # Reads which arrive after the transaction wait for it.
+        third_read, finish_third_read = self.run_in_thread(
+            lock, False, events, "read 3"
+        )
+        time.sleep(0.1)
+        self.assertEqual(len(events), 2)
+
+        finish_first_read.set()
+        finish_second_read.set()
+        self.wait_for(events, 3)
+        self.assertEqual(events[2], "transaction")
+        time.sleep(0.1)
+        self.assertEqual(len(events), 3)
+
+        finish_transaction.set()
+        self.wait_for(events, 4)
+        self.assertEqual(events[3], "read 3")
+        finish_third_read.set()
+        for thread in [first_read, second_read, transaction, third_read]:
+            thread.join(10)
+
+    def test_is_exclusive(self):
+        self.assertFalse(server.is_exclusive(argparse.Namespace(network="dev")))
+        self.assertTrue(server.is_exclusive(argparse.Namespace(sender="keystore")))
+        self.assertTrue(
+            server.is_exclusive(argparse.Namespace(sender=None, dry_run=False))
+        )
+        self.assertTrue(server.is_exclusive(argparse.Namespace(dry_run=True)))
+        self.assertFalse(server.is_exclusive(argparse.Namespace(dry_run=False)))
+
+
+if __name__ == "__main__":
+    unittest.main()
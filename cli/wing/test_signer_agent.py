@@ -0,0 +1,111 @@
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+
+from eth_account import Account
+
+from . import signer_agent
+
+PASSWORD = "peppercorn"
+
+
+class SignerAgentTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.account = Account.create()
+        cls.keystore = Account.encrypt(cls.account.key, PASSWORD)
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.keystore_path = os.path.join(self.tempdir.name, "game-master.json")
+        with open(self.keystore_path, "w") as ofp:
+            json.dump(self.keystore, ofp)
+        self.socket_path = os.path.join(self.tempdir.name, "agent", "agent.sock")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def start_agent(self, idle_timeout: float) -> threading.Thread:
+        agent = signer_agent.SignerAgent(self.socket_path, idle_timeout)
+        thread = threading.Thread(target=agent.serve, daemon=True)
+        thread.start()
+        return thread
+
+    def key_request(self, password=None):
+        request = {"method": "key", "keystore": self.keystore_path}
+        if password is not None:
+            request["password"] = password
+        return signer_agent.request(self.socket_path, request)
+
+    def test_agent_holds_decrypted_keys(self):
+        thread = self.start_agent(idle_timeout=60)
+        try:
+            self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode) & 0o077, 0)
+            self.assertEqual(
+                stat.S_IMODE(os.stat(os.path.dirname(self.socket_path)).st_mode),
+                0o700,
+            )
+
+            self.assertEqual(self.key_request(), {"locked": True})
+            with self.assertRaises(RuntimeError):
+                self.key_request("wrong password")
+
+            started_at = time.perf_counter()
+            first = self.key_request(PASSWORD)
+            decrypt_time = time.perf_counter() - started_at
+            self.assertEqual(first["key"], "0x" + bytes(self.account.key).hex())
+
+            started_at = time.perf_counter()
+            second = self.key_request()
+            cached_time = time.perf_counter() - started_at
+            self.assertEqual(second, first)
+            self.assertLess(cached_time, decrypt_time)
+
+            account = signer_agent.load_account(
+                self.keystore_path, socket_path=self.socket_path
+            )
+            self.assertEqual(account.address, self.account.address)
+
+            status = signer_agent.request(self.socket_path, {"method": "status"})
+            self.assertEqual(list(status["keystores"]), [self.keystore_path])
+
+            signer_agent.request(
+                self.socket_path, {"method": "forget", "keystore": self.keystore_path}
+            )
+            self.assertEqual(self.key_request(), {"locked": True})
+        finally:
+            signer_agent.request(self.socket_path, {"method": "stop"})
+            thread.join(5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_idle_timeout(self):
+        reaper_interval = signer_agent.REAPER_INTERVAL
+        signer_agent.REAPER_INTERVAL = 0.05
+        try:
+            thread = self.start_agent(idle_timeout=1.0)
+            self.key_request(PASSWORD)
+            time.sleep(0.6)
+            status = signer_agent.request(self.socket_path, {"method": "status"})
+            self.assertEqual(list(status["keystores"]), [self.keystore_path])
+            # Status requests do not count as activity, so polling the agent does not keep it
+            # alive: with no keys left, it exits once it has been idle for the idle timeout.
+            deadline = time.monotonic() + 5
+            while (
+                signer_agent.is_running(self.socket_path)
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.1)
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+            self.assertFalse(signer_agent.is_running(self.socket_path))
+        finally:
+            signer_agent.REAPER_INTERVAL = reaper_interval
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import json
+import os
+import tempfile
+import unittest
+
+from . import registry, snapshot
+from .test_characters import CharactersTestCase
+
+
+class SnapshotTestCase(CharactersTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Extends the Great Wyrm Characters setup with a Multicall3 contract and five characters for
+        the player, the second of which has a validated profile.
+        """
+        super().setUpClass()
+
+        multicall = registry.contract_container("Multicall3").deploy(
+            cls.owner_tx_config
+        )
+        cls.multicall_address = multicall.address
+
+        cls.terminus.mint(
+            cls.player.address,
+            cls.character_creation_terminus_pool_id,
+            5,
+            "",
+            cls.owner_tx_config,
+        )
+        for _ in range(5):
+            cls.characters.create_character(cls.player.address, {"from": cls.player})
+            token_id = cls.characters.total_supply()
+            cls.characters.set_token_uri(
+                token_id,
+                f"https://example.com/characters/{token_id}/profile.json",
+                True,
+                {"from": cls.player},
+            )
+        cls.characters.set_metadata_validity(
+            cls.characters.token_by_index(1), True, {"from": cls.admin}
+        )
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.outfile = os.path.join(self.tempdir.name, "snapshot.json")
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def assertSnapshotMatchesContract(self, result):
+        """
+        Checks the snapshot returned by export_snapshot, and the snapshot file, against single reads
+        of every character.
+        """
+        with open(self.outfile, "r") as ifp:
+            self.assertEqual(json.load(ifp), result)
+
+        total_supply = self.characters.total_supply(result["block"])
+        self.assertEqual(result["address"], self.characters.address)
+        self.assertEqual(result["total_supply"], total_supply)
+
+        columns = result["columns"]
+        token_ids = [
+            self.characters.token_by_index(index, result["block"])
+            for index in range(total_supply)
+        ]
+        self.assertEqual(columns["token_id"], token_ids)
+        self.assertEqual(
+            columns["owner"],
+            [self.characters.owner_of(token_id) for token_id in token_ids],
+        )
+        self.assertEqual(
+            columns["uri"],
+            [self.characters.token_uri(token_id) for token_id in token_ids],
+        )
+        self.assertEqual(
+            columns["valid"],
+            [self.characters.is_metadata_valid(token_id) for token_id in token_ids],
+        )
+
+
+class SnapshotTests(SnapshotTestCase):
+    def test_export_snapshot(self):
+        result = snapshot.export_snapshot(
+            self.characters,
+            self.outfile,
+            chunk_size=2,
+            multicall_address=self.multicall_address,
+            progress=False,
+        )
+
+        self.assertSnapshotMatchesContract(result)
+        self.assertIn(True, result["columns"]["valid"])
+        self.assertIn(False, result["columns"]["valid"])
+        self.assertFalse(os.path.exists(snapshot.checkpoint_path(self.outfile)))
+
+    def test_resume_interrupted_export(self):
+        """
+        Interrupts an export by failing its second chunk, tears the last line of the checkpoint (as
+        if the process had died while writing it) and resumes the export.
+        """
+        snapshot_chunk = snapshot.snapshot_chunk
+        chunk_offsets = []
+
+        def failing_snapshot_chunk(contract, offset, *args):
+            chunk_offsets.append(offset)
+            if offset == 2:
+                raise Exception("Interrupted")
+            return snapshot_chunk(contract, offset, *args)
+
+        snapshot.snapshot_chunk = failing_snapshot_chunk
+        try:
+            with self.assertRaises(Exception):
+                snapshot.export_snapshot(
+                    self.characters,
+                    self.outfile,
+                    chunk_size=2,
+                    concurrency=1,
+                    multicall_address=self.multicall_address,
+                    progress=False,
+                )
+        finally:
+            snapshot.snapshot_chunk = snapshot_chunk
+        self.assertFalse(os.path.exists(self.outfile))
+
+        partial_path = snapshot.checkpoint_path(self.outfile)
+        records, valid_size = snapshot.read_checkpoint(partial_path)
+        completed_offsets = [record["offset"] for record in records[1:]]
+        self.assertNotIn(2, completed_offsets)
+        self.assertEqual(valid_size, os.path.getsize(partial_path))
+
+        with open(partial_path, "a") as ofp:
+            ofp.write('{"offset": 2, "token_id": [')
+        self.assertEqual(snapshot.read_checkpoint(partial_path), (records, valid_size))
+
+        chunk_offsets.clear()
+
+        def recording_snapshot_chunk(contract, offset, *args):
+            chunk_offsets.append(offset)
+            return snapshot_chunk(contract, offset, *args)
+
+        snapshot.snapshot_chunk = recording_snapshot_chunk
+        try:
+            # Resumes without Multicall3 - the checkpoint does not depend on how the reads are made.
+            result = snapshot.export_snapshot(
+                self.characters,
+                self.outfile,
+                multicall_address=None,
+                progress=False,
+            )
+        finally:
+            snapshot.snapshot_chunk = snapshot_chunk
+
+        # Only the chunks missing from the checkpoint were read again.
+        self.assertIn(2, chunk_offsets)
+        self.assertEqual(set(chunk_offsets) & set(completed_offsets), set())
+        token_ids = result["columns"]["token_id"]
+        self.assertEqual(len(token_ids), len(set(token_ids)))
+        self.assertSnapshotMatchesContract(result)
+        self.assertFalse(os.path.exists(partial_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
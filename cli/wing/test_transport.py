@@ -0,0 +1,133 @@
+import json
+import unittest
+from concurrent.futures import Future
+
+from . import transport
+
+
+class SendBatchTests(unittest.TestCase):
+    """
+    Tests BatchingHTTPProvider._send_batch against canned node responses, without a node.
+    """
+
+    def setUp(self) -> None:
+        self.provider = transport.BatchingHTTPProvider("http://127.0.0.1:8545")
+        # Request bodies posted by the provider, in order.
+        self.posted = []
+        # Responses to return for the posted requests, in order. Exceptions are raised instead.
+        self.responses = []
+        self.provider._post = self.post
+
+    def post(self, request_data):
+        self.posted.append(json.loads(request_data))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return json.dumps(response).encode("utf-8")
+
+    def batch(self, num_requests):
+        """
+        Returns a batch of eth_call requests, with IDs 0 to num_requests - 1, in the form that the
+        provider queues them.
+        """
+        batch = []
+        for request_id in range(num_requests):
+            request = {
+                "jsonrpc": "2.0",
+                "method": "eth_call",
+                "params": [{"data": hex(request_id)}, "latest"],
+                "id": request_id,
+            }
+            batch.append(
+                (0.0, request_id, json.dumps(request).encode("utf-8"), Future())
+            )
+        return batch
+
+    def results(self, batch):
+        return [future.result(timeout=1) for _, _, _, future in batch]
+
+    def test_responses_are_matched_by_id(self):
+        batch = self.batch(3)
+        self.responses.append(
+            [
+                {"jsonrpc": "2.0", "id": 2, "result": "0x02"},
+                {"jsonrpc": "2.0", "id": 0, "result": "0x00"},
+                {"jsonrpc": "2.0", "id": 1, "result": "0x01"},
+            ]
+        )
+        self.provider._send_batch(batch)
+
+        self.assertEqual(len(self.posted), 1)
+        self.assertEqual([request["id"] for request in self.posted[0]], [0, 1, 2])
+        self.assertEqual(
+            [item["result"] for item in self.results(batch)], ["0x00", "0x01", "0x02"]
+        )
+
+    def test_errors_are_per_request(self):
+        batch = self.batch(2)
+        self.responses.append(
+            [
+                {"jsonrpc": "2.0", "id": 0, "result": "0x00"},
+                {
+                    "jsonrpc": "2.0",
+                    "id": 1,
+                    "error": {"code": -32000, "message": "execution reverted"},
+                },
+            ]
+        )
+        self.provider._send_batch(batch)
+
+        results = self.results(batch)
+        self.assertEqual(results[0]["result"], "0x00")
+        self.assertNotIn("error", results[0])
+        self.assertEqual(results[1]["error"]["message"], "execution reverted")
+
+    def test_missing_responses_are_internal_errors(self):
+        batch = self.batch(2)
+        self.responses.append([{"jsonrpc": "2.0", "id": 1, "result": "0x01"}])
+        self.provider._send_batch(batch)
+
+        results = self.results(batch)
+        self.assertEqual(results[0]["id"], 0)
+        self.assertEqual(results[0]["error"]["code"], transport.INTERNAL_ERROR_CODE)
+        self.assertEqual(results[1]["result"], "0x01")
+
+    def test_falls_back_to_single_requests(self):
+        batch = self.batch(2)
+        self.responses.extend(
+            [
+                {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {
+                        "code": -32600,
+                        "message": "batch requests not supported",
+                    },
+                },
+                {"jsonrpc": "2.0", "id": 0, "result": "0x00"},
+                ConnectionError("connection reset"),
+            ]
+        )
+        self.provider._send_batch(batch)
+
+        self.assertEqual(len(self.posted), 3)
+        self.assertIsInstance(self.posted[0], list)
+        self.assertEqual(self.posted[1]["id"], 0)
+        self.assertEqual(self.posted[2]["id"], 1)
+        self.assertEqual(batch[0][3].result(timeout=1)["result"], "0x00")
+        with self.assertRaises(ConnectionError):
+            batch[1][3].result(timeout=1)
+
+    def test_transport_errors_fail_the_batch(self):
+        batch = self.batch(3)
+        self.responses.append(ConnectionError("connection refused"))
+        self.provider._send_batch(batch)
+
+        self.assertEqual(len(self.posted), 1)
+        for _, _, _, future in batch:
+            with self.assertRaises(ConnectionError):
+                future.result(timeout=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
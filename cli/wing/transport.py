@@ -0,0 +1,182 @@
+"""
+JSON-RPC batch transport for read-heavy workloads.
+
+BatchingHTTPProvider is a web3 HTTP provider which coalesces concurrent eth_call requests into
+JSON-RPC batch requests (https://www.jsonrpc.org/specification#batch). A batch is sent as soon as it
+is full or as soon as its oldest request has waited for the maximum latency, whichever comes first.
+
+Batching only helps when there are several requests in flight at the same time, so callers should
+issue reads from multiple threads - wing.multicall.call_many does exactly that. All other methods
+(transactions, receipts, etc.) are sent exactly as they would have been by a regular HTTPProvider.
+"""
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from brownie import web3
+from web3 import HTTPProvider
+
+DEFAULT_MAX_BATCH_SIZE = 100
+# Maximum time (in seconds) that a request waits for other requests to join its batch.
+DEFAULT_MAX_LATENCY = 0.005
+DEFAULT_MAX_CONCURRENT_BATCHES = 4
+DEFAULT_BATCHED_METHODS = ("eth_call",)
+
+# Error code for JSON-RPC internal errors, used for requests which were dropped from a batch response.
+INTERNAL_ERROR_CODE = -32603
+
+
+class BatchingHTTPProvider(HTTPProvider):
+    def __init__(
+        self,
+        endpoint_uri: Optional[str] = None,
+        request_kwargs: Optional[Dict[str, Any]] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_latency: float = DEFAULT_MAX_LATENCY,
+        max_concurrent_batches: int = DEFAULT_MAX_CONCURRENT_BATCHES,
+        batched_methods: Sequence[str] = DEFAULT_BATCHED_METHODS,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError(f"Invalid batch size: {max_batch_size}")
+        super().__init__(endpoint_uri, request_kwargs)
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.batched_methods = set(batched_methods)
+
+        self._session = requests.Session()
+        self._condition = threading.Condition()
+        # Pending requests, of the form (enqueued_at, request_id, encoded_request, future)
+        self._pending: List[Tuple[float, Any, bytes, Future]] = []
+        self._senders = ThreadPoolExecutor(max_workers=max_concurrent_batches)
+        self._flusher = threading.Thread(target=self._flush_forever, daemon=True)
+        self._flusher.start()
+
+    def make_request(self, method: str, params: Any) -> Any:
+        if method not in self.batched_methods:
+            return super().make_request(method, params)
+
+        encoded_request = self.encode_rpc_request(method, params)
+        request_id = json.loads(encoded_request)["id"]
+        future: Future = Future()
+        with self._condition:
+            self._pending.append(
+                (time.monotonic(), request_id, encoded_request, future)
+            )
+            self._condition.notify()
+        return future.result()
+
+    def _flush_forever(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                deadline = self._pending[0][0] + self.max_latency
+                while len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[: self.max_batch_size]
+                self._pending = self._pending[self.max_batch_size :]
+            self._senders.submit(self._send_batch, batch)
+
+    def _send_batch(self, batch: List[Tuple[float, Any, bytes, Future]]) -> None:
+        try:
+            request_data = (
+                b"[" + b",".join(request for _, _, request, _ in batch) + b"]"
+            )
+            responses = self.decode_rpc_response(self._post(request_data))
+        except Exception as e:
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        if not isinstance(responses, list):
+            # The node does not support batch requests (it responded with a single error). Fall back
+            # to sending the requests one by one.
+            for _, _, request, future in batch:
+                try:
+                    future.set_result(self.decode_rpc_response(self._post(request)))
+                except Exception as e:
+                    future.set_exception(e)
+            return
+
+        # Batch responses may come back in any order, so they are matched to requests by ID.
+        responses_by_id = {item.get("id"): item for item in responses}
+        for _, request_id, _, future in batch:
+            item = responses_by_id.get(request_id)
+            if item is None:
+                item = {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "error": {
+                        "code": INTERNAL_ERROR_CODE,
+                        "message": "Request missing from JSON-RPC batch response",
+                    },
+                }
+            future.set_result(item)
+
+    def _post(self, request_data: bytes) -> bytes:
+        response = self._session.post(
+            self.endpoint_uri, data=request_data, **dict(self.get_request_kwargs())
+        )
+        response.raise_for_status()
+        return response.content
+
+
+def install(
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    max_latency: float = DEFAULT_MAX_LATENCY,
+    max_concurrent_batches: int = DEFAULT_MAX_CONCURRENT_BATCHES,
+) -> BatchingHTTPProvider:
+    """
+    Replaces the provider of the currently connected brownie network with a BatchingHTTPProvider
+    to the same endpoint. Has no effect if batching is already installed.
+
+    Must be called after network.connect.
+    """
+    provider = web3.provider
+    if isinstance(provider, BatchingHTTPProvider):
+        return provider
+    if not isinstance(provider, HTTPProvider):
+        raise ValueError(
+            f"JSON-RPC batching requires an HTTP provider, current provider is: {provider}"
+        )
+
+    batching_provider = BatchingHTTPProvider(
+        provider.endpoint_uri,
+        request_kwargs=provider._request_kwargs,
+        max_batch_size=max_batch_size,
+        max_latency=max_latency,
+        max_concurrent_batches=max_concurrent_batches,
+    )
+    web3.provider = batching_provider
+    return batching_provider
+
+
+def add_batch_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--rpc-batch-size",
+        type=int,
+        default=None,
+        help="If set, coalesce concurrent eth_call requests into JSON-RPC batches of (at most) this size",
+    )
+    parser.add_argument(
+        "--rpc-batch-latency",
+        type=float,
+        default=DEFAULT_MAX_LATENCY,
+        help=f"Maximum time (in seconds) that a request waits for its JSON-RPC batch to fill up (default: {DEFAULT_MAX_LATENCY})",
+    )
+
+
+def install_from_args(args: argparse.Namespace) -> None:
+    """
+    Installs JSON-RPC batching if it was requested on the command line (see add_batch_arguments).
+    """
+    if args.rpc_batch_size is not None:
+        install(max_batch_size=args.rpc_batch_size, max_latency=args.rpc_batch_latency)
@@ -246,6 +246,24 @@ contract CharactersFacet is ERC721Base, ERC721Enumerable {
         emit TokenValiditySet(tokenId, msg.sender, valid);
     }
 
+    /// Allows game masters to mark the metadata of many characters as being valid or invalid in a single
+    /// transaction. The game master check is made once for the whole batch.
+    function setMetadataValidityBatch(
+        uint256[] calldata tokenIds,
+        bool[] calldata valid
+    ) external onlyGameMaster {
+        require(
+            tokenIds.length == valid.length,
+            "CharactersFacet.setMetadataValidityBatch: tokenIds and valid must have the same length"
+        );
+        LibCharacters.CharactersStorage storage cs = LibCharacters
+            .charactersStorage();
+        for (uint256 i = 0; i < tokenIds.length; i++) {
+            cs.MetadataValid[tokenIds[i]] = valid[i];
+            emit TokenValiditySet(tokenIds[i], msg.sender, valid[i]);
+        }
+    }
+
     /// Allows anyone possessing a character creation Terminus token to create a Greaty Wyrm character.
     /// The character creation Terminus token is used up in the process.
     function createCharacter(address player) external returns (uint256) {
@@ -261,4 +279,30 @@ contract CharactersFacet is ERC721Base, ERC721Enumerable {
         _mint(player, tokenId);
         return tokenId;
     }
+
+    /// Creates a Great Wyrm character for each of the given players. The caller must possess one character
+    /// creation Terminus token per player, and all of them are burned in a single Terminus call.
+    /// Returns the token ID of the first character created - the characters have consecutive token IDs.
+    function createCharacters(address[] calldata players)
+        external
+        returns (uint256)
+    {
+        require(
+            players.length > 0,
+            "CharactersFacet.createCharacters: No players specified"
+        );
+        LibCharacters.CharactersStorage storage cs = LibCharacters
+            .charactersStorage();
+        ITerminus adminTerminusContract = ITerminus(cs.AdminTerminusAddress);
+        adminTerminusContract.burn(
+            msg.sender,
+            cs.CharacterCreationTerminusPoolID,
+            players.length
+        );
+        uint256 firstTokenId = _totalSupply() + 1;
+        for (uint256 i = 0; i < players.length; i++) {
+            _mint(players[i], firstTokenId + i);
+        }
+        return firstTokenId;
+    }
 }
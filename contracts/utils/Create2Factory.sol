@@ -0,0 +1,40 @@
+// SPDX-License-Identifier: MIT
+
+/**
+ * Authors: Moonstream Engineering (engineering@moonstream.to)
+ * GitHub: https://github.com/great-wyrm/contracts
+ */
+
+pragma solidity ^0.8.0;
+
+/**
+Create2Factory deploys contracts with CREATE2, so that the address of a contract only depends on the
+address of the factory, a salt, and the creation code of the contract.
+
+It has the same interface as the deterministic deployment proxy
+(https://github.com/Arachnid/deterministic-deployment-proxy): the calldata is a 32 byte salt followed
+by the creation code, and the return data is the 20 byte address of the deployed contract. This
+means that wing can use either this contract or the canonical deployment of the proxy at
+0x4e59b44847b379578588920cA78FbF26c0B4956C, on chains which have one.
+ */
+contract Create2Factory {
+    fallback(bytes calldata input) external payable returns (bytes memory) {
+        require(
+            input.length >= 32,
+            "Create2Factory: calldata must start with a 32 byte salt"
+        );
+        bytes32 salt = abi.decode(input[:32], (bytes32));
+        bytes memory creationCode = input[32:];
+        address deployed;
+        assembly {
+            deployed := create2(
+                callvalue(),
+                add(creationCode, 0x20),
+                mload(creationCode),
+                salt
+            )
+        }
+        require(deployed != address(0), "Create2Factory: deployment failed");
+        return abi.encodePacked(deployed);
+    }
+}
@@ -0,0 +1,56 @@
+// SPDX-License-Identifier: MIT
+
+/**
+ * Authors: Moonstream Engineering (engineering@moonstream.to)
+ * GitHub: https://github.com/great-wyrm/contracts
+ */
+
+pragma solidity ^0.8.0;
+
+/**
+Multicall3 batches calls to other contracts into a single call.
+
+This is the subset of Multicall3 (https://github.com/mds1/multicall) that wing uses for bulk reads.
+It is ABI-compatible with the canonical Multicall3 deployment at
+0xcA11bde05977b3631167028862bE2a173976CA11, so wing can use either this contract or the canonical
+deployment on chains which have one.
+ */
+contract Multicall3 {
+    struct Call3 {
+        address target;
+        bool allowFailure;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    /// Makes each of the given calls and returns their results in order. Reverts if a call which does
+    /// not allow failure fails.
+    function aggregate3(Call3[] calldata calls)
+        public
+        payable
+        returns (Result[] memory returnData)
+    {
+        uint256 length = calls.length;
+        returnData = new Result[](length);
+        for (uint256 i = 0; i < length; i++) {
+            Call3 calldata call3 = calls[i];
+            Result memory result = returnData[i];
+            (result.success, result.returnData) = call3.target.call(
+                call3.callData
+            );
+            require(
+                call3.allowFailure || result.success,
+                "Multicall3.aggregate3: Call failed"
+            );
+        }
+    }
+
+    /// Returns the number of the block in which the call is being made.
+    function getBlockNumber() public view returns (uint256 blockNumber) {
+        blockNumber = block.number;
+    }
+}